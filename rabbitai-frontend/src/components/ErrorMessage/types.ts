@@ -51,6 +51,7 @@ export const ErrorTypeEnum = {
   SQLLAB_TIMEOUT_ERROR: 'SQLLAB_TIMEOUT_ERROR',
   RESULTS_BACKEND_ERROR: 'RESULTS_BACKEND_ERROR',
   ASYNC_WORKERS_ERROR: 'ASYNC_WORKERS_ERROR',
+  RESULTS_TOO_LARGE_ERROR: 'RESULTS_TOO_LARGE_ERROR',
 
   // Generic errors
   GENERIC_COMMAND_ERROR: 'GENERIC_COMMAND_ERROR',
@@ -80,6 +80,10 @@ export default function setupErrorMessages() {
     ErrorTypeEnum.ASYNC_WORKERS_ERROR,
     DatabaseErrorMessage,
   );
+  errorMessageComponentRegistry.registerValue(
+    ErrorTypeEnum.RESULTS_TOO_LARGE_ERROR,
+    DatabaseErrorMessage,
+  );
   errorMessageComponentRegistry.registerValue(
     ErrorTypeEnum.SQLLAB_TIMEOUT_ERROR,
     DatabaseErrorMessage,
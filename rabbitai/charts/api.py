@@ -36,7 +36,6 @@ from rabbitai.charts.commands.importers.dispatcher import ImportChartsCommand
 from rabbitai.charts.commands.update import UpdateChartCommand
 from rabbitai.charts.dao import ChartDAO
 from rabbitai.charts.filters import ChartAllTextFilter, ChartFavoriteFilter, ChartFilter
-from rabbitai.charts.post_processing import apply_post_process
 from rabbitai.charts.schemas import (
     CHART_SCHEMAS,
     ChartPostSchema,
@@ -73,6 +72,11 @@ from rabbitai.views.filters import FilterRelatedOwners
 
 logger = logging.getLogger(__name__)
 
+BINARY_RESULT_MIMETYPES = {
+    ChartDataResultFormat.ARROW: "application/vnd.apache.arrow.stream",
+    ChartDataResultFormat.PARQUET: "application/vnd.apache.parquet",
+}
+
 
 class ChartRestApi(BaseRabbitaiModelRestApi):
     datamodel = SQLAInterface(Slice)
@@ -477,21 +481,9 @@ class ChartRestApi(BaseRabbitaiModelRestApi):
         except ChartBulkDeleteFailedError as ex:
             return self.response_422(message=str(ex))
 
-    def send_chart_response(
-        self, result: Dict[Any, Any], form_data: Optional[Dict[str, Any]] = None,
-    ) -> Response:
-        result_type = result["query_context"].result_type
+    def send_chart_response(self, result: Dict[Any, Any]) -> Response:
         result_format = result["query_context"].result_format
 
-        # Post-process the data so it matches the data presented in the chart.
-        # This is needed for sending reports based on text charts that do the
-        # post-processing of data, eg, the pivot table.
-        if (
-            result_type == ChartDataResultType.POST_PROCESSED
-            and result_format == ChartDataResultFormat.CSV
-        ):
-            result = apply_post_process(result, form_data)
-
         if result_format == ChartDataResultFormat.CSV:
             # Verify user has permission to export CSV file
             if not security_manager.can_access("can_csv", "Rabbitai"):
@@ -501,7 +493,23 @@ class ChartRestApi(BaseRabbitaiModelRestApi):
             data = result["queries"][0]["data"]
             return CsvResponse(data, headers=generate_download_headers("csv"))
 
-        if result_format == ChartDataResultFormat.JSON:
+        if result_format in BINARY_RESULT_MIMETYPES:
+            # binary exports are subject to the same permission as CSV
+            if not security_manager.can_access("can_csv", "Rabbitai"):
+                return self.response_403()
+
+            # return the first result
+            data = result["queries"][0]["data"]
+            return Response(
+                data,
+                mimetype=BINARY_RESULT_MIMETYPES[result_format],
+                headers=generate_download_headers(result_format.value),
+            )
+
+        if result_format in (
+            ChartDataResultFormat.JSON,
+            ChartDataResultFormat.JSON_COLUMNS,
+        ):
             response_data = simplejson.dumps(
                 {"result": result["queries"]},
                 default=json_int_dttm_ser,
@@ -514,10 +522,7 @@ class ChartRestApi(BaseRabbitaiModelRestApi):
         return self.response_400(message=f"Unsupported result_format: {result_format}")
 
     def get_data_response(
-        self,
-        command: ChartDataCommand,
-        force_cached: bool = False,
-        form_data: Optional[Dict[str, Any]] = None,
+        self, command: ChartDataCommand, force_cached: bool = False,
     ) -> Response:
         try:
             result = command.run(force_cached=force_cached)
@@ -526,7 +531,7 @@ class ChartRestApi(BaseRabbitaiModelRestApi):
         except ChartDataQueryFailedError as exc:
             return self.response_400(message=exc.message)
 
-        return self.send_chart_response(result, form_data)
+        return self.send_chart_response(result)
 
     @expose("/<int:pk>/data/", methods=["GET"])
     @protect()
@@ -601,6 +606,13 @@ class ChartRestApi(BaseRabbitaiModelRestApi):
             "format", ChartDataResultFormat.JSON
         )
         json_body["result_type"] = request.args.get("type", ChartDataResultType.FULL)
+        # Post-process the data so it matches the data presented in the chart.
+        # This is needed for sending reports based on text charts that do the
+        # post-processing of data, eg, the pivot table.
+        try:
+            json_body["form_data"] = json.loads(chart.params)
+        except (TypeError, json.decoder.JSONDecodeError):
+            json_body["form_data"] = {}
 
         try:
             command = ChartDataCommand()
@@ -623,12 +635,7 @@ class ChartRestApi(BaseRabbitaiModelRestApi):
         ):
             return self._run_async(command)
 
-        try:
-            form_data = json.loads(chart.params)
-        except (TypeError, json.decoder.JSONDecodeError):
-            form_data = {}
-
-        return self.get_data_response(command, form_data=form_data)
+        return self.get_data_response(command)
 
     @expose("/data", methods=["POST"])
     @protect()
@@ -761,6 +768,13 @@ class ChartRestApi(BaseRabbitaiModelRestApi):
             schema:
               type: string
             name: cache_key
+          - in: query
+            name: format
+            description: >-
+              The format in which the data should be returned, defaults to
+              the format of the original request
+            schema:
+              type: string
           responses:
             200:
               description: Query result
@@ -782,6 +796,9 @@ class ChartRestApi(BaseRabbitaiModelRestApi):
         command = ChartDataCommand()
         try:
             cached_data = command.load_query_context_from_cache(cache_key)
+            if request.args.get("format"):
+                # fetch the cached results in another format, eg arrow
+                cached_data = {**cached_data, "result_format": request.args["format"]}
             command.set_query_context(cached_data)
             command.validate()
         except ChartDataCacheLoadError:
@@ -7,15 +7,21 @@ to users in reports we want to show the same data they would see
 on Explore.
 
 In order to do that, we reproduce the post-processing in Python
-for these chart types.
+for these chart types. The post-processing operates on the dataframe
+returned by the query, before it's formatted as CSV, JSON or binary.
 """
 
-from io import StringIO
-from typing import Any, Callable, Dict, Optional, Union
+from typing import Any, Callable, cast, Dict, List, Optional, Tuple, Union
 
 import pandas as pd
+from flask_babel import gettext as _
 
-from rabbitai.utils.core import DTTM_ALIAS, extract_dataframe_dtypes, get_metric_name
+from rabbitai.exceptions import QueryObjectValidationError
+from rabbitai.utils.core import DTTM_ALIAS, get_metric_name
+
+# 可向量化的聚合：分组对象（或序列）的方法名称及其参数
+Aggregate = Tuple[str, Dict[str, Any]]
+AggregateFunction = Union[Aggregate, Callable[[pd.Series], Any]]
 
 
 def sql_like_sum(series: pd.Series) -> pd.Series:
@@ -25,40 +31,332 @@ def sql_like_sum(series: pd.Series) -> pd.Series:
     return series.sum(min_count=1)
 
 
-def pivot_table(df: pd.DataFrame, form_data: Dict[str, Any]) -> pd.DataFrame:
+# the vectorized equivalent of ``sql_like_sum``
+SQL_LIKE_SUM: Aggregate = ("sum", {"min_count": 1})
+
+
+def _to_pandas_aggfunc(aggregate: AggregateFunction) -> Union[str, Callable[..., Any]]:
+    """
+    转换聚合为 ``pivot_table`` 接受的聚合函数。
+
+    :param aggregate: 聚合。
+    :return: 聚合函数名称或函数。
+    """
+
+    if callable(aggregate):
+        return aggregate
+
+    name, kwargs = aggregate
+    if not kwargs:
+        return name
+    return lambda series: getattr(series, name)(**kwargs)
+
+
+def _aggregate(
+    data: Union[pd.DataFrame, "pd.core.groupby.DataFrameGroupBy"],
+    aggregates: Dict[str, Aggregate],
+) -> Union[pd.DataFrame, pd.Series]:
+    """
+    按指标对分组对象或数据帧执行向量化聚合。
+
+    :param data: 分组对象或数据帧。
+    :param aggregates: 指标及其聚合。
+    :return: 对分组对象聚合时返回数据帧，对数据帧聚合时返回以指标为索引的序列。
+    """
+
+    result = {
+        metric: getattr(data[metric], name)(**kwargs)
+        for metric, (name, kwargs) in aggregates.items()
+    }
+    if isinstance(data, pd.DataFrame):
+        return pd.Series(result)
+    return pd.DataFrame(result)
+
+
+def check_pivot_size(
+    df: pd.DataFrame,
+    index: List[str],
+    columns: List[str],
+    metrics: List[str],
+    max_rows: Optional[int] = None,
+    max_columns: Optional[int] = None,
+) -> None:
+    """
+    检查透视表的行数和列数是否超过限制，在透视之前执行，避免生成过大的透视表。
+
+    :param df: 源数据帧。
+    :param index: 行分组列。
+    :param columns: 列分组列。
+    :param metrics: 指标。
+    :param max_rows: 最大行数，为 None 时不限制。
+    :param max_columns: 最大列数，为 None 时不限制。
+    :raises QueryObjectValidationError: 超过限制时抛出。
+    """
+
+    if max_rows and index:
+        rows = df.groupby(index).ngroups
+        if rows > max_rows:
+            raise QueryObjectValidationError(
+                _(
+                    "The pivot table has %(rows)s rows, which exceeds the limit "
+                    "of %(limit)s rows",
+                    rows=rows,
+                    limit=max_rows,
+                )
+            )
+    if max_columns and columns:
+        cols = df.groupby(columns).ngroups * len(metrics)
+        if cols > max_columns:
+            raise QueryObjectValidationError(
+                _(
+                    "The pivot table has %(columns)s columns, which exceeds the "
+                    "limit of %(limit)s columns",
+                    columns=cols,
+                    limit=max_columns,
+                )
+            )
+
+
+def _add_margins(
+    table: pd.DataFrame,
+    data: pd.DataFrame,
+    index: List[str],
+    columns: List[str],
+    aggregates: Dict[str, Aggregate],
+    margins_name: str,
+) -> pd.DataFrame:
+    """
+    添加合计行和合计列，布局与 ``pivot_table(margins=True)`` 一致：
+    每个指标的合计列位于该指标各列之后，合计行位于最后。
+
+    :param table: 透视表。
+    :param data: 用于计算合计的源数据帧。
+    :param index: 行分组列。
+    :param columns: 列分组列。
+    :param aggregates: 指标及其聚合。
+    :param margins_name: 合计行和合计列的名称。
+    :return: 带合计的透视表。
+    """
+
+    suffix = ("",) * (len(columns) - 1)
+    grand_totals = _aggregate(data, aggregates)
+
+    row_totals = _aggregate(data.groupby(index), aggregates)
+    pieces = []
+    margin_keys = []
+    for metric in table.columns.get_level_values(0).unique():
+        margin_key = (metric, margins_name) + suffix
+        piece = table.xs(metric, axis=1, level=0, drop_level=False).copy()
+        piece[margin_key] = row_totals[metric]
+        pieces.append(piece)
+        margin_keys.append(margin_key)
+    result = pd.concat(pieces, axis=1)
+
+    column_totals = _aggregate(data.groupby(columns), aggregates).stack()
+    column_totals = column_totals.reorder_levels(
+        [len(columns)] + list(range(len(columns)))
+    ).reindex(result.columns)
+    for margin_key in margin_keys:
+        column_totals[margin_key] = grand_totals[margin_key[0]]
+
+    key: Union[str, Tuple[str, ...]] = margins_name
+    if len(index) > 1:
+        key = (margins_name,) + ("",) * (len(index) - 1)
+    total_row = pd.DataFrame(column_totals, columns=[key]).T
+
+    # keep integer columns as integers when the totals are integral
+    for column in result.select_dtypes("integer").columns:
+        value = total_row[column]
+        if value.notna().all() and (value % 1 == 0).all():
+            total_row[column] = value.astype(result[column].dtype)
+
+    index_names = result.index.names
+    result = pd.concat([result, total_row])
+    result.index.names = index_names
+    return result
+
+
+def _pivot(
+    df: pd.DataFrame,
+    index: List[str],
+    columns: List[str],
+    aggregates: Dict[str, Aggregate],
+    margins: bool,
+    margins_name: str = "All",
+) -> pd.DataFrame:
+    """
+    通过分组聚合和 ``unstack`` 生成透视表，结果与 ``pivot_table`` 一致，
+    但聚合使用向量化的分组方法，不对每个分组调用 Python 函数。
+
+    :param df: 源数据帧。
+    :param index: 行分组列，不能为空。
+    :param columns: 列分组列，不能为空。
+    :param aggregates: 指标及其聚合。
+    :param margins: 是否添加合计行和合计列。
+    :param margins_name: 合计行和合计列的名称。
+    :return: 透视表。
+    """
+
+    keys = index + columns
+    data = df[keys + [metric for metric in aggregates if metric not in keys]]
+    table = _aggregate(data.groupby(keys), aggregates).dropna(how="all")
+    table = table.unstack(list(range(len(index), len(keys)))).sort_index(axis=1)
+
+    if margins:
+        table = _add_margins(
+            table,
+            data[data.notna().all(axis=1)],
+            index,
+            columns,
+            aggregates,
+            margins_name,
+        )
+
+    return table.dropna(how="all", axis=1)
+
+
+def _pivot_rows(
+    df: pd.DataFrame,
+    index: List[str],
+    aggregates: Dict[str, Aggregate],
+    margins: bool,
+    margins_name: str = "All",
+) -> pd.DataFrame:
+    """
+    只有行分组时，通过分组聚合生成透视表，结果与 ``pivot_table`` 一致。
+
+    :param df: 源数据帧。
+    :param index: 行分组列，不能为空。
+    :param aggregates: 指标及其聚合。
+    :param margins: 是否添加合计行。
+    :param margins_name: 合计行的名称。
+    :return: 透视表。
+    """
+
+    data = df[index + [metric for metric in aggregates if metric not in index]]
+    table = _aggregate(data.groupby(index), aggregates).dropna(how="all")
+    # like ``pivot_table``, integral results of integer metrics stay integers
+    for metric in aggregates:
+        values = table[metric]
+        if (
+            pd.api.types.is_integer_dtype(data[metric])
+            and not pd.api.types.is_integer_dtype(values)
+            and values.notna().all()
+            and (values % 1 == 0).all()
+        ):
+            table[metric] = values.astype(data[metric].dtype)
+    if not margins:
+        return table
+
+    totals = data[data.notna().all(axis=1)]
+    key: Union[str, Tuple[str, ...]] = margins_name
+    if len(index) > 1:
+        key = (margins_name,) + ("",) * (len(index) - 1)
+    # aggregate each metric separately to keep its dtype
+    total_row = pd.DataFrame(
+        {
+            metric: [getattr(totals[metric], name)(**kwargs)]
+            for metric, (name, kwargs) in aggregates.items()
+        },
+        index=pd.Index([key], tupleize_cols=len(index) > 1),
+    )
+
+    index_names = table.index.names
+    result = pd.concat([table, total_row])
+    result.index.names = index_names
+    return result
+
+
+def _pivot_table(
+    df: pd.DataFrame,
+    index: List[str],
+    columns: List[str],
+    aggregates: Dict[str, AggregateFunction],
+    margins: bool,
+    max_rows: Optional[int] = None,
+    max_columns: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    生成透视表，行分组不为空且聚合都可向量化时使用向量化的实现，否则使用 ``pivot_table``。
+
+    只有列分组的透视表由 ``pivot_table`` 生成，其结果以指标为行，合计列的布局也不同，
+    较为少见，因此没有向量化的实现。
+
+    :param df: 源数据帧。
+    :param index: 行分组列。
+    :param columns: 列分组列。
+    :param aggregates: 指标及其聚合。
+    :param margins: 是否添加合计行和合计列。
+    :param max_rows: 最大行数。
+    :param max_columns: 最大列数。
+    :return: 透视表。
+    """
+
+    metrics = list(aggregates)
+    check_pivot_size(df, index, columns, metrics, max_rows, max_columns)
+
+    if index and not any(map(callable, aggregates.values())):
+        vectorized = cast(Dict[str, Aggregate], aggregates)
+        if columns:
+            return _pivot(df, index, columns, vectorized, margins)
+        return _pivot_rows(df, index, vectorized, margins)
+
+    return df.pivot_table(
+        index=index,
+        columns=columns,
+        values=metrics,
+        aggfunc={
+            metric: _to_pandas_aggfunc(aggregate)
+            for metric, aggregate in aggregates.items()
+        },
+        margins=margins,
+    )
+
+
+def pivot_table(
+    df: pd.DataFrame,
+    form_data: Dict[str, Any],
+    max_rows: Optional[int] = None,
+    max_columns: Optional[int] = None,
+) -> pd.DataFrame:
     """
     依据指定表单数据，对指定数据帧生成透视表。
 
     :param df:
     :param form_data:
+    :param max_rows: 透视表的最大行数。
+    :param max_columns: 透视表的最大列数。
     :return:
     """
 
     if form_data.get("granularity") == "all" and DTTM_ALIAS in df:
-        del df[DTTM_ALIAS]
+        df = df.drop(columns=[DTTM_ALIAS])
 
     metrics = [get_metric_name(m) for m in form_data["metrics"]]
-    aggfuncs: Dict[str, Union[str, Callable[[Any], Any]]] = {}
+    aggregates: Dict[str, AggregateFunction] = {}
     for metric in metrics:
         aggfunc = form_data.get("pandas_aggfunc") or "sum"
         if pd.api.types.is_numeric_dtype(df[metric]):
             if aggfunc == "sum":
-                aggfunc = sql_like_sum
+                aggregates[metric] = SQL_LIKE_SUM
+                continue
         elif aggfunc not in {"min", "max"}:
             aggfunc = "max"
-        aggfuncs[metric] = aggfunc
+        aggregates[metric] = (aggfunc, {})
 
     groupby = form_data.get("groupby") or []
     columns = form_data.get("columns") or []
     if form_data.get("transpose_pivot"):
         groupby, columns = columns, groupby
 
-    df = df.pivot_table(
+    df = _pivot_table(
+        df,
         index=groupby,
         columns=columns,
-        values=metrics,
-        aggfunc=aggfuncs,
-        margins=form_data.get("pivot_margins"),
+        aggregates=aggregates,
+        margins=bool(form_data.get("pivot_margins")),
+        max_rows=max_rows,
+        max_columns=max_columns,
     )
 
     # Re-order the columns adhering to the metric ordering.
@@ -81,36 +379,41 @@ def list_unique_values(series: pd.Series) -> str:
     return ", ".join(set(str(v) for v in pd.Series.unique(series)))
 
 
-pivot_v2_aggfunc_map = {
-    "Count": pd.Series.count,
-    "Count Unique Values": pd.Series.nunique,
+pivot_v2_aggfunc_map: Dict[str, AggregateFunction] = {
+    "Count": ("count", {}),
+    "Count Unique Values": ("nunique", {}),
     "List Unique Values": list_unique_values,
-    "Sum": pd.Series.sum,
-    "Average": pd.Series.mean,
-    "Median": pd.Series.median,
-    "Sample Variance": lambda series: pd.series.var(series) if len(series) > 1 else 0,
+    "Sum": ("sum", {}),
+    "Average": ("mean", {}),
+    "Median": ("median", {}),
+    "Sample Variance": lambda series: pd.Series.var(series) if len(series) > 1 else 0,
     "Sample Standard Deviation": (
-        lambda series: pd.series.std(series) if len(series) > 1 else 0,
+        lambda series: pd.Series.std(series) if len(series) > 1 else 0
     ),
-    "Minimum": pd.Series.min,
-    "Maximum": pd.Series.max,
+    "Minimum": ("min", {}),
+    "Maximum": ("max", {}),
     "First": lambda series: series[:1],
     "Last": lambda series: series[-1:],
-    "Sum as Fraction of Total": pd.Series.sum,
-    "Sum as Fraction of Rows": pd.Series.sum,
-    "Sum as Fraction of Columns": pd.Series.sum,
-    "Count as Fraction of Total": pd.Series.count,
-    "Count as Fraction of Rows": pd.Series.count,
-    "Count as Fraction of Columns": pd.Series.count,
+    "Sum as Fraction of Total": ("sum", {}),
+    "Sum as Fraction of Rows": ("sum", {}),
+    "Sum as Fraction of Columns": ("sum", {}),
+    "Count as Fraction of Total": ("count", {}),
+    "Count as Fraction of Rows": ("count", {}),
+    "Count as Fraction of Columns": ("count", {}),
 }
 
 
-def pivot_table_v2(df: pd.DataFrame, form_data: Dict[str, Any]) -> pd.DataFrame:
+def pivot_table_v2(
+    df: pd.DataFrame,
+    form_data: Dict[str, Any],
+    max_rows: Optional[int] = None,
+    max_columns: Optional[int] = None,
+) -> pd.DataFrame:
     """
     Pivot table v2.
     """
     if form_data.get("granularity_sqla") == "all" and DTTM_ALIAS in df:
-        del df[DTTM_ALIAS]
+        df = df.drop(columns=[DTTM_ALIAS])
 
     metrics = [get_metric_name(m) for m in form_data["metrics"]]
     aggregate_function = form_data.get("aggregateFunction", "Sum")
@@ -119,12 +422,16 @@ def pivot_table_v2(df: pd.DataFrame, form_data: Dict[str, Any]) -> pd.DataFrame:
     if form_data.get("transposePivot"):
         groupby, columns = columns, groupby
 
-    df = df.pivot_table(
+    df = _pivot_table(
+        df,
         index=groupby,
         columns=columns,
-        values=metrics,
-        aggfunc=pivot_v2_aggfunc_map[aggregate_function],
+        aggregates={
+            metric: pivot_v2_aggfunc_map[aggregate_function] for metric in metrics
+        },
         margins=True,
+        max_rows=max_rows,
+        max_columns=max_columns,
     )
 
     # The pandas `pivot_table` method either brings both row/column
@@ -168,34 +475,30 @@ def pivot_table_v2(df: pd.DataFrame, form_data: Dict[str, Any]) -> pd.DataFrame:
     return df
 
 
-post_processors = {
+post_processors: Dict[str, Callable[..., pd.DataFrame]] = {
     "pivot_table": pivot_table,
     "pivot_table_v2": pivot_table_v2,
 }
 
 
-def apply_post_process(
-    result: Dict[Any, Any], form_data: Optional[Dict[str, Any]] = None,
-) -> Dict[Any, Any]:
-    form_data = form_data or {}
-
-    viz_type = form_data.get("viz_type")
-    if viz_type not in post_processors:
-        return result
-
-    post_processor = post_processors[viz_type]
-
-    for query in result["queries"]:
-        df = pd.read_csv(StringIO(query["data"]))
-        processed_df = post_processor(df, form_data)
-
-        buf = StringIO()
-        processed_df.to_csv(buf)
-        buf.seek(0)
-
-        query["data"] = buf.getvalue()
-        query["colnames"] = list(processed_df.columns)
-        query["coltypes"] = extract_dataframe_dtypes(processed_df)
-        query["rowcount"] = len(processed_df.index)
+def post_process_df(
+    df: pd.DataFrame,
+    form_data: Dict[str, Any],
+    max_rows: Optional[int] = None,
+    max_columns: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    对查询结果的数据帧执行与图表展示一致的后处理，图表类型不需要后处理时原样返回。
+
+    :param df: 查询结果。
+    :param form_data: 图表的表单数据。
+    :param max_rows: 透视表的最大行数，为 None 时不限制。
+    :param max_columns: 透视表的最大列数，为 None 时不限制。
+    :return: 后处理后的数据帧。
+    :raises QueryObjectValidationError: 透视表超过行数或列数限制时抛出。
+    """
 
-    return result
+    post_processor = post_processors.get(form_data.get("viz_type"))  # type: ignore
+    if post_processor is None:
+        return df
+    return post_processor(df, form_data, max_rows=max_rows, max_columns=max_columns)
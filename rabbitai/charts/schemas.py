@@ -1035,6 +1035,10 @@ class ChartDataQueryContextSchema(Schema):
 
     result_type = EnumField(ChartDataResultType, by_value=True)
     result_format = EnumField(ChartDataResultFormat, by_value=True)
+    form_data = fields.Dict(
+        description="图表的表单数据，结果类型为 `post_processed` 时用于按图表类型后处理结果",
+        allow_none=True,
+    )
 
     @post_load
     def make_query_context(self, data: Dict[str, Any], **kwargs: Any) -> QueryContext:
@@ -1081,6 +1085,10 @@ class ChartDataResponseResult(Schema):
     is_cached = fields.Boolean(
         description="是否缓存结果", required=True, allow_none=None,
     )
+    is_stale = fields.Boolean(
+        description="缓存结果是否已超过缓存超时，旧结果返回后会在后台刷新",
+        allow_none=True,
+    )
     query = fields.String(
         description="已执行的查询语句", required=True, allow_none=False,
     )
@@ -1105,6 +1113,9 @@ class ChartDataResponseResult(Schema):
     rowcount = fields.Integer(
         description="结果集中的行数", allow_none=False,
     )
+    duration_ms = fields.Float(
+        description="获取该查询结果的耗时（毫秒）", allow_none=True,
+    )
     data = fields.List(fields.Dict(), description="结果的列表")
     applied_filters = fields.List(
         fields.Dict(), description="应用的过滤器列表"
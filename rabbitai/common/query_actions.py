@@ -2,14 +2,17 @@
 
 import copy
 import math
-from typing import Any, Callable, cast, Dict, List, Optional, TYPE_CHECKING
+from typing import Any, Callable, cast, Dict, List, Optional, Tuple, TYPE_CHECKING
 
+import pandas as pd
 from flask_babel import _
 
 from rabbitai import app
+from rabbitai.charts.post_processing import post_process_df
 from rabbitai.connectors.base.models import BaseDatasource
 from rabbitai.exceptions import QueryObjectValidationError
 from rabbitai.utils.core import (
+    ChartDataResultFormat,
     ChartDataResultType,
     extract_column_dtype,
     extract_dataframe_dtypes,
@@ -105,6 +108,42 @@ def _get_query(
     return result
 
 
+def _post_process(
+    query_context: "QueryContext", df: pd.DataFrame, payload: Dict[str, Any],
+) -> Tuple[pd.DataFrame, QueryStatus]:
+    """
+    在格式化之前按图表类型对查询结果执行后处理（如透视表），
+    后处理失败时将错误写入载荷。
+
+    :param query_context: 查询上下文。
+    :param df: 查询结果。
+    :param payload: 查询结果载荷。
+    :return: 后处理后的数据帧和查询状态。
+    """
+
+    try:
+        df = post_process_df(
+            df,
+            cast(Dict[str, Any], query_context.form_data),
+            max_rows=config["PIVOT_TABLE_MAX_ROWS"],
+            max_columns=config["PIVOT_TABLE_MAX_COLUMNS"],
+        )
+    except QueryObjectValidationError as ex:
+        payload["error"] = ex.message
+        payload["status"] = QueryStatus.FAILED
+        return df, QueryStatus.FAILED
+
+    payload["rowcount"] = len(df.index)
+    # the index of post-processed data holds the row labels, which only
+    # CSV and the binary formats keep
+    if query_context.result_format in (
+        ChartDataResultFormat.JSON,
+        ChartDataResultFormat.JSON_COLUMNS,
+    ) and not isinstance(df.index, pd.RangeIndex):
+        df = df.reset_index()
+    return df, payload["status"]
+
+
 def _get_full(
     query_context: "QueryContext",
     query_obj: "QueryObject",
@@ -115,6 +154,12 @@ def _get_full(
     payload = query_context.get_df_payload(query_obj, force_cached=force_cached)
     df = payload["df"]
     status = payload["status"]
+    if (
+        result_type == ChartDataResultType.POST_PROCESSED
+        and query_context.form_data
+        and status != QueryStatus.FAILED
+    ):
+        df, status = _post_process(query_context, df, payload)
     if status != QueryStatus.FAILED:
         payload["colnames"] = list(df.columns)
         payload["coltypes"] = extract_dataframe_dtypes(df)
@@ -174,8 +219,8 @@ _result_type_functions: Dict[
     ChartDataResultType.SAMPLES: _get_samples,
     ChartDataResultType.FULL: _get_full,
     ChartDataResultType.RESULTS: _get_results,
-    # for requests for post-processed data we return the full results,
-    # and post-process it later where we have the chart context, since
+    # requests for post-processed data return the full results, post-processed
+    # according to the form data of the query context before formatting, since
     # post-processing is unique to each visualization type
     ChartDataResultType.POST_PROCESSED: _get_full,
 }
@@ -2,10 +2,13 @@ from __future__ import annotations
 
 import copy
 import logging
-from typing import Any, ClassVar, Dict, List, Optional, TYPE_CHECKING, Union
+from functools import partial
+from typing import Any, ClassVar, Dict, List, Optional, Tuple, TYPE_CHECKING, Union
 
 import numpy as np
 import pandas as pd
+import simplejson
+from flask import g
 from flask_babel import _
 from pandas import DateOffset
 from typing_extensions import TypedDict
@@ -19,11 +22,19 @@ from rabbitai.common.utils import QueryCacheManager
 from rabbitai.connectors.base.models import BaseDatasource
 from rabbitai.connectors.connector_registry import ConnectorRegistry
 from rabbitai.constants import CacheRegion
+from rabbitai.dataframe import df_to_arrow_ipc, df_to_json, df_to_parquet
 from rabbitai.exceptions import QueryObjectValidationError, RabbitaiException
 from rabbitai.extensions import cache_manager, security_manager
 from rabbitai.models.helpers import QueryResult
 from rabbitai.utils import csv
-from rabbitai.utils.cache import generate_cache_key, set_and_log_cache
+from rabbitai.utils.cache import (
+    acquire_refresh_lock,
+    generate_cache_key,
+    release_refresh_lock,
+    set_and_log_cache,
+    single_flight,
+)
+from rabbitai.utils.concurrency import preload_attributes, run_concurrently
 from rabbitai.utils.core import (
     ChartDataResultFormat,
     ChartDataResultType,
@@ -32,11 +43,13 @@ from rabbitai.utils.core import (
     error_msg_from_exception,
     get_column_names_from_metrics,
     get_metric_names,
+    get_user_id,
     normalize_dttm_col,
     QueryStatus,
     TIME_COMPARISION,
 )
 from rabbitai.utils.date_parser import get_past_or_future, normalize_time_delta
+from rabbitai.utils.dates import now_as_float
 from rabbitai.views.utils import get_viz
 
 if TYPE_CHECKING:
@@ -77,6 +90,7 @@ class QueryContext:
     - custom_cache_timeout: Optional[int]：自定义缓存超时
     - result_type: ChartDataResultType：结果类型
     - result_format: ChartDataResultFormat：结果格式，CSV或Json。
+    - form_data: Optional[Dict[str, Any]]：图表的表单数据，结果类型为 POST_PROCESSED 时用于后处理。
 
     """
 
@@ -88,6 +102,7 @@ class QueryContext:
         custom_cache_timeout: Optional[int] = None,
         result_type: Optional[ChartDataResultType] = None,
         result_format: Optional[ChartDataResultFormat] = None,
+        form_data: Optional[Dict[str, Any]] = None,
     ) -> None:
         self.datasource = ConnectorRegistry.get_datasource(
             str(datasource["type"]), int(datasource["id"]), db.session
@@ -103,6 +118,9 @@ class QueryContext:
             "result_type": self.result_type,
             "result_format": self.result_format,
         }
+        self.form_data = form_data
+        if form_data:
+            self.cache_values["form_data"] = form_data
 
     @staticmethod
     def left_join_on_dttm(left_df: pd.DataFrame, right_df: pd.DataFrame) -> pd.DataFrame:
@@ -120,107 +138,122 @@ class QueryContext:
 
     def processing_time_offsets(self, df: pd.DataFrame, query_object: QueryObject,) -> CachedTimeOffset:
         """
-        处理时间位移。
+        处理时间位移，各时间位移的查询并发执行，结果按时间位移的顺序关联。
+        在 :meth:`get_payload` 的工作线程中调用时顺序执行，不再嵌套创建线程池。
 
         :param df: 数据帧。
         :param query_object: 查询对象。
         :return:
         """
 
-        # ensure query_object is immutable
-        query_object_clone = copy.copy(query_object)
         queries = []
         cache_keys = []
 
-        time_offsets = query_object.time_offsets
-        outer_from_dttm = query_object.from_dttm
-        outer_to_dttm = query_object.to_dttm
-        for offset in time_offsets:
-            try:
-                query_object_clone.from_dttm = get_past_or_future(
-                    offset, outer_from_dttm,
-                )
-                query_object_clone.to_dttm = get_past_or_future(offset, outer_to_dttm)
-            except ValueError as ex:
-                raise QueryObjectValidationError(str(ex))
-            # make sure subquery use main query where clause
-            query_object_clone.inner_from_dttm = outer_from_dttm
-            query_object_clone.inner_to_dttm = outer_to_dttm
-            query_object_clone.time_offsets = []
-            query_object_clone.post_processing = []
-
-            if not query_object.from_dttm or not query_object.to_dttm:
-                raise QueryObjectValidationError(
-                    _(
-                        "An enclosed time range (both start and end) must be specified "
-                        "when using a Time Comparison."
-                    )
-                )
-            # `offset` is added to the hash function
-            cache_key = self.query_cache_key(query_object_clone, time_offset=offset)
-            cache = QueryCacheManager.get(cache_key, CacheRegion.DATA, self.force)
-            # whether hit in the cache
-            if cache.is_loaded:
-                df = self.left_join_on_dttm(df, cache.df)
-                queries.append(cache.query)
-                cache_keys.append(cache_key)
-                continue
-
-            query_object_clone_dct = query_object_clone.to_dict()
-            result = self.datasource.query(query_object_clone_dct)
-            queries.append(result.query)
-            cache_keys.append(None)
-
-            # rename metrics: SUM(value) => SUM(value) 1 year ago
-            columns_name_mapping = {
-                metric: TIME_COMPARISION.join([metric, offset])
-                for metric in get_metric_names(
-                    query_object_clone_dct.get("metrics", [])
-                )
-            }
-            columns_name_mapping[DTTM_ALIAS] = DTTM_ALIAS
+        offset_results = run_concurrently(
+            [
+                partial(self.get_time_offset_df, query_object, offset)
+                for offset in query_object.time_offsets
+            ],
+            self.max_workers,
+        )
+        for offset_metrics_df, query, cache_key in offset_results:
+            # df left join `offset_metrics_df` on `DTTM`
+            df = self.left_join_on_dttm(df, offset_metrics_df)
+            queries.append(query)
+            cache_keys.append(cache_key)
 
-            offset_metrics_df = result.df
-            if offset_metrics_df.empty:
-                offset_metrics_df = pd.DataFrame(
-                    {col: [np.NaN] for col in columns_name_mapping.values()}
-                )
-            else:
-                # 1. normalize df, set dttm column
-                offset_metrics_df = self.normalize_df(
-                    offset_metrics_df, query_object_clone
-                )
+        return CachedTimeOffset(df=df, queries=queries, cache_keys=cache_keys)
 
-                # 2. extract `metrics` columns and `dttm` column from extra query
-                offset_metrics_df = offset_metrics_df[columns_name_mapping.keys()]
+    def get_time_offset_df(
+        self, query_object: QueryObject, offset: str
+    ) -> Tuple[pd.DataFrame, str, Optional[str]]:
+        """
+        获取指定时间位移的指标数据帧，优先从缓存中读取。
 
-                # 3. rename extra query columns
-                offset_metrics_df = offset_metrics_df.rename(
-                    columns=columns_name_mapping
+        :param query_object: 查询对象。
+        :param offset: 时间位移。
+        :return: 指标数据帧、执行的查询语句和命中的缓存键组成的元组。
+        """
+
+        # ensure query_object is immutable
+        query_object_clone = copy.copy(query_object)
+        outer_from_dttm = query_object.from_dttm
+        outer_to_dttm = query_object.to_dttm
+        try:
+            query_object_clone.from_dttm = get_past_or_future(
+                offset, outer_from_dttm,
+            )
+            query_object_clone.to_dttm = get_past_or_future(offset, outer_to_dttm)
+        except ValueError as ex:
+            raise QueryObjectValidationError(str(ex))
+        # make sure subquery use main query where clause
+        query_object_clone.inner_from_dttm = outer_from_dttm
+        query_object_clone.inner_to_dttm = outer_to_dttm
+        query_object_clone.time_offsets = []
+        query_object_clone.post_processing = []
+
+        if not query_object.from_dttm or not query_object.to_dttm:
+            raise QueryObjectValidationError(
+                _(
+                    "An enclosed time range (both start and end) must be specified "
+                    "when using a Time Comparison."
                 )
+            )
+        # `offset` is added to the hash function
+        cache_key = self.query_cache_key(query_object_clone, time_offset=offset)
+        cache = QueryCacheManager.get(cache_key, CacheRegion.DATA, self.force)
+        # whether hit in the cache
+        if cache.is_loaded:
+            if cache.is_stale:
+                self.refresh_stale_cache()
+            return cache.df, cache.query, cache_key
+
+        query_object_clone_dct = query_object_clone.to_dict()
+        result = self.datasource.query(query_object_clone_dct)
+
+        # rename metrics: SUM(value) => SUM(value) 1 year ago
+        columns_name_mapping = {
+            metric: TIME_COMPARISION.join([metric, offset])
+            for metric in get_metric_names(query_object_clone_dct.get("metrics", []))
+        }
+        columns_name_mapping[DTTM_ALIAS] = DTTM_ALIAS
 
-                # 4. set offset for dttm column
-                offset_metrics_df[DTTM_ALIAS] = offset_metrics_df[
-                    DTTM_ALIAS
-                ] - DateOffset(**normalize_time_delta(offset))
+        offset_metrics_df = result.df
+        if offset_metrics_df.empty:
+            offset_metrics_df = pd.DataFrame(
+                {col: [np.NaN] for col in columns_name_mapping.values()}
+            )
+        else:
+            # 1. normalize df, set dttm column
+            offset_metrics_df = self.normalize_df(
+                offset_metrics_df, query_object_clone
+            )
 
-            # df left join `offset_metrics_df` on `DTTM`
-            df = self.left_join_on_dttm(df, offset_metrics_df)
+            # 2. extract `metrics` columns and `dttm` column from extra query
+            offset_metrics_df = offset_metrics_df[columns_name_mapping.keys()]
+
+            # 3. rename extra query columns
+            offset_metrics_df = offset_metrics_df.rename(columns=columns_name_mapping)
 
-            # set offset df to cache.
-            value = {
-                "df": offset_metrics_df,
-                "query": result.query,
-            }
-            cache.set(
-                key=cache_key,
-                value=value,
-                timeout=self.cache_timeout,
-                datasource_uid=self.datasource.uid,
-                region=CacheRegion.DATA,
+            # 4. set offset for dttm column
+            offset_metrics_df[DTTM_ALIAS] = offset_metrics_df[DTTM_ALIAS] - DateOffset(
+                **normalize_time_delta(offset)
             )
 
-        return CachedTimeOffset(df=df, queries=queries, cache_keys=cache_keys)
+        # set offset df to cache.
+        value = {
+            "df": offset_metrics_df,
+            "query": result.query,
+        }
+        cache.set(
+            key=cache_key,
+            value=value,
+            timeout=self.cache_timeout,
+            datasource_uid=self.datasource.uid,
+            region=CacheRegion.DATA,
+        )
+
+        return offset_metrics_df, result.query, None
 
     def normalize_df(self, df: pd.DataFrame, query_object: QueryObject) -> pd.DataFrame:
         """
@@ -303,10 +336,16 @@ class QueryContext:
                 # will stay as strings if conversion fails
                 df[col] = df[col].infer_objects()
 
-    def get_data(self, df: pd.DataFrame,) -> Union[str, List[Dict[str, Any]]]:
+    def get_data(
+        self, df: pd.DataFrame,
+    ) -> Union[str, bytes, List[Dict[str, Any]], simplejson.RawJSON]:
         """
         转换指定数据帧为字典形式。
 
+        结果格式为 ``json_columns`` 时直接编码为列式 JSON，
+        返回的 ``RawJSON`` 由 simplejson 原样写入响应；
+        结果格式为 ``arrow`` 或 ``parquet`` 时编码为二进制。
+
         :param df:
         :return:
         """
@@ -318,6 +357,15 @@ class QueryContext:
             )
             return result or ""
 
+        if self.result_format == ChartDataResultFormat.JSON_COLUMNS:
+            return simplejson.RawJSON(df_to_json(df, orient="columns"))
+
+        if self.result_format == ChartDataResultFormat.ARROW:
+            return df_to_arrow_ipc(df)
+
+        if self.result_format == ChartDataResultFormat.PARQUET:
+            return df_to_parquet(df)
+
         return df.to_dict(orient="records")
 
     def get_payload(self, cache_query_context: Optional[bool] = False, force_cached: bool = False,) -> Dict[str, Any]:
@@ -329,13 +377,16 @@ class QueryContext:
         :return:
         """
 
-        # Get all the payloads from the QueryObjects
-        query_results = [
-            get_query_results(
-                query_obj.result_type or self.result_type, self, query_obj, force_cached
-            )
-            for query_obj in self.queries
-        ]
+        # Get all the payloads from the QueryObjects, independent query objects
+        # are executed concurrently and the results keep the order of the queries
+        self.preload_datasource()
+        query_results = run_concurrently(
+            [
+                partial(self.get_timed_query_results, query_obj, force_cached)
+                for query_obj in self.queries
+            ],
+            self.max_workers,
+        )
         return_value = {"queries": query_results}
 
         if cache_query_context:
@@ -350,6 +401,58 @@ class QueryContext:
 
         return return_value
 
+    def get_timed_query_results(
+        self, query_obj: QueryObject, force_cached: bool = False
+    ) -> Dict[str, Any]:
+        """
+        获取指定查询对象的结果，并记录其耗时（毫秒）。
+
+        :param query_obj: 查询对象。
+        :param force_cached: 是否强制缓存。
+        :return:
+        """
+
+        start = now_as_float()
+        query_result = get_query_results(
+            query_obj.result_type or self.result_type, self, query_obj, force_cached
+        )
+        query_result["duration_ms"] = round(now_as_float() - start, 2)
+        return query_result
+
+    def preload_datasource(self) -> None:
+        """
+        预先加载数据源、数据库、列和指标的属性以及当前用户的角色。
+
+        并发执行查询时，工作线程会访问调用方会话中的 ORM 对象，
+        预先加载可以避免多个线程同时通过同一会话延迟加载。
+        """
+
+        if self.max_workers <= 1:
+            return
+        columns = list(getattr(self.datasource, "columns", []))
+        metrics = list(getattr(self.datasource, "metrics", []))
+        preload_attributes(
+            self.datasource,
+            getattr(self.datasource, "database", None),
+            *columns,
+            *metrics,
+        )
+        user = getattr(g, "user", None)
+        if user and not user.is_anonymous:
+            list(user.roles)
+
+    @property
+    def max_workers(self) -> int:
+        """
+        获取并发执行查询的最大线程数，可通过数据库额外参数 ``query_concurrency`` 为每个数据库单独配置。
+        """
+
+        database = getattr(self.datasource, "database", None)
+        extra = database.get_extra() if database else {}
+        return int(
+            extra.get("query_concurrency", config["CHART_DATA_QUERY_CONCURRENCY"])
+        )
+
     @property
     def cache_timeout(self) -> int:
         """获取缓存超时。"""
@@ -501,35 +604,44 @@ class QueryContext:
         cache = QueryCacheManager.get(cache_key, CacheRegion.DATA, self.force, force_cached,)
 
         if query_obj and cache_key and not cache.is_loaded:
-            try:
-                invalid_columns = [
-                    col
-                    for col in query_obj.columns
-                    + query_obj.groupby
-                    + get_column_names_from_metrics(query_obj.metrics or [])
-                    if col not in self.datasource.column_names and col != DTTM_ALIAS
-                ]
-                if invalid_columns:
-                    raise QueryObjectValidationError(
-                        _(
-                            "Columns missing in datasource: %(invalid_columns)s",
-                            invalid_columns=invalid_columns,
+            with single_flight(cache_manager.data_cache, cache_key) as waited:
+                if waited:
+                    # another worker computed the same key meanwhile
+                    cache = QueryCacheManager.get(cache_key, CacheRegion.DATA)
+                if not cache.is_loaded:
+                    try:
+                        invalid_columns = [
+                            col
+                            for col in query_obj.columns
+                            + query_obj.groupby
+                            + get_column_names_from_metrics(query_obj.metrics or [])
+                            if col not in self.datasource.column_names
+                            and col != DTTM_ALIAS
+                        ]
+                        if invalid_columns:
+                            raise QueryObjectValidationError(
+                                _(
+                                    "Columns missing in datasource: %(invalid_columns)s",
+                                    invalid_columns=invalid_columns,
+                                )
+                            )
+                        query_result = self.get_query_result(query_obj)
+                        annotation_data = self.get_annotation_data(query_obj)
+                        cache.set_query_result(
+                            key=cache_key,
+                            query_result=query_result,
+                            annotation_data=annotation_data,
+                            force_query=self.force,
+                            timeout=self.cache_timeout,
+                            datasource_uid=self.datasource.uid,
+                            region=CacheRegion.DATA,
                         )
-                    )
-                query_result = self.get_query_result(query_obj)
-                annotation_data = self.get_annotation_data(query_obj)
-                cache.set_query_result(
-                    key=cache_key,
-                    query_result=query_result,
-                    annotation_data=annotation_data,
-                    force_query=self.force,
-                    timeout=self.cache_timeout,
-                    datasource_uid=self.datasource.uid,
-                    region=CacheRegion.DATA,
-                )
-            except QueryObjectValidationError as ex:
-                cache.error_message = str(ex)
-                cache.status = QueryStatus.FAILED
+                    except QueryObjectValidationError as ex:
+                        cache.error_message = str(ex)
+                        cache.status = QueryStatus.FAILED
+
+        if cache_key and cache.is_stale:
+            self.refresh_stale_cache()
 
         return {
             "cache_key": cache_key,
@@ -539,12 +651,40 @@ class QueryContext:
             "annotation_data": cache.annotation_data,
             "error": cache.error_message,
             "is_cached": cache.is_cached,
+            "is_stale": cache.is_stale,
             "query": cache.query,
             "status": cache.status,
             "stacktrace": cache.stacktrace,
             "rowcount": len(cache.df.index),
         }
 
+    def refresh_stale_cache(self) -> None:
+        """
+        通过 Celery 在后台刷新已超过软超时的数据缓存。
+
+        刷新任务强制重新执行整个查询上下文，包括各查询对象和时间位移的查询，
+        因此刷新锁以查询上下文的缓存键为键，每个查询上下文同时只有一个刷新任务。
+
+        :return:
+        """
+
+        # pylint: disable=import-outside-toplevel
+        from rabbitai.tasks.async_queries import refresh_chart_data_cache
+
+        cache_key = self.cache_key()
+        lock_key = acquire_refresh_lock(cache_manager.data_cache, cache_key)
+        if not lock_key:
+            return
+
+        try:
+            user_id = get_user_id()
+            refresh_chart_data_cache.delay(self.cache_values, user_id, lock_key)
+            stats_logger.incr("stale_cache_refresh")
+        except Exception as ex:  # pylint: disable=broad-except
+            logger.warning("Could not schedule cache refresh for key %s", cache_key)
+            logger.exception(ex)
+            release_refresh_lock(cache_manager.data_cache, lock_key)
+
     def raise_for_access(self) -> None:
         """
         Raise an exception if the user cannot access the resource.
@@ -12,7 +12,7 @@ from rabbitai.exceptions import CacheLoadError
 from rabbitai.extensions import cache_manager
 from rabbitai.models.helpers import QueryResult
 from rabbitai.stats_logger import BaseStatsLogger
-from rabbitai.utils.cache import set_and_log_cache
+from rabbitai.utils.cache import get_cache_value, is_stale, set_and_log_cache
 from rabbitai.utils.core import error_msg_from_exception, get_stacktrace, QueryStatus
 
 config = app.config
@@ -41,6 +41,7 @@ class QueryCacheManager:
     - is_cached: Optional[bool] = None,
     - cache_dttm: Optional[str] = None,
     - cache_value: Optional[Dict[str, Any]] = None,
+    - is_stale: bool = False,
 
     """
 
@@ -56,6 +57,7 @@ class QueryCacheManager:
         is_cached: Optional[bool] = None,
         cache_dttm: Optional[str] = None,
         cache_value: Optional[Dict[str, Any]] = None,
+        is_stale: bool = False,
     ) -> None:
         """
 
@@ -69,6 +71,7 @@ class QueryCacheManager:
         :param is_cached: 是否已缓存。
         :param cache_dttm: 缓存时间。
         :param cache_value: 缓存值。
+        :param is_stale: 缓存值是否已超过软超时。
         """
         self.df = df
         self.query = query
@@ -81,6 +84,7 @@ class QueryCacheManager:
         self.is_cached = is_cached
         self.cache_dttm = cache_dttm
         self.cache_value = cache_value
+        self.is_stale = is_stale
 
     def set_query_result(
         self,
@@ -160,7 +164,7 @@ class QueryCacheManager:
         if not key or not _cache[region] or force_query:
             return query_cache
 
-        cache_value = _cache[region].get(key)
+        cache_value = get_cache_value(_cache[region], key)
         if cache_value:
             logger.info("Cache key: %s", key)
             stats_logger.incr("loading_from_cache")
@@ -175,7 +179,10 @@ class QueryCacheManager:
                     cache_value["dttm"] if cache_value is not None else None
                 )
                 query_cache.cache_value = cache_value
+                query_cache.is_stale = is_stale(cache_value)
                 stats_logger.incr("loaded_from_cache")
+                if query_cache.is_stale:
+                    stats_logger.incr("loaded_stale_from_cache")
             except KeyError as ex:
                 logger.exception(ex)
                 logger.error(
@@ -212,4 +219,13 @@ class QueryCacheManager:
         """
 
         if key:
-            set_and_log_cache(_cache[region], key, value, timeout, datasource_uid)
+            set_and_log_cache(
+                _cache[region],
+                key,
+                value,
+                timeout,
+                datasource_uid,
+                stale_timeout=config["DATA_CACHE_STALE_TIMEOUT"]
+                if region == CacheRegion.DATA
+                else None,
+            )
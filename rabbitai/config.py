@@ -45,12 +45,19 @@ if TYPE_CHECKING:
 
     from rabbitai.connectors.sqla.models import (SqlaTable, )
     from rabbitai.models.core import Database
+    from rabbitai.utils.cache_codec import CacheCodec
 
 # 实时性能统计日志，StatsD 模块实现
 STATS_LOGGER = DummyStatsLogger()
 """基于 StatsD 模块实现的性能统计日志记录器"""
 EVENT_LOGGER = DBEventLogger()
 """数据库事件日志记录器"""
+# 负载较高时可使用异步批量写入的事件日志记录器，请求不再等待日志写入数据库，
+# 队列已满时丢弃新的记录（性能统计 event_logger.dropped）：
+# from rabbitai.utils.log import AsyncDBEventLogger
+# EVENT_LOGGER = AsyncDBEventLogger(
+#     max_queue_size=10000, batch_size=500, flush_interval=1.0
+# )
 
 RABBITAI_LOG_VIEW = True
 """是否日志视图，默认True。"""
@@ -135,6 +142,13 @@ SAMPLES_ROW_LIMIT = 1000
 
 FILTER_SELECT_ROW_LIMIT = 10000
 """过滤器选择自动完成检索的最大行数，默认1万行。"""
+
+CHART_DATA_QUERY_CONCURRENCY = 1
+"""
+单个图表数据请求中并发执行查询的最大线程数，包括查询上下文中的各查询对象及其时间比较查询，默认1，即顺序执行。
+
+可通过数据库额外参数（extra）中的 ``query_concurrency`` 为每个数据库单独配置。
+"""
 RABBITAI_WORKERS = 2  # deprecated
 RABBITAI_CELERY_WORKERS = 32  # deprecated
 
@@ -522,6 +536,23 @@ SCREENSHOT_SELENIUM_RETRIES = 5
 SCREENSHOT_SELENIUM_HEADSTART = 3
 # Wait for the chart animation, in seconds
 SCREENSHOT_SELENIUM_ANIMATION_WAIT = 5
+# Instead of the fixed headstart and animation sleeps, take screenshots of the
+# element until two consecutive ones are identical (loading and animations are
+# done), for at most SCREENSHOT_SELENIUM_ANIMATION_WAIT seconds
+SCREENSHOT_SELENIUM_WAIT_FOR_STABLE = True
+# Interval between the screenshots compared above, in seconds
+SCREENSHOT_SELENIUM_STABLE_INTERVAL = 0.5
+
+# Max number of authenticated webdrivers kept per worker process and reused across
+# screenshots of the same user, set to 0 to create a webdriver per screenshot
+WEBDRIVER_POOL_SIZE = 2
+# Recycle a pooled webdriver after this many screenshots
+WEBDRIVER_POOL_MAX_USES = 50
+# Recycle a pooled webdriver after this many seconds, should be shorter than the
+# login session lifetime
+WEBDRIVER_POOL_MAX_AGE = int(timedelta(hours=1).total_seconds())
+# Time to wait for a pooled webdriver when all of them are in use, in seconds
+WEBDRIVER_POOL_WAIT_TIMEOUT = int(timedelta(minutes=2).total_seconds())
 
 # endregion
 
@@ -552,9 +583,54 @@ CACHE_CONFIG: CacheConfig = {"CACHE_TYPE": "null", "CACHE_NO_NULL_WARNING": True
 # 数据源元数据和查询结果的缓存
 DATA_CACHE_CONFIG: CacheConfig = {"CACHE_TYPE": "null", "CACHE_NO_NULL_WARNING": True}
 
+# 合并相同数据缓存键的并发计算（single-flight）：缓存未命中时，只有持有锁的工作进程执行查询，
+# 其它请求等待并读取其写入的缓存结果。锁存储在数据缓存后端中，同一进程内的线程先通过本地锁合并。
+DATA_CACHE_SINGLE_FLIGHT = False
+# 锁的过期时间（秒），应大于最慢查询的耗时，避免持锁进程异常退出后锁无法释放
+DATA_CACHE_SINGLE_FLIGHT_LOCK_TIMEOUT = int(timedelta(minutes=5).total_seconds())
+# 等待其它进程计算结果的最长时间（秒），超时后自行执行查询
+DATA_CACHE_SINGLE_FLIGHT_WAIT_TIMEOUT = int(timedelta(minutes=1).total_seconds())
+
+# 数据缓存过期后仍可返回旧数据的时长（秒），即 stale-while-revalidate 模式。
+# 设置后，数据缓存条目在缓存超时（软超时）后仍保留该时长（硬超时），期间读取时直接返回旧数据
+# 并标记 is_stale，同时通过 Celery 在后台刷新缓存（每个缓存键同时只有一个刷新任务）。
+# 为 None 时缓存超时后直接失效。
+DATA_CACHE_STALE_TIMEOUT: Optional[int] = None
+
+# 数据缓存中数据帧的编解码器，为 None 时缓存后端直接序列化（pickle）整个缓存值。
+# 使用 Arrow IPC 格式（可选 lz4 或 zstd 压缩）可以减小缓存条目并加快读取，例如：
+#
+# from rabbitai.utils.cache_codec import ArrowCacheCodec
+# DATA_CACHE_CODEC = ArrowCacheCodec(compression="zstd")
+#
+# 读取时按条目写入时的编解码器解码，修改此配置不会使已有缓存失效。
+DATA_CACHE_CODEC: Optional["CacheCodec"] = None
+
+# 用户权限索引（角色授予的权限和视图菜单对）在缓存（CACHE_CONFIG）中的超时（秒），按用户角色缓存，
+# 角色或其权限变更、同步角色定义时失效。为 None 时只在同一请求内缓存。
+PERMISSIONS_CACHE_TIMEOUT: Optional[int] = None
+
+# 行级安全过滤器在缓存（CACHE_CONFIG）中的超时（秒），按用户角色和数据表缓存，
+# 过滤器或其角色、数据表变更时失效。为 None 时只在同一请求内缓存。
+RLS_FILTERS_CACHE_TIMEOUT: Optional[int] = None
+
+# 分区表元数据（分区字段和最近分区值）在数据缓存（DATA_CACHE_CONFIG）中的超时（秒），
+# 供 Presto、Hive 的 latest_partition 等宏和 where_latest_partition 使用，避免每次渲染模板都查询
+# 分区列表。同步数据表的列或调用 rabbitai.utils.partitions.invalidate_partition_cache 时失效。
+# 为 0 或 None 时不缓存。
+PARTITION_METADATA_CACHE_TIMEOUT: Optional[int] = 60
+
 # 按数据源UID（通过CacheKey）存储缓存键，以进行自定义处理/失效
 STORE_CACHE_KEYS_IN_METADATA_DB = False
 
+# 缓存预热任务（cache-warmup）在工作进程内直接执行图表查询时使用的用户名，查询按该用户的权限和
+# 行级安全过滤器执行，预热的缓存只对行级安全过滤器相同的用户命中。用户不存在时使用匿名用户。
+CACHE_WARMUP_USER = "admin"
+# 缓存预热并发执行图表查询的最大线程数
+CACHE_WARMUP_MAX_WORKERS = 4
+# 缓存预热时每个数据库同时执行的最大图表查询数
+CACHE_WARMUP_CONCURRENCY_PER_DATABASE = 2
+
 # endregion
 
 # CORS 选项
@@ -575,6 +651,19 @@ ALLOWED_EXTENSIONS = {*EXCEL_EXTENSIONS, *CSV_EXTENSIONS}
 # CSV 选项: 将作为参数传递到 DataFrame.to_csv 方法的 key/value 对。
 CSV_EXPORT = {"encoding": "utf-8"}
 
+# 透视表类图表导出（结果类型为 post_processed）时透视表的最大行数和列数，超过时查询失败，
+# 避免高基数的分组生成过大的透视表。设置为 None 时不限制。
+PIVOT_TABLE_MAX_ROWS: Optional[int] = 1_000_000
+PIVOT_TABLE_MAX_COLUMNS: Optional[int] = 10_000
+
+# 以流的形式导出 SQL Lab 的 CSV：分批从游标（或结果后端）读取数据，逐块转义并写入分块传输的响应，
+# 避免在内存中构建整个文件。客户端支持时可使用 gzip 压缩。
+CSV_STREAMING_EXPORT = False
+# 流式导出时每批的行数
+CSV_STREAMING_BATCH_SIZE = 10000
+# 流式导出时，客户端支持 gzip 则压缩响应
+CSV_STREAMING_GZIP = True
+
 # region 时间粒度配置
 # ---------------------------------------------------
 # 应用程序中要禁用的时间粒度列表 (详见 rabbitai/db_engine_specs.builtin_time_grains 中定义的时间粒度)。
@@ -732,6 +821,17 @@ SQL_MAX_ROW = 100000
 # exported CSVs
 DISPLAY_MAX_ROW = 10000
 
+# Number of rows pulled from the cursor per ``fetchmany`` call when streaming
+# query results into Arrow record batches, in SQL Lab and when loading chart data.
+# Rows are converted batch by batch, so only the columnar data is held in memory.
+# Set to None to fetch the whole result at once.
+RESULTS_FETCH_BATCH_SIZE: Optional[int] = None
+
+# Upper bound, in bytes, of the Arrow data accumulated for a single result set
+# while streaming (requires RESULTS_FETCH_BATCH_SIZE). The query fails with a
+# RESULTS_TOO_LARGE_ERROR once it is exceeded instead of exhausting worker memory.
+RESULTS_FETCH_MAX_BYTES: Optional[int] = None
+
 # Default row limit for SQL Lab queries. Is overridden by setting a new limit in
 # the SQL Lab UI
 DEFAULT_SQLLAB_LIMIT = 1000
@@ -797,6 +897,11 @@ ESTIMATE_QUERY_COST = False
 # Flag that controls if limit should be enforced on the CTA (create table as queries).
 SQLLAB_CTAS_NO_LIMIT = False
 
+# Upper bound (in estimated bytes) of the in-process LRU cache of parsed SQL
+# statements, shared by every ParsedQuery built from the same text during
+# validation, limiting and access checks. Set to 0 to disable the cache.
+SQL_PARSE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
 # This allows you to define custom logic around the "CREATE TABLE AS" or CTAS feature
 # in SQL Lab that defines where the target schema should be for a given user.
 # Database `CTAS Schema` has a precedence over this setting.
@@ -830,6 +935,20 @@ RESULTS_BACKEND: Optional[BaseCache] = None
 # in order to disable should breaking issues be discovered.
 RESULTS_BACKEND_USE_MSGPACK = True
 
+# When set, SQL Lab stores query results in the results backend as separate
+# Arrow chunks of this many rows, next to a small entry holding the metadata.
+# The results endpoint then only fetches the chunks covering the requested
+# `offset`/`rows` page. Requires RESULTS_BACKEND_USE_MSGPACK.
+RESULTS_BACKEND_CHUNK_ROWS: Optional[int] = None
+
+# Compression of the payloads written to the results backend: "zstd", "lz4",
+# "gzip" or "brotli" (as supported by the installed pyarrow), or None to keep
+# writing the legacy zlib format. Payloads are tagged with the codec, so
+# entries written with another setting remain readable.
+RESULTS_BACKEND_COMPRESSION: Optional[str] = "zstd"
+# Compression level passed to the codec, None uses the codec default.
+RESULTS_BACKEND_COMPRESSION_LEVEL: Optional[int] = None
+
 # The S3 bucket where you want to store your external hive tables created
 # from CSV files. For example, 'companyname-rabbitai'
 CSV_TO_HIVE_UPLOAD_S3_BUCKET = None
@@ -880,6 +999,11 @@ CSV_DEFAULT_NA_NAMES = list(STR_NA_VALUES)
 # return native types.
 JINJA_CONTEXT_ADDONS: Dict[str, Callable[..., Any]] = {}
 
+# Number of compiled Jinja templates (per template processor type) kept in an
+# in-process LRU cache, so virtual dataset SQL is not parsed and compiled again
+# on every chart query. Set to 0 to disable the cache.
+JINJA_TEMPLATE_CACHE_SIZE = 1000
+
 # A dictionary of macro template processors (by engine) that gets merged into global
 # template processors. The existing template processors get updated with this
 # dictionary, which means the existing keys get overwritten by the content of this
@@ -984,6 +1108,23 @@ DASHBOARD_TEMPLATE_ID = None
 # as such `create_engine(url, **params)`
 DB_CONNECTION_MUTATOR = None
 
+# Reuse SQLAlchemy engines, and their connection pools, across queries instead of
+# creating a NullPool engine on every call. Engines are cached per process and keyed
+# on the resolved connection URL, the effective (impersonated) user and the params
+# returned by DB_CONNECTION_MUTATOR. Pool sizing can be tuned per database through
+# the `pool_size`, `max_overflow`, `pool_timeout` and `pool_recycle` keys of
+# `extra.engine_params`, falling back to SQLALCHEMY_ENGINE_POOL_DEFAULTS.
+# SQL Lab queries run in Celery workers keep using NullPool.
+SQLALCHEMY_ENGINE_POOLING = False
+SQLALCHEMY_ENGINE_POOL_DEFAULTS: Dict[str, Any] = {
+    "pool_size": 5,
+    "max_overflow": 10,
+    "pool_recycle": 3600,
+    "pool_pre_ping": True,
+}
+# Pooled engines that have not been used for this many seconds are disposed
+SQLALCHEMY_ENGINE_POOL_IDLE_TIMEOUT = int(timedelta(minutes=10).total_seconds())
+
 # A function that intercepts the SQL to be executed and can alter it.
 # The use case is can be around adding some sort of comment header
 # with information such as the username and worker node information
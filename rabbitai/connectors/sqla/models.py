@@ -20,6 +20,7 @@ from typing import (
     Union,
 )
 
+import numpy as np
 import pandas as pd
 import sqlalchemy as sa
 import sqlparse
@@ -63,8 +64,8 @@ from rabbitai.db_engine_specs.base import BaseEngineSpec, TimestampExpression
 from rabbitai.exceptions import QueryObjectValidationError
 from rabbitai.jinja_context import (
     BaseTemplateProcessor,
-    ExtraCache,
     get_template_processor,
+    has_extra_cache_calls,
 )
 from rabbitai.models.annotations import Annotation
 from rabbitai.models.core import Database
@@ -77,6 +78,7 @@ from rabbitai.utils.core import (
     QueryObjectFilterClause,
     remove_duplicates,
 )
+from rabbitai.utils.partitions import invalidate_partition_cache
 
 config = app.config
 metadata = Model.metadata
@@ -778,7 +780,11 @@ class SqlaTable(Model, BaseDatasource):
 
     def values_for_column(self, column_name: str, limit: int = 10000) -> List[Any]:
         """Runs query against sqla to retrieve some
-        sample values for the given column.
+        sample values for the given column, restricted by the fetch values
+        predicate and the row level security filters of the current user.
+
+        Use `rabbitai.utils.distinct_values.get_distinct_values` to get the
+        values through the cache.
         """
         cols = {col.column_name: col for col in self.columns}
         target_col = cols[column_name]
@@ -794,6 +800,8 @@ class SqlaTable(Model, BaseDatasource):
 
         if self.fetch_values_predicate:
             qry = qry.where(self.get_fetch_values_predicate())
+        if is_feature_enabled("ROW_LEVEL_SECURITY"):
+            qry = qry.where(and_(*self._get_sqla_row_level_filters(tp)))
 
         engine = self.database.get_sqla_engine()
         sql = "{}".format(qry.compile(engine, compile_kwargs={"literal_binds": True}))
@@ -1479,18 +1487,72 @@ class SqlaTable(Model, BaseDatasource):
             )
         return ob
 
+    @staticmethod
+    def _get_eq_predicate(expr: ColumnElement, value: Any) -> ColumnElement:
+        """
+        Build an equality predicate, or ``IS NULL`` for a missing value.
+
+        :param expr: column expression
+        :param value: value of the column
+        :return: predicate matching the value
+        """
+        if pd.isnull(value):
+            return expr.is_(None)
+        # bind native Python values rather than numpy scalars
+        if isinstance(value, np.generic):
+            value = value.item()
+        return expr == value
+
+    @staticmethod
+    def _get_in_predicate(expr: ColumnElement, values: pd.Series) -> ColumnElement:
+        """
+        Build an ``IN`` predicate for the values, with ``IS NULL`` for missing values.
+
+        :param expr: column expression
+        :param values: values of the column
+        :return: predicate matching any of the values
+        """
+        not_null = values[values.notnull()].drop_duplicates().tolist()
+        clauses = [expr.in_(not_null)] if not_null else []
+        if values.isnull().any():
+            clauses.append(expr.is_(None))
+        return or_(*clauses)
+
     def _get_top_groups(
         self,
         df: pd.DataFrame,
         dimensions: List[str],
         groupby_exprs: "OrderedDict[str, Any]",
     ) -> ColumnElement:
+        """
+        Build the predicate restricting a query to the groups of the prequery.
+
+        The predicate is built column-wise: a single dimension becomes an ``IN``
+        list, while for several dimensions the groups sharing the values of all
+        but the last dimension are merged into one branch with an ``IN`` list for
+        the last dimension, so the ``OR`` chain has one branch per distinct prefix
+        instead of one per group.
+
+        :param df: result of the prequery
+        :param dimensions: dimensions of the groups
+        :param groupby_exprs: groupby expressions by dimension name
+        :return: predicate matching the top groups
+        """
+        df = df[dimensions].drop_duplicates()
+        *prefix, last = dimensions
+        if not prefix:
+            return self._get_in_predicate(groupby_exprs[last], df[last])
+
         groups = []
-        for _unused, row in df.iterrows():
-            group = []
-            for dimension in dimensions:
-                group.append(groupby_exprs[dimension] == row[dimension])
-            groups.append(and_(*group))
+        for values, group in df.groupby(prefix, sort=False, dropna=False)[last]:
+            if not isinstance(values, tuple):
+                values = (values,)
+            group_filter = [
+                self._get_eq_predicate(groupby_exprs[dimension], value)
+                for dimension, value in zip(prefix, values)
+            ]
+            group_filter.append(self._get_in_predicate(groupby_exprs[last], group))
+            groups.append(and_(*group_filter))
 
         return or_(*groups)
 
@@ -1618,6 +1680,9 @@ class SqlaTable(Model, BaseDatasource):
         # Apply config supplied mutations.
         config["SQLA_TABLE_MUTATOR"](self)
 
+        # new partitions may come with the refreshed columns
+        invalidate_partition_cache(self.database, self.schema, self.table_name)
+
         db.session.merge(self)
         if commit:
             db.session.commit()
@@ -1669,10 +1734,9 @@ class SqlaTable(Model, BaseDatasource):
             templatable_statements += [
                 f.clause for f in security_manager.get_rls_filters(self)
             ]
-        for statement in templatable_statements:
-            if ExtraCache.regex.search(statement):
-                return True
-        return False
+        return any(
+            has_extra_cache_calls(statement) for statement in templatable_statements
+        )
 
     def get_extra_cache_keys(self, query_obj: QueryObjectDict) -> List[Hashable]:
         """
@@ -1788,3 +1852,9 @@ class RowLevelSecurityFilter(Model, AuditMixinNullable):
     )
 
     clause = Column(Text, nullable=False)
+
+
+for event_name in ("after_insert", "after_update", "after_delete"):
+    sa.event.listen(
+        RowLevelSecurityFilter, event_name, security_manager.invalidate_rls_filters
+    )
@@ -116,6 +116,7 @@ MODEL_API_RW_METHOD_PERMISSION_MAP = {
     "data_from_cache": "read",
     "get_charts": "read",
     "get_datasets": "read",
+    "bootstrap": "read",
     "function_names": "read",
     "available": "read",
     "get_data": "read",
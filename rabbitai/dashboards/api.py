@@ -2,7 +2,7 @@ import json
 import logging
 from datetime import datetime
 from io import BytesIO
-from typing import Any, Optional
+from typing import Any, Dict, List, Optional
 from zipfile import is_zipfile, ZipFile
 
 from flask import g, make_response, redirect, request, Response, send_file, url_for
@@ -55,6 +55,7 @@ from rabbitai.dashboards.schemas import (
 )
 from rabbitai.extensions import event_logger
 from rabbitai.models.dashboard import Dashboard
+from rabbitai.models.slice import Slice
 from rabbitai.tasks.thumbnails import cache_dashboard_thumbnail
 from rabbitai.utils.cache import etag_cache
 from rabbitai.utils.screenshots import DashboardScreenshot
@@ -84,6 +85,7 @@ class DashboardRestApi(BaseRabbitaiModelRestApi):
         RouteMethod.IMPORT,
         RouteMethod.RELATED,
         "bulk_delete",  # not using RouteMethod since locally defined
+        "bootstrap",
         "favorite_status",
         "get_charts",
         "get_datasets",
@@ -375,15 +377,94 @@ class DashboardRestApi(BaseRabbitaiModelRestApi):
         """
         try:
             charts = DashboardDAO.get_charts_for_dashboard(id_or_slug)
-            result = [self.chart_entity_response_schema.dump(chart) for chart in charts]
+            return self.response(200, result=self._dump_charts(charts))
+        except DashboardNotFoundError:
+            return self.response_404()
+
+    def _dump_charts(self, charts: List[Slice]) -> List[Dict[str, Any]]:
+        result = [self.chart_entity_response_schema.dump(chart) for chart in charts]
 
-            if is_feature_enabled("REMOVE_SLICE_LEVEL_LABEL_COLORS"):
-                # dashboard metadata has dashboard-level label_colors,
-                # so remove slice-level label_colors from its form_data
-                for chart in result:
-                    form_data = chart.get("form_data")
-                    form_data.pop("label_colors", None)
+        if is_feature_enabled("REMOVE_SLICE_LEVEL_LABEL_COLORS"):
+            # dashboard metadata has dashboard-level label_colors,
+            # so remove slice-level label_colors from its form_data
+            for chart in result:
+                form_data = chart.get("form_data")
+                form_data.pop("label_colors", None)
 
+        return result
+
+    @etag_cache(
+        get_last_modified=lambda _self, id_or_slug: DashboardDAO.get_dashboard_slices_and_datasets_changed_on(  # pylint: disable=line-too-long
+            id_or_slug
+        ),
+        max_age=0,
+        raise_for_access=lambda _self, id_or_slug: DashboardDAO.get_by_id_or_slug(
+            id_or_slug
+        ),
+        skip=lambda _self, id_or_slug: not is_feature_enabled("DASHBOARD_CACHE"),
+    )
+    @expose("/<id_or_slug>/bootstrap", methods=["GET"])
+    @protect()
+    @safe
+    @statsd_metrics
+    @event_logger.log_this_with_context(
+        action=lambda self, *args, **kwargs: f"{self.__class__.__name__}.bootstrap",
+        log_to_statsd=False,
+    )
+    def bootstrap(self, id_or_slug: str) -> Response:
+        """Gets everything needed to render a dashboard
+        ---
+        get:
+          description: >-
+            Returns the dashboard, its chart definitions and its datasets in a
+            single payload, loading the charts, datasets, columns and metrics
+            eagerly.
+          parameters:
+          - in: path
+            schema:
+              type: string
+            name: id_or_slug
+            description: Either the id of the dashboard, or its slug
+          responses:
+            200:
+              description: Dashboard, chart and dataset definitions
+              content:
+                application/json:
+                  schema:
+                    type: object
+                    properties:
+                      result:
+                        type: object
+                        properties:
+                          dashboard:
+                            $ref: '#/components/schemas/DashboardGetResponseSchema'
+                          charts:
+                            type: array
+                            items:
+                              $ref: '#/components/schemas/ChartEntityResponseSchema'
+                          datasets:
+                            type: array
+                            items:
+                              $ref: '#/components/schemas/DashboardDatasetSchema'
+            302:
+              description: Redirects to the current digest
+            400:
+              $ref: '#/components/responses/400'
+            401:
+              $ref: '#/components/responses/401'
+            404:
+              $ref: '#/components/responses/404'
+        """
+        try:
+            dash = DashboardDAO.get_dashboard_for_bootstrap(id_or_slug)
+            result = {
+                "dashboard": self.dashboard_get_response_schema.dump(dash),
+                "charts": self._dump_charts(dash.slices),
+                "datasets": [
+                    self.dashboard_dataset_schema.dump(dataset)
+                    for dataset in dash.datasets_trimmed_for_slices()
+                ],
+            }
             return self.response(200, result=result)
         except DashboardNotFoundError:
             return self.response_404()
@@ -57,7 +57,7 @@ class TestConnectionDatabaseCommand(BaseCommand):
             database.set_sqlalchemy_uri(uri)
             database.db_engine_spec.mutate_db_for_connection_test(database)
             username = self._actor.username if self._actor is not None else None
-            engine = database.get_sqla_engine(user_name=username)
+            engine = database.get_sqla_engine(user_name=username, nullpool=True)
             with closing(engine.raw_connection()) as conn:
                 try:
                     alive = engine.dialect.do_ping(conn)
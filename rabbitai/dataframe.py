@@ -2,12 +2,17 @@
 
 """ pandas.DataFrame 实用工具函数。"""
 
+import json
 import warnings
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import simplejson
 
-from rabbitai.utils.core import JS_MAX_INTEGER
+from rabbitai.utils.core import JS_MAX_INTEGER, json_int_dttm_ser
 
 
 def _convert_big_integers(val: Any) -> Any:
@@ -21,6 +26,38 @@ def _convert_big_integers(val: Any) -> Any:
     return str(val) if isinstance(val, int) and abs(val) > JS_MAX_INTEGER else val
 
 
+def _big_integer_mask(series: pd.Series) -> Optional[np.ndarray]:
+    """
+    返回整数列中大于 ``JS_MAX_INTEGER`` 的值的掩码，非整数列或不包含大整数时返回 None。
+
+    :param series: 数据列。
+    :returns: 布尔掩码或 None。
+    """
+
+    if series.dtype.kind not in "iu":
+        return None
+    mask = np.abs(series.to_numpy()) > JS_MAX_INTEGER
+    return mask if mask.any() else None
+
+
+def _column_to_list(series: pd.Series) -> List[Any]:
+    """
+    转换数据列为值列表，大整数按列向量化地转换为字符串，只有对象列需要逐个检查。
+
+    :param series: 数据列。
+    :returns: 值列表。
+    """
+
+    values = series.tolist()
+    if series.dtype.kind == "O":
+        return [_convert_big_integers(val) for val in values]
+
+    mask = _big_integer_mask(series)
+    if mask is None:
+        return values
+    return [str(val) if big else val for val, big in zip(values, mask)]
+
+
 def df_to_records(dframe: pd.DataFrame) -> List[Dict[str, Any]]:
     """
     转换指定数据帧 DataFrame 为记录集合，即行数据字典的列表。
@@ -37,8 +74,180 @@ def df_to_records(dframe: pd.DataFrame) -> List[Dict[str, Any]]:
         )
 
     columns = dframe.columns
+    values = [_column_to_list(dframe.iloc[:, i]) for i in range(len(columns))]
+
+    return [dict(zip(columns, row)) for row in zip(*values)]
+
+
+def _json_safe_column(series: pd.Series) -> pd.Series:
+    """
+    按列向量化地处理 JSON 不支持的值：大整数转换为字符串，正负无穷转换为空值。
+
+    :param series: 数据列。
+    :returns: 处理后的数据列。
+    """
+
+    kind = series.dtype.kind
+    if kind == "O":
+        return series.map(_convert_big_integers)
+    if kind == "f":
+        infinite = np.isinf(series.to_numpy())
+        return series.mask(infinite) if infinite.any() else series
+
+    mask = _big_integer_mask(series)
+    if mask is None:
+        return series
+    return series.astype(object).where(~mask, series.astype(str))
+
+
+def _is_json_lossless(series: pd.Series) -> bool:
+    """
+    检查浮点数列由 pandas 编码为 JSON 后能否还原为原值。
+
+    pandas 的编码器最多保留 15 位小数，而 simplejson 输出最短的往返表示（最多 17 位有效数字），
+    如 ``0.1 + 0.2`` 或很小的数值会丢失精度。
+
+    :param series: 浮点数列。
+    :returns: 是否无损。
+    """
+
+    values = series.to_numpy()
+    values = values[np.isfinite(values)]
+    if not len(values):
+        return True
+    encoded = pd.Series(values).to_json(orient="values", double_precision=15)
+    return bool((np.array(json.loads(encoded), dtype=np.float64) == values).all())
+
+
+def _df_to_json_precise(dframe: pd.DataFrame, orient: str) -> str:
+    """
+    逐行构建数据并使用 simplejson 编码为 JSON 字符串，浮点数保留完整精度。
+
+    :param dframe: 要编码的 DataFrame。
+    :param orient: 参见 :func:`df_to_json`。
+    :returns: JSON 字符串。
+    """
+
+    values = []
+    for i in range(len(dframe.columns)):
+        series = dframe.iloc[:, i]
+        if series.dtype.kind == "M":
+            values.append(series.astype(object).where(series.notna(), None).tolist())
+        else:
+            values.append(_column_to_list(series))
+
+    payload: Any
+    if orient == "columns":
+        payload = {
+            "columns": dframe.columns.tolist(),
+            "data": [list(row) for row in zip(*values)],
+        }
+    else:
+        payload = [dict(zip(dframe.columns, row)) for row in zip(*values)]
+    return simplejson.dumps(payload, default=json_int_dttm_ser, ignore_nan=True)
+
+
+def df_to_json(dframe: pd.DataFrame, orient: str = "records") -> str:
+    """
+    直接将数据帧编码为 JSON 字符串，不构建中间的记录字典列表。
+
+    转换规则与 ``json_int_dttm_ser`` 一致：日期时间转换为毫秒时间戳，
+    ``NaN`` 和正负无穷转换为 ``null``，大于 ``JS_MAX_INTEGER`` 的整数转换为字符串。
+    浮点数列的值无法以 15 位小数无损编码时，回退为逐行使用 simplejson 编码，保留完整精度。
+
+    :param dframe: 要编码的 DataFrame。
+    :param orient: ``records`` 输出记录列表，``columns`` 输出
+        ``{"columns": [...], "data": [[...], ...]}``。
+    :returns: JSON 字符串。
+    """
+
+    if not all(
+        _is_json_lossless(dframe.iloc[:, i])
+        for i in range(len(dframe.columns))
+        if dframe.dtypes.iloc[i].kind == "f"
+    ):
+        return _df_to_json_precise(dframe, orient)
+
+    dframe = pd.DataFrame(
+        {i: _json_safe_column(dframe.iloc[:, i]) for i in range(len(dframe.columns))},
+        index=dframe.index,
+    ).set_axis(dframe.columns, axis=1)
+    options: Dict[str, Any] = {
+        "date_format": "epoch",
+        "date_unit": "ms",
+        "double_precision": 15,
+        "default_handler": json_int_dttm_ser,
+    }
+    if orient == "columns":
+        return dframe.to_json(orient="split", index=False, **options)
+    return dframe.to_json(orient=orient, **options)
+
+
+def df_to_arrow_table(dframe: pd.DataFrame) -> pa.Table:
+    """
+    转换数据帧为 Arrow 表，非默认索引（如透视表的行索引）会一并保留。
+
+    Arrow 无法表示的混合类型对象列转换为字符串。
+
+    :param dframe: 要转换的 DataFrame。
+    :returns: Arrow 表。
+    """
+
+    preserve_index = not isinstance(dframe.index, pd.RangeIndex)
+    try:
+        return pa.Table.from_pandas(dframe, preserve_index=preserve_index)
+    except pa.ArrowException:
+        dframe = dframe.copy()
+        for col in dframe.columns[dframe.dtypes == object]:
+            dframe[col] = dframe[col].map(lambda val: None if val is None else str(val))
+        return pa.Table.from_pandas(dframe, preserve_index=preserve_index)
+
+
+def df_to_arrow_ipc(dframe: pd.DataFrame) -> bytes:
+    """
+    编码数据帧为 Arrow IPC 流格式。
+
+    :param dframe: 要编码的 DataFrame。
+    :returns: 二进制数据。
+    """
+
+    table = df_to_arrow_table(dframe)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def df_to_parquet(dframe: pd.DataFrame) -> bytes:
+    """
+    编码数据帧为 Parquet 格式。
+
+    :param dframe: 要编码的 DataFrame。
+    :returns: 二进制数据。
+    """
+
+    sink = pa.BufferOutputStream()
+    pq.write_table(df_to_arrow_table(dframe), sink)
+    return sink.getvalue().to_pybytes()
+
+
+def arrow_ipc_to_df(data: bytes) -> pd.DataFrame:
+    """
+    解码 Arrow IPC 流格式的数据帧。
+
+    :param data: 二进制数据。
+    :returns: DataFrame。
+    """
+
+    return pa.ipc.open_stream(data).read_all().to_pandas()
+
+
+def parquet_to_df(data: bytes) -> pd.DataFrame:
+    """
+    解码 Parquet 格式的数据帧。
+
+    :param data: 二进制数据。
+    :returns: DataFrame。
+    """
 
-    return list(
-        dict(zip(columns, map(_convert_big_integers, row)))
-        for row in zip(*[dframe[col] for col in columns])
-    )
+    return pq.read_table(pa.BufferReader(data)).to_pandas()
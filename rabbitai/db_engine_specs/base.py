@@ -9,6 +9,7 @@ from typing import (
     Any,
     Callable,
     Dict,
+    Iterator,
     List,
     Match,
     NamedTuple,
@@ -22,6 +23,7 @@ from typing import (
 )
 
 import pandas as pd
+import pyarrow as pa
 import sqlparse
 from apispec import APISpec
 from apispec.ext.marshmallow import MarshmallowPlugin
@@ -537,6 +539,53 @@ class BaseEngineSpec:
         except Exception as ex:
             raise cls.get_dbapi_mapped_exception(ex)
 
+    @classmethod
+    def fetch_data_in_batches(
+        cls, cursor: Any, limit: Optional[int] = None, batch_size: int = 10000
+    ) -> Iterator[List[Tuple[Any, ...]]]:
+        """
+        依据指定游标实例，通过 ``fetchmany`` 分批提取数据，达到最大行数后停止提取。
+
+        与 :meth:`fetch_data` 不同，调用方可以逐批处理结果而无需将全部行同时保存在内存中。
+        需要对行数据做额外转换的引擎应同时重写该方法。
+
+        :param cursor: 游标实例。
+        :param limit: 游标返回的最大行数。
+        :param batch_size: 每批提取的行数。
+        :return: 行数据批次的迭代器。
+        """
+
+        if cls.arraysize:
+            cursor.arraysize = cls.arraysize
+        fetched = 0
+        while limit is None or fetched < limit:
+            size = batch_size if limit is None else min(batch_size, limit - fetched)
+            try:
+                rows = cursor.fetchmany(size)
+            except Exception as ex:
+                raise cls.get_dbapi_mapped_exception(ex)
+            if not rows:
+                break
+            fetched += len(rows)
+            yield rows
+
+    @classmethod
+    def fetch_data_as_arrow(
+        cls, cursor: Any, limit: Optional[int] = None
+    ) -> Optional[pa.Table]:
+        """
+        依据指定游标实例，直接以 PyArrow 数据表的形式提取数据。
+
+        对于可以直接返回 Arrow 记录批次的驱动，在子类中重写该方法，从而跳过逐行构建结果集的开销。
+        返回 None 表示驱动不支持，调用方应回退到 :meth:`fetch_data`。
+
+        :param cursor: 游标实例。
+        :param limit: 游标返回的最大行数。
+        :return: PyArrow 数据表或 None。
+        """
+
+        return None
+
     @classmethod
     def expand_data(
         cls, columns: List[Dict[Any, Any]], data: List[Dict[Any, Any]]
@@ -3,7 +3,16 @@
 import re
 import urllib
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Pattern, Tuple, TYPE_CHECKING
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Pattern,
+    Tuple,
+    TYPE_CHECKING,
+)
 
 import pandas as pd
 from apispec import APISpec
@@ -190,6 +199,15 @@ class BigQueryEngineSpec(BaseEngineSpec):
             data = [r.values() for r in data]  # type: ignore
         return data
 
+    @classmethod
+    def fetch_data_in_batches(
+        cls, cursor: Any, limit: Optional[int] = None, batch_size: int = 10000
+    ) -> Iterator[List[Tuple[Any, ...]]]:
+        for data in super().fetch_data_in_batches(cursor, limit, batch_size):
+            if type(data[0]).__name__ == "Row":
+                data = [r.values() for r in data]  # type: ignore
+            yield data
+
     @staticmethod
     def _mutate_label(label: str) -> str:
         """
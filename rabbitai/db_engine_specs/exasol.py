@@ -1,4 +1,4 @@
-from typing import Any, List, Optional, Tuple
+from typing import Any, Iterator, List, Optional, Tuple
 
 from rabbitai.db_engine_specs.base import BaseEngineSpec
 
@@ -30,3 +30,10 @@ class ExasolEngineSpec(BaseEngineSpec):  # pylint: disable=abstract-method
         data = super().fetch_data(cursor, limit)
         # Lists of `pyodbc.Row` need to be unpacked further
         return cls.pyodbc_rows_to_tuples(data)
+
+    @classmethod
+    def fetch_data_in_batches(
+        cls, cursor: Any, limit: Optional[int] = None, batch_size: int = 10000
+    ) -> Iterator[List[Tuple[Any, ...]]]:
+        for data in super().fetch_data_in_batches(cursor, limit, batch_size):
+            yield cls.pyodbc_rows_to_tuples(data)
@@ -4,7 +4,7 @@ import re
 import tempfile
 import time
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
+from typing import Any, Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING
 from urllib import parse
 
 import numpy as np
@@ -147,6 +147,21 @@ class HiveEngineSpec(PrestoEngineSpec):
         except pyhive.exc.ProgrammingError:
             return []
 
+    @classmethod
+    def fetch_data_in_batches(
+        cls, cursor: Any, limit: Optional[int] = None, batch_size: int = 10000
+    ) -> Iterator[List[Tuple[Any, ...]]]:
+        import pyhive
+        from TCLIService import ttypes
+
+        state = cursor.poll()
+        if state.operationState == ttypes.TOperationState.ERROR_STATE:
+            raise Exception("Query error", state.errorMessage)
+        try:
+            yield from super().fetch_data_in_batches(cursor, limit, batch_size)
+        except pyhive.exc.ProgrammingError:
+            return
+
     @classmethod
     def df_to_sql(
         cls,
@@ -1,7 +1,7 @@
 import logging
 import re
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Pattern, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Pattern, Tuple
 
 from flask_babel import gettext as __
 
@@ -102,6 +102,13 @@ class MssqlEngineSpec(BaseEngineSpec):
         # Lists of `pyodbc.Row` need to be unpacked further
         return cls.pyodbc_rows_to_tuples(data)
 
+    @classmethod
+    def fetch_data_in_batches(
+        cls, cursor: Any, limit: Optional[int] = None, batch_size: int = 10000
+    ) -> Iterator[List[Tuple[Any, ...]]]:
+        for data in super().fetch_data_in_batches(cursor, limit, batch_size):
+            yield cls.pyodbc_rows_to_tuples(data)
+
     @classmethod
     def extract_error_message(cls, ex: Exception) -> str:
         if str(ex).startswith("(8155,"):
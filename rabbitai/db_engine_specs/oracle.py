@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Any, List, Optional, Tuple
+from typing import Any, Iterator, List, Optional, Tuple
 
 from rabbitai.db_engine_specs.base import BaseEngineSpec, LimitMethod
 from rabbitai.utils import core as utils
@@ -57,3 +57,11 @@ class OracleEngineSpec(BaseEngineSpec):
         if not cursor.description:
             return []
         return super().fetch_data(cursor, limit)
+
+    @classmethod
+    def fetch_data_in_batches(
+        cls, cursor: Any, limit: Optional[int] = None, batch_size: int = 10000
+    ) -> Iterator[List[Tuple[Any, ...]]]:
+        if not cursor.description:
+            return iter([])
+        return super().fetch_data_in_batches(cursor, limit, batch_size)
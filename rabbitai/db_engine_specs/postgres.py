@@ -6,6 +6,7 @@ from typing import (
     Any,
     Callable,
     Dict,
+    Iterator,
     List,
     Match,
     Optional,
@@ -158,6 +159,15 @@ class PostgresBaseEngineSpec(BaseEngineSpec):
             return []
         return super().fetch_data(cursor, limit)
 
+    @classmethod
+    def fetch_data_in_batches(
+        cls, cursor: Any, limit: Optional[int] = None, batch_size: int = 10000
+    ) -> Iterator[List[Tuple[Any, ...]]]:
+        cursor.tzinfo_factory = FixedOffsetTimezone
+        if not cursor.description:
+            return iter([])
+        return super().fetch_data_in_batches(cursor, limit, batch_size)
+
     @classmethod
     def epoch_to_dttm(cls) -> str:
         return "(timestamp 'epoch' + {col} * interval '1 second')"
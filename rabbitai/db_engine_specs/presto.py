@@ -872,7 +872,7 @@ class PrestoEngineSpec(BaseEngineSpec):  # pylint: disable=too-many-public-metho
     ) -> Dict[str, Any]:
         metadata = {}
 
-        indexes = database.get_indexes(table_name, schema_name)
+        indexes = cls.get_partition_indexes(table_name, schema_name, database)
         if indexes:
             cols = indexes[0].get("column_names", [])
             full_table_name = table_name
@@ -1079,7 +1079,29 @@ class PrestoEngineSpec(BaseEngineSpec):  # pylint: disable=too-many-public-metho
         return None
 
     @classmethod
-    @cache_manager.data_cache.memoize(timeout=60)
+    def get_partition_indexes(
+        cls, table_name: str, schema: Optional[str], database: "Database"
+    ) -> List[Dict[str, Any]]:
+        """Returns the indexes of a table, the first one holding the partition
+        columns. The indexes are cached together with the other partition
+        metadata for ``PARTITION_METADATA_CACHE_TIMEOUT`` seconds.
+
+        :param table_name: the name of the table
+        :param schema: schema / database / namespace
+        :param database: database query will be run against
+        :type database: models.Database
+        """
+        from rabbitai.utils.partitions import get_partition_metadata
+
+        return get_partition_metadata(
+            database,
+            schema,
+            table_name,
+            "indexes",
+            lambda: database.get_indexes(table_name, schema),
+        )
+
+    @classmethod
     def latest_partition(
         cls,
         table_name: str,
@@ -1089,6 +1111,9 @@ class PrestoEngineSpec(BaseEngineSpec):  # pylint: disable=too-many-public-metho
     ) -> Tuple[List[str], Optional[List[str]]]:
         """Returns col name and the latest (max) partition value for a table
 
+        The partition metadata is cached for ``PARTITION_METADATA_CACHE_TIMEOUT``
+        seconds, see ``rabbitai.utils.partitions``.
+
         :param table_name: the name of the table
         :param schema: schema / database / namespace
         :param database: database query will be run against
@@ -1100,7 +1125,9 @@ class PrestoEngineSpec(BaseEngineSpec):  # pylint: disable=too-many-public-metho
         >>> latest_partition('foo_table')
         (['ds'], ('2018-01-01',))
         """
-        indexes = database.get_indexes(table_name, schema)
+        from rabbitai.utils.partitions import get_partition_metadata
+
+        indexes = cls.get_partition_indexes(table_name, schema, database)
         if not indexes:
             raise RabbitaiTemplateException(
                 f"Error getting partition for {schema}.{table_name}. "
@@ -1120,10 +1147,19 @@ class PrestoEngineSpec(BaseEngineSpec):  # pylint: disable=too-many-public-metho
             )
 
         column_names = indexes[0]["column_names"]
-        part_fields = [(column_name, True) for column_name in column_names]
-        sql = cls._partition_query(table_name, database, 1, part_fields)
-        df = database.get_df(sql, schema)
-        return column_names, cls._latest_partition_from_df(df)
+
+        def load() -> Optional[List[str]]:
+            part_fields = [(column_name, True) for column_name in column_names]
+            sql = cls._partition_query(table_name, database, 1, part_fields)
+            df = database.get_df(sql, schema)
+            return cls._latest_partition_from_df(df)
+
+        return (
+            column_names,
+            get_partition_metadata(
+                database, schema, table_name, "latest_partition", load
+            ),
+        )
 
     @classmethod
     def latest_sub_partition(
@@ -1154,7 +1190,9 @@ class PrestoEngineSpec(BaseEngineSpec):  # pylint: disable=too-many-public-metho
         >>> latest_sub_partition('sub_partition_table', event_type='click')
         '2018-01-01'
         """
-        indexes = database.get_indexes(table_name, schema)
+        from rabbitai.utils.partitions import get_partition_metadata
+
+        indexes = cls.get_partition_indexes(table_name, schema, database)
         part_fields = indexes[0]["column_names"]
         for k in kwargs.keys():  # pylint: disable=consider-iterating-dictionary
             if k not in k in part_fields:  # pylint: disable=comparison-with-itself
@@ -1170,13 +1208,18 @@ class PrestoEngineSpec(BaseEngineSpec):  # pylint: disable=too-many-public-metho
             if field not in kwargs.keys():
                 field_to_return = field
 
-        sql = cls._partition_query(
-            table_name, database, 1, [(field_to_return, True)], kwargs
+        def load() -> Any:
+            sql = cls._partition_query(
+                table_name, database, 1, [(field_to_return, True)], kwargs
+            )
+            df = database.get_df(sql, schema)
+            if df.empty:
+                return ""
+            return df.to_dict()[field_to_return][0]
+
+        return get_partition_metadata(
+            database, schema, table_name, "latest_sub_partition", load, kwargs
         )
-        df = database.get_df(sql, schema)
-        if df.empty:
-            return ""
-        return df.to_dict()[field_to_return][0]
 
     @classmethod
     @cache_manager.data_cache.memoize()
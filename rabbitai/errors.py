@@ -63,6 +63,7 @@ class RabbitaiErrorType(str, Enum):
     SQLLAB_TIMEOUT_ERROR = "SQLLAB_TIMEOUT_ERROR"
     RESULTS_BACKEND_ERROR = "RESULTS_BACKEND_ERROR"
     ASYNC_WORKERS_ERROR = "ASYNC_WORKERS_ERROR"
+    RESULTS_TOO_LARGE_ERROR = "RESULTS_TOO_LARGE_ERROR"
 
     # Generic errors
     GENERIC_COMMAND_ERROR = "GENERIC_COMMAND_ERROR"
@@ -121,6 +122,7 @@ ISSUE_CODES = {
     1034: _("The port number is invalid."),
     1035: _("Failed to start remote query on a worker."),
     1036: _("The database was deleted."),
+    1037: _("The query returned more data than the worker is allowed to hold."),
 }
 """问题代码及其错误信息的字典。"""
 
@@ -156,6 +158,7 @@ ERROR_TYPES_TO_ISSUE_CODES_MAPPING = {
     RabbitaiErrorType.CONNECTION_INVALID_PORT_ERROR: [1034],
     RabbitaiErrorType.ASYNC_WORKERS_ERROR: [1035],
     RabbitaiErrorType.DATABASE_NOT_FOUND_ERROR: [1011, 1036],
+    RabbitaiErrorType.RESULTS_TOO_LARGE_ERROR: [1037],
 }
 """错误类型与问题代码的列表的字典。"""
 
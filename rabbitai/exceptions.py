@@ -199,3 +199,19 @@ class InvalidPayloadSchemaError(RabbitaiErrorException):
 
 class RabbitaiCancelQueryException(RabbitaiException):
     pass
+
+
+class ResultSetTooLargeError(RabbitaiErrorException):
+    status = 413
+
+    def __init__(self, max_bytes: int) -> None:
+        error = RabbitaiError(
+            message=_(
+                "The query returned more than %(max_bytes)s bytes of data. "
+                "Please add a LIMIT or select fewer columns.",
+                max_bytes=max_bytes,
+            ),
+            error_type=RabbitaiErrorType.RESULTS_TOO_LARGE_ERROR,
+            level=ErrorLevel.ERROR,
+        )
+        super().__init__(error)
@@ -32,6 +32,7 @@ from rabbitai.extensions import (
     talisman,
 )
 from rabbitai.security import RabbitaiSecurityManager
+from rabbitai.sql_parse import parsed_query_cache
 from rabbitai.typing import FlaskResponse
 from rabbitai.utils.core import pessimistic_connection_handling
 from rabbitai.utils.log import DBEventLogger, get_event_logger_from_cfg_value
@@ -76,7 +77,7 @@ class RabbitaiAppInitializer:
         - register_blueprints()：注册配置提供的蓝图。
         - configure_wtf()：配置 WTF。
         - configure_middlewares()：配置中间件。
-        - configure_cache()：配置缓存，缓存管理器和结果后端管理器。
+        - configure_cache()：配置缓存，缓存管理器、结果后端管理器和 SQL 解析结果缓存。
         - init_app_in_ctx()：在应用上下文中执行初始化逻辑。
         - post_init()：初始化工作完成后要调用的方法。
 
@@ -667,9 +668,10 @@ class RabbitaiAppInitializer:
         )
 
     def configure_cache(self) -> None:
-        """配置缓存，缓存管理器和结果后端管理器。"""
+        """配置缓存，缓存管理器、结果后端管理器和 SQL 解析结果缓存。"""
         cache_manager.init_app(self.rabbitai_app)
         results_backend_manager.init_app(self.rabbitai_app)
+        parsed_query_cache.init_app(self.rabbitai_app)
 
     def configure_feature_flags(self) -> None:
         """配置特性标志，初始化特性标志管理器。"""
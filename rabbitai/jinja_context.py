@@ -4,7 +4,7 @@
 
 import json
 import re
-from functools import partial
+from functools import lru_cache, partial
 from typing import (
     Any,
     Callable,
@@ -19,8 +19,9 @@ from typing import (
 
 from flask import current_app, g, request
 from flask_babel import gettext as _
-from jinja2 import DebugUndefined
+from jinja2 import DebugUndefined, meta, Template, TemplateSyntaxError
 from jinja2.sandbox import SandboxedEnvironment
+from jinja2.utils import LRUCache
 from typing_extensions import TypedDict
 
 from rabbitai.exceptions import RabbitaiTemplateException
@@ -52,12 +53,49 @@ COLLECTION_TYPES = ("list", "dict", "tuple", "set")
 """集合类型名称的列表"""
 
 
+EXTRA_CACHE_METHODS = frozenset(
+    ("current_user_id", "current_username", "cache_key_wrapper", "url_param")
+)
+"""可添加额外缓存键的模板方法名称的集合。"""
+
+
 @memoized
 def context_addons() -> Dict[str, Any]:
     """从应用配置对象中获取 JINJA 模板上下文插件，缓存返回结果。"""
     return current_app.config.get("JINJA_CONTEXT_ADDONS", {})
 
 
+@memoized
+def template_cache() -> Optional[LRUCache]:
+    """
+    获取编译后模板的缓存，容量由应用配置 JINJA_TEMPLATE_CACHE_SIZE 决定。
+
+    :return: 缓存，容量为 0 时返回 None。
+    """
+
+    size = current_app.config["JINJA_TEMPLATE_CACHE_SIZE"]
+    return LRUCache(size) if size else None
+
+
+@lru_cache(maxsize=1024)
+def has_extra_cache_calls(sql: str) -> bool:
+    """
+    静态分析模板，判断是否引用了可添加额外缓存键的模板方法，
+    如 ``cache_key_wrapper``、``url_param``、``current_user_id``，无需渲染模板。
+
+    :param sql: SQL 模板。
+    :return: 引用时返回 True，模板有语法错误时按正则表达式判断。
+    """
+
+    if "{" not in sql:
+        return False
+    try:
+        ast = SandboxedEnvironment().parse(sql)
+    except TemplateSyntaxError:
+        return bool(ExtraCache.regex.search(sql))
+    return not EXTRA_CACHE_METHODS.isdisjoint(meta.find_undeclared_variables(ast))
+
+
 class Filter(TypedDict):
     """过滤器，类型属性及其类型，col，op，val。"""
 
@@ -432,6 +470,25 @@ class BaseTemplateProcessor:
         self._context.update(kwargs)
         self._context.update(context_addons())
 
+    def get_template(self, sql: str) -> Template:
+        """
+        获取编译后的模板，按模板处理器类型和模板文本缓存。
+
+        :param sql: SQL 模板。
+        :return: 模板。
+        """
+
+        cache = template_cache()
+        if cache is None:
+            return self._env.from_string(sql)
+
+        key = (type(self), sql)
+        template = cache.get(key)
+        if template is None:
+            template = self._env.from_string(sql)
+            cache[key] = template
+        return template
+
     def process_template(self, sql: str, **kwargs: Any) -> str:
         """处理SQL模板，使用上下文参数渲染SQL模板。
 
@@ -440,7 +497,7 @@ class BaseTemplateProcessor:
         "SELECT '2017-01-01T00:00:00'"
         """
 
-        template = self._env.from_string(sql)
+        template = self.get_template(sql)
         kwargs.update(self._context)
 
         context = validate_template_context(self.engine, kwargs)
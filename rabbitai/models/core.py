@@ -7,13 +7,14 @@ import json
 import logging
 import textwrap
 from ast import literal_eval
-from contextlib import closing
+from contextlib import closing, contextmanager
 from copy import deepcopy
 from datetime import datetime
-from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Type
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple, Type
 
 import numpy
 import pandas as pd
+import pyarrow as pa
 import sqlalchemy as sqla
 import sqlparse
 from flask import g, request
@@ -36,7 +37,7 @@ from sqlalchemy.engine.url import make_url, URL
 from sqlalchemy.exc import ArgumentError
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import NullPool, QueuePool
 from sqlalchemy.schema import UniqueConstraint
 from sqlalchemy.sql import expression, Select
 
@@ -45,8 +46,14 @@ from rabbitai.db_engine_specs.base import TimeGrain
 from rabbitai.extensions import cache_manager, encrypted_field_factory, security_manager
 from rabbitai.models.helpers import AuditMixinNullable, ImportExportMixin
 from rabbitai.models.tags import FavStarUpdater
-from rabbitai.result_set import RabbitaiResultSet
+from rabbitai.result_set import (
+    iter_row_batches_as_arrow,
+    RabbitaiResultSet,
+    row_batches_to_arrow_table,
+)
 from rabbitai.utils import cache as cache_util, core as utils
+from rabbitai.utils.engine_registry import engine_registry, QUEUE_POOL_PARAMS
+from rabbitai.utils.hashing import md5_sha_from_dict
 from rabbitai.utils.memoized import memoized
 
 config = app.config
@@ -375,20 +382,29 @@ class Database(Model, AuditMixinNullable, ImportExportMixin):
     def get_sqla_engine(
         self,
         schema: Optional[str] = None,
-        nullpool: bool = True,
+        nullpool: Optional[bool] = None,
         user_name: Optional[str] = None,
         source: Optional[utils.QuerySource] = None,
     ) -> Engine:
         """
         依据该数据库对象提供的额外信息和方法，以及指定参数调用 create_engine 返回数据库引擎。
 
+        启用 SQLALCHEMY_ENGINE_POOLING 时，带连接池的引擎缓存在进程内的引擎注册表中复用。
+        未保存的临时数据库对象（如测试连接时构建的对象）总是使用 NullPool。
+
         :param schema: 模式。
-        :param nullpool: 是否无连接池。
+        :param nullpool: 是否无连接池，None 表示依据 SQLALCHEMY_ENGINE_POOLING 配置。
         :param user_name: 用户名称。
         :param source: 查询源。
         :return: 数据库引擎。
         """
 
+        if nullpool is None:
+            nullpool = not config["SQLALCHEMY_ENGINE_POOLING"]
+        if self.id is None:
+            # transient databases would leave their pools behind in the registry
+            nullpool = True
+
         extra = self.get_extra()
         sqlalchemy_url = make_url(self.sqlalchemy_uri_decrypted)
         self.db_engine_spec.adjust_database_uri(sqlalchemy_url, schema)
@@ -406,6 +422,11 @@ class Database(Model, AuditMixinNullable, ImportExportMixin):
         params = extra.get("engine_params", {})
         if nullpool:
             params["poolclass"] = NullPool
+            for key in QUEUE_POOL_PARAMS:
+                params.pop(key, None)
+        else:
+            params = {**config["SQLALCHEMY_ENGINE_POOL_DEFAULTS"], **params}
+            params.setdefault("poolclass", QueuePool)
 
         connect_args = params.get("connect_args", {})
         if self.impersonate_user:
@@ -431,7 +452,39 @@ class Database(Model, AuditMixinNullable, ImportExportMixin):
                 sqlalchemy_url, params, effective_username, security_manager, source
             )
 
-        return create_engine(sqlalchemy_url, **params)
+        if nullpool:
+            return create_engine(sqlalchemy_url, **params)
+
+        # changes to the URI or the connection parameters, including in other
+        # processes, result in a new version and therefore in a new pool
+        version = md5_sha_from_dict(
+            {
+                "url": self.sqlalchemy_uri_decrypted,
+                "extra": self.extra,
+                "encrypted_extra": self.encrypted_extra,
+                "server_cert": self.server_cert,
+                "impersonate_user": self.impersonate_user,
+            },
+            default=str,
+        )
+        engine_key = md5_sha_from_dict(
+            {
+                "database_id": self.id,
+                "version": version,
+                "url": str(sqlalchemy_url),
+                "username": effective_username,
+                "params": params,
+            },
+            default=str,
+        )
+        return engine_registry.get_engine(
+            engine_key,
+            self.id,
+            lambda: create_engine(sqlalchemy_url, **params),
+            idle_timeout=config["SQLALCHEMY_ENGINE_POOL_IDLE_TIMEOUT"],
+            stats_logger=stats_logger,
+            version=version,
+        )
 
     def get_reserved_words(self) -> Set[str]:
         """获取该数据库支持的保留关键字集合"""
@@ -441,6 +494,34 @@ class Database(Model, AuditMixinNullable, ImportExportMixin):
         """获取该数据库支持的定界方法。"""
         return self.get_dialect().identifier_preparer.quote
 
+    @contextmanager
+    def _execute_sql(self, sql: str, schema: Optional[str] = None) -> Iterator[Any]:
+        """
+        依次执行SQL中的各条语句并记录查询日志，返回执行最后一条语句后的游标，
+        之前各语句的结果被丢弃。
+
+        :param sql: SQL查询字符串。
+        :param schema: 模式。
+        :return: 游标。
+        """
+
+        sqls = [str(s).strip(" ;") for s in sqlparse.parse(sql)]
+
+        engine = self.get_sqla_engine(schema=schema)
+        username = utils.get_username()
+
+        with closing(engine.raw_connection()) as conn:
+            cursor = conn.cursor()
+            for i, sql_ in enumerate(sqls):
+                if log_query:
+                    log_query(
+                        engine.url, sql_, schema, username, __name__, security_manager
+                    )
+                self.db_engine_spec.execute(cursor, sql_)
+                if i < len(sqls) - 1:
+                    cursor.fetchall()
+            yield cursor
+
     def get_df(
         self,
         sql: str,
@@ -456,45 +537,93 @@ class Database(Model, AuditMixinNullable, ImportExportMixin):
         :return:
         """
 
-        sqls = [str(s).strip(" ;") for s in sqlparse.parse(sql)]
-
-        engine = self.get_sqla_engine(schema=schema)
-        username = utils.get_username()
-
-        def needs_conversion(df_series: pd.Series) -> bool:
-            return (
-                not df_series.empty
-                and isinstance(df_series, pd.Series)
-                and isinstance(df_series[0], (list, dict))
+        with self._execute_sql(sql, schema) as cursor:
+            data = self.db_engine_spec.fetch_data_as_arrow(cursor)
+            if data is None and config["RESULTS_FETCH_BATCH_SIZE"]:
+                data = row_batches_to_arrow_table(
+                    self.db_engine_spec.fetch_data_in_batches(
+                        cursor, batch_size=config["RESULTS_FETCH_BATCH_SIZE"]
+                    ),
+                    config["RESULTS_FETCH_MAX_BYTES"],
+                )
+            elif data is None:
+                data = self.db_engine_spec.fetch_data(cursor)
+            result_set = RabbitaiResultSet(
+                data, cursor.description, self.db_engine_spec
             )
+            return self._result_set_to_df(result_set, mutator)
 
-        def _log_query(sql: str) -> None:
-            if log_query:
-                log_query(engine.url, sql, schema, username, __name__, security_manager)
+    def iter_df(
+        self,
+        sql: str,
+        schema: Optional[str] = None,
+        batch_size: int = 10000,
+        limit: Optional[int] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        分批执行查询并逐批返回数据帧，用于导出大结果集，内存中只保留一批数据。
 
-        with closing(engine.raw_connection()) as conn:
-            cursor = conn.cursor()
-            for sql_ in sqls[:-1]:
-                _log_query(sql_)
-                self.db_engine_spec.execute(cursor, sql_)
-                cursor.fetchall()
+        各批次的列类型由第一批确定，参见 :func:`~rabbitai.result_set.iter_row_batches_as_arrow`。
+        驱动直接返回 PyArrow 数据表时，按批次大小切分该数据表。
+        即使查询没有返回数据，也至少返回一个只包含列的空数据帧。
 
-            _log_query(sqls[-1])
-            self.db_engine_spec.execute(cursor, sqls[-1])
+        :param sql: SQL查询字符串。
+        :param schema: 模式。
+        :param batch_size: 每批的行数。
+        :param limit: 最大行数。
+        :return: 数据帧迭代器。
+        """
 
-            data = self.db_engine_spec.fetch_data(cursor)
-            result_set = RabbitaiResultSet(
-                data, cursor.description, self.db_engine_spec
-            )
-            df = result_set.to_pandas_df()
-            if mutator:
-                df = mutator(df)
+        with self._execute_sql(sql, schema) as cursor:
+            table = self.db_engine_spec.fetch_data_as_arrow(cursor, limit)
+            if table is not None:
+                tables: Iterator[pa.Table] = (
+                    table.slice(i, batch_size)
+                    for i in range(0, max(table.num_rows, 1), batch_size)
+                )
+            else:
+                tables = iter_row_batches_as_arrow(
+                    self.db_engine_spec.fetch_data_in_batches(
+                        cursor, limit=limit, batch_size=batch_size
+                    )
+                )
+
+            empty = True
+            for table in tables:
+                empty = False
+                yield self._result_set_to_df(
+                    RabbitaiResultSet(table, cursor.description, self.db_engine_spec)
+                )
+            if empty:
+                yield self._result_set_to_df(
+                    RabbitaiResultSet([], cursor.description, self.db_engine_spec)
+                )
+
+    @staticmethod
+    def _result_set_to_df(
+        result_set: RabbitaiResultSet,
+        mutator: Optional[Callable[[pd.DataFrame], None]] = None,
+    ) -> pd.DataFrame:
+        """
+        转换结果集为数据帧，嵌套的列表或字典值序列化为 JSON 字符串。
 
-            for col, coltype in df.dtypes.to_dict().items():
-                if coltype == numpy.object_ and needs_conversion(df[col]):
-                    df[col] = df[col].apply(utils.json_dumps_w_dates)
+        :param result_set: 结果集。
+        :param mutator: 修改器，用于更改数据帧。
+        :return: 数据帧。
+        """
 
-            return df
+        df = result_set.to_pandas_df()
+        if mutator:
+            df = mutator(df)
+
+        for col, coltype in df.dtypes.to_dict().items():
+            if (
+                coltype == numpy.object_
+                and not df[col].empty
+                and isinstance(df[col].iloc[0], (list, dict))
+            ):
+                df[col] = df[col].apply(utils.json_dumps_w_dates)
+        return df
 
     def compile_sqla_query(self, qry: Select, schema: Optional[str] = None) -> str:
         """
@@ -910,8 +1039,23 @@ class Database(Model, AuditMixinNullable, ImportExportMixin):
         return sqla_url.get_dialect()()
 
 
+def invalidate_engines(  # pylint: disable=unused-argument
+    mapper: Any, connection: Any, target: Database
+) -> None:
+    """
+    数据库对象变更或删除后，释放引擎注册表中该数据库的引擎。
+
+    :param mapper: 映射器。
+    :param connection: 数据库连接。
+    :param target: 数据库模型对象。
+    """
+    engine_registry.invalidate(target.id)
+
+
 sqla.event.listen(Database, "after_insert", security_manager.set_perm)
 sqla.event.listen(Database, "after_update", security_manager.set_perm)
+sqla.event.listen(Database, "after_update", invalidate_engines)
+sqla.event.listen(Database, "after_delete", invalidate_engines)
 
 
 class Log(Model):
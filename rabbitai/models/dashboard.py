@@ -266,9 +266,7 @@ class Dashboard(Model, AuditMixinNullable, ImportExportMixin):
         result: List[Dict[str, Any]] = []
 
         for (cls_model, datasource_id), slices in slices_by_datasource.items():
-            datasource = (
-                db.session.query(cls_model).filter_by(id=datasource_id).one_or_none()
-            )
+            datasource = db.session.query(cls_model).get(datasource_id)
 
             if datasource:
                 # Filter out unneeded fields from the datasource payload
@@ -121,7 +121,9 @@ class Slice(Model, AuditMixinNullable, ImportExportMixin):
     @memoized
     def get_datasource(self) -> Optional["BaseDatasource"]:
         """从数据库中查询第一个满足条件的数据源对象实例。"""
-        return db.session.query(self.cls_model).filter_by(id=self.datasource_id).first()
+        # look up by primary key so datasources already loaded in the session, e.g.
+        # eagerly by the dashboard bootstrap, are not queried again
+        return db.session.query(self.cls_model).get(self.datasource_id)
 
     @renders("datasource_name")
     def datasource_link(self) -> Optional[Markup]:
@@ -1,7 +1,6 @@
 import json
 import logging
 from datetime import datetime, timedelta
-from io import BytesIO
 from typing import Any, List, Optional
 from uuid import UUID
 
@@ -10,10 +9,10 @@ from celery.exceptions import SoftTimeLimitExceeded
 from flask_appbuilder.security.sqla.models import User
 from sqlalchemy.orm import Session
 
-from rabbitai import app
+from rabbitai import app, security_manager
 from rabbitai.commands.base import BaseCommand
 from rabbitai.commands.exceptions import CommandException
-from rabbitai.extensions import feature_flag_manager, machine_auth_provider_factory
+from rabbitai.extensions import feature_flag_manager
 from rabbitai.models.reports import (
     ReportDataFormat,
     ReportExecutionLog,
@@ -48,8 +47,8 @@ from rabbitai.reports.notifications import create_notification
 from rabbitai.reports.notifications.base import NotificationContent
 from rabbitai.reports.notifications.exceptions import NotificationError
 from rabbitai.utils.celery import session_scope
-from rabbitai.utils.core import ChartDataResultFormat, ChartDataResultType
-from rabbitai.utils.csv import get_chart_csv_data
+from rabbitai.utils.core import override_user
+from rabbitai.utils.csv import df_to_escaped_csv, get_chart_dataframe
 from rabbitai.utils.screenshots import (
     BaseScreenshot,
     ChartScreenshot,
@@ -76,6 +75,7 @@ class BaseReportState:
         self._scheduled_dttm = scheduled_dttm
         self._start_dttm = datetime.utcnow()
         self._execution_id = execution_id
+        self._chart_df: Optional[pd.DataFrame] = None
 
     def set_state_and_log(
         self, state: ReportState, error_message: Optional[str] = None,
@@ -120,20 +120,11 @@ class BaseReportState:
         self._session.add(log)
         self._session.commit()
 
-    def _get_url(
-        self, user_friendly: bool = False, csv: bool = False, **kwargs: Any
-    ) -> str:
+    def _get_url(self, user_friendly: bool = False, **kwargs: Any) -> str:
         """
         Get the url for this report schedule: chart or dashboard
         """
         if self._report_schedule.chart:
-            if csv:
-                return get_url_path(
-                    "ChartRestApi.get_data",
-                    pk=self._report_schedule.chart_id,
-                    format=ChartDataResultFormat.CSV.value,
-                    type=ChartDataResultType.POST_PROCESSED.value,
-                )
             return get_url_path(
                 "Rabbitai.slice",
                 user_friendly=user_friendly,
@@ -196,47 +187,60 @@ class BaseReportState:
             raise ReportScheduleScreenshotFailedError()
         return image_data
 
-    def _get_csv_data(self) -> bytes:
-        url = self._get_url(csv=True)
-        auth_cookies = machine_auth_provider_factory.instance.get_auth_cookies(
-            self._get_user()
-        )
+    def _get_data_user(self) -> User:
+        """
+        Get the user the chart data is queried as: the first owner of the report
+        schedule, or the Selenium user if the report schedule has no owner
+        """
+        if self._report_schedule.owners:
+            return self._report_schedule.owners[0]
+        return self._get_user()
 
-        # To load CSV data from the endpoint the chart must have been saved
-        # with its query context. For charts without saved query context we
-        # get a screenshot to force the chart to produce and save the query
-        # context.
-        if self._report_schedule.chart.query_context is None:
-            logger.warning("No query context found, taking a screenshot to generate it")
-            try:
-                self._get_screenshot()
-            except (
-                ReportScheduleScreenshotFailedError,
-                ReportScheduleScreenshotTimeout,
-            ) as ex:
+    def _get_chart_dataframe(self) -> pd.DataFrame:
+        """
+        Run the chart query in the worker, as the report owner, and return the
+        post-processed data. The result is kept for the CSV and the embedded data.
+
+        :raises: ReportScheduleCsvFailedError, ReportScheduleCsvTimeout
+        """
+        if self._chart_df is not None:
+            return self._chart_df
+
+        chart = self._report_schedule.chart
+        with override_user(self._get_data_user()):
+            if not security_manager.can_access("can_csv", "Rabbitai"):
                 raise ReportScheduleCsvFailedError(
-                    "Unable to fetch CSV data because the chart has no query context "
-                    "saved, and an error occurred when fetching it via a screenshot. "
-                    "Please try loading the chart and saving it again."
-                ) from ex
+                    "The report owner is not allowed to export chart data"
+                )
+            try:
+                logger.info("Getting data for chart %s", chart.id)
+                self._chart_df = get_chart_dataframe(chart)
+            except SoftTimeLimitExceeded:
+                raise ReportScheduleCsvTimeout()
+            except Exception as ex:
+                raise ReportScheduleCsvFailedError(f"Failed generating csv {str(ex)}")
+        if self._chart_df is None:
+            raise ReportScheduleCsvFailedError()
+        return self._chart_df
 
-        try:
-            logger.info("Getting chart from %s", url)
-            csv_data = get_chart_csv_data(url, auth_cookies)
-        except SoftTimeLimitExceeded:
-            raise ReportScheduleCsvTimeout()
-        except Exception as ex:
-            raise ReportScheduleCsvFailedError(f"Failed generating csv {str(ex)}")
+    def _get_csv_data(self) -> bytes:
+        df = self._get_chart_dataframe()
+        csv_export = app.config["CSV_EXPORT"]
+        csv_data = df_to_escaped_csv(
+            df, index=not isinstance(df.index, pd.RangeIndex), **csv_export
+        )
         if not csv_data:
             raise ReportScheduleCsvFailedError()
-        return csv_data
+        return csv_data.encode(csv_export.get("encoding", "utf-8"))
 
     def _get_embedded_data(self) -> pd.DataFrame:
         """
         Return data as an HTML table, to embed in the email.
         """
-        buf = BytesIO(self._get_csv_data())
-        df = pd.read_csv(buf)
+        df = self._get_chart_dataframe()
+        # the notifications do not render the index, eg, the rows of a pivot table
+        if not isinstance(df.index, pd.RangeIndex):
+            df = df.reset_index()
         return df
 
     def _get_notification_content(self) -> NotificationContent:
@@ -5,13 +5,25 @@
 import datetime
 import json
 import logging
-from typing import Any, Dict, List, Optional, Tuple, Type
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
 
 import numpy as np
 import pandas as pd
 import pyarrow as pa
 
 from rabbitai import db_engine_specs
+from rabbitai.exceptions import ResultSetTooLargeError
 from rabbitai.typing import DbapiDescription, DbapiResult
 from rabbitai.utils import core as utils
 
@@ -87,25 +99,21 @@ class RabbitaiResultSet:
 
     def __init__(
         self,
-        data: DbapiResult,
+        data: Union[DbapiResult, pa.Table],
         cursor_description: DbapiDescription,
         db_engine_spec: Type[db_engine_specs.BaseEngineSpec],
     ):
         """
         使用指定数据、游标描述和数据库说明，创建新实例。
 
-        :param data: 数据。
+        :param data: 数据，DB-API 返回的行或驱动直接返回的 PyArrow 数据表。
         :param cursor_description: 游标描述。
         :param db_engine_spec: 数据库说明。
         """
 
         self.db_engine_spec = db_engine_spec
-        data = data or []
         column_names: List[str] = []
-        pa_data: List[pa.Array] = []
         deduped_cursor_desc: List[Tuple[Any, ...]] = []
-        numpy_dtype: List[Tuple[str, ...]] = []
-        stringified_arr: np.ndarray
 
         if cursor_description:
             # get deduped list of column names
@@ -117,57 +125,19 @@ class RabbitaiResultSet:
                 for column_name, description in zip(column_names, cursor_description)
             ]
 
-            # generate numpy structured array dtype
-            numpy_dtype = [(column_name, "object") for column_name in column_names]
+        if isinstance(data, pa.Table) and data.num_columns:
+            # the driver handed back Arrow data, only align the column names
+            if not column_names:
+                column_names = dedup(data.column_names)
+            self.table = self.normalize_arrow_table(
+                data.rename_columns(column_names)
+            )
+        else:
+            self.table = pa.Table.from_arrays(
+                self.rows_to_arrow_arrays(data or []) if column_names else [],
+                names=column_names,
+            )
 
-        # only do expensive recasting if datatype is not standard list of tuples
-        if data and (not isinstance(data, list) or not isinstance(data[0], tuple)):
-            data = [tuple(row) for row in data]
-        array = np.array(data, dtype=numpy_dtype)
-        if array.size > 0:
-            for column in column_names:
-                try:
-                    pa_data.append(pa.array(array[column].tolist()))
-                except (
-                    pa.lib.ArrowInvalid,
-                    pa.lib.ArrowTypeError,
-                    pa.lib.ArrowNotImplementedError,
-                    TypeError,  # this is super hackey,
-                    # https://issues.apache.org/jira/browse/ARROW-7855
-                ):
-                    # attempt serialization of values as strings
-                    stringified_arr = stringify_values(array[column])
-                    pa_data.append(pa.array(stringified_arr.tolist()))
-
-        if pa_data:  # pylint: disable=too-many-nested-blocks
-            for i, column in enumerate(column_names):
-                if pa.types.is_nested(pa_data[i].type):
-                    # TODO: revisit nested column serialization once nested types
-                    #  are added as a natively supported column type in Rabbitai
-                    #  (rabbitai.utils.core.GenericDataType).
-                    stringified_arr = stringify_values(array[column])
-                    pa_data[i] = pa.array(stringified_arr.tolist())
-
-                elif pa.types.is_temporal(pa_data[i].type):
-                    # workaround for bug converting
-                    # `psycopg2.tz.FixedOffsetTimezone` tzinfo values.
-                    # related: https://issues.apache.org/jira/browse/ARROW-5248
-                    sample = self.first_nonempty(array[column])
-                    if sample and isinstance(sample, datetime.datetime):
-                        try:
-                            if sample.tzinfo:
-                                tz = sample.tzinfo
-                                series = pd.Series(
-                                    array[column], dtype="datetime64[ns]"
-                                )
-                                series = pd.to_datetime(series).dt.tz_localize(tz)
-                                pa_data[i] = pa.Array.from_pandas(
-                                    series, type=pa.timestamp("ns", tz=tz)
-                                )
-                        except Exception as ex:  # pylint: disable=broad-except
-                            logger.exception(ex)
-
-        self.table = pa.Table.from_arrays(pa_data, names=column_names)
         self._type_dict: Dict[str, Any] = {}
         try:
             # The driver may not be passing a cursor.description
@@ -179,6 +149,104 @@ class RabbitaiResultSet:
         except Exception as ex:  # pylint: disable=broad-except
             logger.exception(ex)
 
+    @classmethod
+    def rows_to_arrow_arrays(cls, data: DbapiResult) -> List[pa.Array]:
+        """
+        将 DB-API 返回的行数据按列转置，直接构建 PyArrow 数组，避免经由 numpy 对象数组中转。
+
+        :param data: 行数据。
+        :return: 按列顺序排列的 PyArrow 数组列表，无数据时返回空列表。
+        """
+
+        return [array for array, _ in cls.rows_to_arrow_columns(data)]
+
+    @classmethod
+    def rows_to_arrow_columns(cls, data: DbapiResult) -> List[Tuple[pa.Array, bool]]:
+        """
+        将 DB-API 返回的行数据按列转置并构建 PyArrow 数组，同时返回每列是否已回退为 Json 字符串。
+
+        :param data: 行数据。
+        :return: 按列顺序排列的 PyArrow 数组和回退标记的列表，无数据时返回空列表。
+        """
+
+        if not data:
+            return []
+
+        # only do expensive recasting if datatype is not standard list of tuples
+        if not isinstance(data, list) or not isinstance(data[0], tuple):
+            data = [tuple(row) for row in data]
+
+        return [cls._column_to_arrow(values) for values in zip(*data)]
+
+    @classmethod
+    def column_to_arrow(cls, values: Sequence[Any]) -> pa.Array:
+        """
+        将单列值转换为 PyArrow 数组，嵌套或混合类型回退为 Json 字符串，
+        并修正带时区的时间类型。
+
+        :param values: 单列值序列。
+        :return: PyArrow 数组。
+        """
+
+        return cls._column_to_arrow(values)[0]
+
+    @classmethod
+    def _column_to_arrow(cls, values: Sequence[Any]) -> Tuple[pa.Array, bool]:
+        try:
+            pa_array = pa.array(values)
+        except (
+            pa.lib.ArrowInvalid,
+            pa.lib.ArrowTypeError,
+            pa.lib.ArrowNotImplementedError,
+            TypeError,  # this is super hackey,
+            # https://issues.apache.org/jira/browse/ARROW-7855
+        ):
+            # attempt serialization of values as strings
+            return pa.array([stringify(value) for value in values]), True
+
+        if pa.types.is_nested(pa_array.type):
+            # TODO: revisit nested column serialization once nested types
+            #  are added as a natively supported column type in Rabbitai
+            #  (rabbitai.utils.core.GenericDataType).
+            return pa.array([stringify(value) for value in values]), True
+
+        if pa.types.is_temporal(pa_array.type):
+            # workaround for bug converting
+            # `psycopg2.tz.FixedOffsetTimezone` tzinfo values.
+            # related: https://issues.apache.org/jira/browse/ARROW-5248
+            sample = cls.first_nonempty(values)
+            if sample and isinstance(sample, datetime.datetime):
+                try:
+                    if sample.tzinfo:
+                        tz = sample.tzinfo
+                        series = pd.Series(list(values), dtype="datetime64[ns]")
+                        series = pd.to_datetime(series).dt.tz_localize(tz)
+                        pa_array = pa.Array.from_pandas(
+                            series, type=pa.timestamp("ns", tz=tz)
+                        )
+                except Exception as ex:  # pylint: disable=broad-except
+                    logger.exception(ex)
+
+        return pa_array, False
+
+    @staticmethod
+    def normalize_arrow_table(table: pa.Table) -> pa.Table:
+        """
+        规范化驱动直接返回的 PyArrow 数据表，将嵌套类型的列序列化为 Json 字符串，
+        与按行构建时的行为保持一致。
+
+        :param table: PyArrow 数据表。
+        :return: 规范化后的 PyArrow 数据表。
+        """
+
+        for i, field in enumerate(table.schema):
+            if pa.types.is_nested(field.type):
+                values = table.column(i).to_pylist()
+                table = table.set_column(
+                    i, field.name, pa.array([stringify(value) for value in values])
+                )
+        return table
+
     @staticmethod
     def convert_pa_dtype(pa_dtype: pa.DataType) -> Optional[str]:
         """
@@ -208,7 +276,7 @@ class RabbitaiResultSet:
         return table.to_pandas(integer_object_nulls=True)
 
     @staticmethod
-    def first_nonempty(items: List[Any]) -> Any:
+    def first_nonempty(items: Sequence[Any]) -> Any:
         """
         返回指定列表中第一个非空项。
 
@@ -278,3 +346,124 @@ class RabbitaiResultSet:
             columns.append(column)
 
         return columns
+
+
+def _combine_chunks(chunks: List[Tuple[pa.Array, bool]]) -> pa.ChunkedArray:
+    """
+    合并同一列在不同批次中构建的 PyArrow 数组，统一其数据类型，结果与一次转换整列相同。
+
+    全空批次转换为其它批次的类型，整数与浮点数混合时统一为浮点数，
+    时区偏移不同的带时区时间统一为第一个批次的时区；
+    任一批次已回退为 Json 字符串或存在其它类型冲突时，所有批次的值（包括空值）都序列化为 Json 字符串。
+
+    :param chunks: 同一列的 PyArrow 数组及其是否已回退为 Json 字符串的列表。
+    :return: PyArrow 分块数组。
+    """
+
+    types = {array.type for array, _ in chunks if not pa.types.is_null(array.type)}
+    stringified = any(fallback for _, fallback in chunks)
+    if not types:
+        return pa.chunked_array([array for array, _ in chunks], type=pa.null())
+
+    if stringified:
+        target_type = pa.string()
+    elif len(types) == 1:
+        target_type = types.pop()
+    elif all(
+        pa.types.is_integer(type_) or pa.types.is_floating(type_) for type_ in types
+    ):
+        target_type = pa.float64()
+    elif all(pa.types.is_timestamp(type_) and type_.tz for type_ in types):
+        # batches crossing a DST boundary carry different fixed offsets, the
+        # values are stored as UTC so casting to the first offset keeps them
+        target_type = next(
+            array.type for array, _ in chunks if not pa.types.is_null(array.type)
+        )
+    else:
+        # converting the whole column at once would have failed as well
+        stringified = True
+        target_type = pa.string()
+
+    combined: List[pa.Array] = []
+    for array, fallback in chunks:
+        if fallback:
+            combined.append(array)
+        elif stringified:
+            combined.append(
+                pa.array(
+                    [stringify(value) for value in array.to_pylist()], type=pa.string()
+                )
+            )
+        elif array.type == target_type:
+            combined.append(array)
+        elif pa.types.is_null(array.type):
+            combined.append(pa.nulls(len(array), type=target_type))
+        else:
+            combined.append(array.cast(target_type))
+    return pa.chunked_array(combined, type=target_type)
+
+
+def row_batches_to_arrow_table(
+    batches: Iterable[DbapiResult], max_bytes: Optional[int] = None
+) -> pa.Table:
+    """
+    将分批提取的 DB-API 行数据逐批转换为 PyArrow 数组，并组装为 PyArrow 数据表。
+
+    每批行数据在转换后即可释放，内存中只保留列式数据；当累计的 Arrow 数据超过字节预算时停止提取。
+    列名称按位置命名，由 :class:`RabbitaiResultSet` 依据游标描述重命名。
+
+    :param batches: 行数据批次的可迭代对象。
+    :param max_bytes: 允许的最大字节数，None 表示不限制。
+    :return: PyArrow 数据表。
+    :raises ResultSetTooLargeError: 累计数据超过字节预算。
+    """
+
+    columns: List[List[Tuple[pa.Array, bool]]] = []
+    nbytes = 0
+    for rows in batches:
+        arrays = RabbitaiResultSet.rows_to_arrow_columns(rows)
+        if not arrays:
+            continue
+        if not columns:
+            columns = [[] for _ in arrays]
+        for chunks, array in zip(columns, arrays):
+            chunks.append(array)
+        nbytes += sum(array.nbytes for array, _ in arrays)
+        if max_bytes is not None and nbytes > max_bytes:
+            raise ResultSetTooLargeError(max_bytes)
+
+    return pa.Table.from_arrays(
+        [_combine_chunks(chunks) for chunks in columns],
+        names=[str(i) for i in range(len(columns))],
+    )
+
+
+def iter_row_batches_as_arrow(batches: Iterable[DbapiResult]) -> Iterator[pa.Table]:
+    """
+    将分批提取的 DB-API 行数据逐批转换为 PyArrow 数据表，用于流式处理结果。
+
+    每列的类型由第一个非全空的批次确定，之后的批次能够无损转换时转换为该类型，
+    避免同一列在不同批次中推断出不同的类型（如整数列在某一批中全为空值）。
+    列名称按位置命名，由 :class:`RabbitaiResultSet` 依据游标描述重命名。
+
+    :param batches: 行数据批次的可迭代对象。
+    :return: PyArrow 数据表的迭代器。
+    """
+
+    types: List[pa.DataType] = []
+    for rows in batches:
+        arrays = RabbitaiResultSet.rows_to_arrow_arrays(rows)
+        if not arrays:
+            continue
+        if not types:
+            types = [pa.null()] * len(arrays)
+        for i, array in enumerate(arrays):
+            if pa.types.is_null(types[i]):
+                types[i] = array.type
+            elif array.type != types[i]:
+                try:
+                    arrays[i] = array.cast(types[i])
+                except (pa.lib.ArrowInvalid, pa.lib.ArrowNotImplementedError):
+                    # e.g. floats after an integer batch, keep the batch's own type
+                    pass
+        yield pa.Table.from_arrays(arrays, names=[str(i) for i in range(len(arrays))])
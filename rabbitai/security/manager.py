@@ -4,13 +4,16 @@
 
 import logging
 import re
+import uuid
 from collections import defaultdict
 from typing import (
     Any,
     Callable,
     cast,
     Dict,
+    FrozenSet,
     List,
+    NamedTuple,
     Optional,
     Set,
     Tuple,
@@ -18,7 +21,8 @@ from typing import (
     Union,
 )
 
-from flask import current_app, g
+import sqlalchemy as sqla
+from flask import current_app, g, has_app_context
 from flask_appbuilder import Model
 from flask_appbuilder.models.sqla.interface import SQLAInterface
 from flask_appbuilder.security.sqla.manager import SecurityManager
@@ -49,6 +53,7 @@ from rabbitai.connectors.connector_registry import ConnectorRegistry
 from rabbitai.constants import RouteMethod
 from rabbitai.errors import ErrorLevel, RabbitaiError, RabbitaiErrorType
 from rabbitai.exceptions import RabbitaiSecurityException
+from rabbitai.extensions import cache_manager
 from rabbitai.utils.core import DatasourceName, RowLevelSecurityFilterType
 
 if TYPE_CHECKING:
@@ -63,6 +68,17 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+PERMISSIONS_VERSION_KEY = "permissions__version"
+RLS_FILTERS_VERSION_KEY = "rls_filters__version"
+
+
+class RLSFilter(NamedTuple):
+    """行级安全过滤器，包括标识、分组键和过滤子句。"""
+
+    id: int  # pylint: disable=invalid-name
+    group_key: Optional[str]
+    clause: str
+
 
 class RabbitaiSecurityListWidget(ListWidget):
     """安全列表部件，模板：rabbitai/fab_overrides/list.html。"""
@@ -251,6 +267,80 @@ class RabbitaiSecurityManager(SecurityManager):
         database_name = schema_permission.split(".")[0][1:-1]
         return database_name, schema_name
 
+    def get_permission_index(self) -> FrozenSet[Tuple[str, str]]:
+        """
+        Return the (permission, view-menu) pairs granted to the current user through
+        the roles stored in the metadata database, or the public role for anonymous
+        users.
+
+        The index is built with a single query, cached per request by the role ids,
+        and additionally in the shared cache when `PERMISSIONS_CACHE_TIMEOUT` is set.
+
+        :returns: The set of (permission name, view-menu name) pairs
+        """
+
+        user = g.user
+        if user.is_anonymous:
+            public_role = self.get_public_role()
+            role_ids = [public_role.id] if public_role else []
+        else:
+            role_ids = sorted(role.id for role in user.roles)
+
+        request_cache: Dict[Tuple[int, ...], FrozenSet[Tuple[str, str]]] = g.setdefault(
+            "permission_index", {}
+        )
+        request_key = tuple(role_ids)
+        if request_key in request_cache:
+            return request_cache[request_key]
+
+        timeout = current_app.config["PERMISSIONS_CACHE_TIMEOUT"]
+        cache_key = None
+        if timeout is not None:
+            cache_key = "permissions__{version}__{roles}".format(
+                version=self._get_cache_version(PERMISSIONS_VERSION_KEY),
+                roles=",".join(str(role_id) for role_id in role_ids),
+            )
+            index = cache_manager.cache.get(cache_key)
+            if index is not None:
+                request_cache[request_key] = index
+                return index
+
+        index: FrozenSet[Tuple[str, str]] = frozenset()
+        if role_ids:
+            query = (
+                self.get_session.query(
+                    self.permission_model.name, self.viewmenu_model.name
+                )
+                .select_from(self.permissionview_model)
+                .join(self.permission_model)
+                .join(self.viewmenu_model)
+                .join(assoc_permissionview_role)
+                .filter(assoc_permissionview_role.c.role_id.in_(role_ids))
+            )
+            index = frozenset(tuple(row) for row in query)
+
+        request_cache[request_key] = index
+        if cache_key:
+            cache_manager.cache.set(cache_key, index, timeout=timeout)
+        return index
+
+    @staticmethod
+    def invalidate_permission_index(  # pylint: disable=unused-argument
+        mapper: Mapper, connection: Connection, target: Any
+    ) -> None:
+        """
+        Invalidates the cached permission indexes when a role or its permissions
+        change.
+
+        :param mapper: The mapper
+        :param connection: The DB-API connection
+        :param target: The mapped instance being persisted
+        """
+        if has_app_context():
+            g.pop("permission_index", None)
+            if current_app.config["PERMISSIONS_CACHE_TIMEOUT"] is not None:
+                RabbitaiSecurityManager._bump_cache_version(PERMISSIONS_VERSION_KEY)
+
     def can_access(self, permission_name: str, view_name: str) -> bool:
         """
         Return True if the user can access the FAB permission/view, False otherwise.
@@ -263,6 +353,13 @@ class RabbitaiSecurityManager(SecurityManager):
         :returns: Whether the user can access the FAB permission/view
         """
 
+        if (permission_name, view_name) in self.get_permission_index():
+            return True
+
+        if not self.builtin_roles:
+            return False
+
+        # builtin roles are defined in the configuration rather than the database
         user = g.user
         if user.is_anonymous:
             return self.is_item_public(permission_name, view_name)
@@ -491,36 +588,11 @@ class RabbitaiSecurityManager(SecurityManager):
         :return:
         """
 
-        base_query = (
-            self.get_session.query(self.viewmenu_model.name)
-                .join(self.permissionview_model)
-                .join(self.permission_model)
-                .join(assoc_permissionview_role)
-                .join(self.role_model)
-        )
-
-        if not g.user.is_anonymous:
-            # filter by user id
-            view_menu_names = (
-                base_query.join(assoc_user_role)
-                    .join(self.user_model)
-                    .filter(self.user_model.id == g.user.get_id())
-                    .filter(self.permission_model.name == permission_name)
-            ).all()
-
-            return {s.name for s in view_menu_names}
-
-        # Properly treat anonymous user
-        public_role = self.get_public_role()
-        if public_role:
-            # filter by public role
-            view_menu_names = (
-                base_query.filter(self.role_model.id == public_role.id).filter(
-                    self.permission_model.name == permission_name
-                )
-            ).all()
-            return {s.name for s in view_menu_names}
-        return set()
+        return {
+            view_menu_name
+            for name, view_menu_name in self.get_permission_index()
+            if name == permission_name
+        }
 
     def get_schemas_accessible_by_user(
         self, database: "Database", schemas: List[str], hierarchical: bool = True
@@ -711,6 +783,9 @@ class RabbitaiSecurityManager(SecurityManager):
         self.get_session.commit()
         self.clean_perms()
 
+        if conf["PERMISSIONS_CACHE_TIMEOUT"] is not None:
+            self._bump_cache_version(PERMISSIONS_VERSION_KEY)
+
     def _get_pvms_from_builtin_role(self, role_name: str) -> List[PermissionView]:
         """
         Gets a list of model PermissionView permissions infered from a builtin role
@@ -1072,75 +1147,158 @@ class RabbitaiSecurityManager(SecurityManager):
     def get_anonymous_user(self) -> User:  # pylint: disable=no-self-use
         return AnonymousUserMixin()
 
-    def get_rls_filters(self, table: "BaseDatasource") -> List[SqlaQuery]:
+    def get_rls_filters(self, table: "BaseDatasource") -> List[RLSFilter]:
         """
         Retrieves the appropriate row level security filters for the current user and
         the passed table.
 
+        The filters are cached per request by the user roles and the table, and
+        additionally in the shared cache when `RLS_FILTERS_CACHE_TIMEOUT` is set.
+
         :param table: The table to check against
         :returns: A list of filters
         """
-        if hasattr(g, "user") and hasattr(g.user, "id"):
-            from rabbitai.connectors.sqla.models import (
-                RLSFilterRoles,
-                RLSFilterTables,
-                RowLevelSecurityFilter,
-            )
+        if not (hasattr(g, "user") and hasattr(g.user, "id")):
+            return []
 
-            user_roles = (
-                self.get_session.query(assoc_user_role.c.role_id)
-                    .filter(assoc_user_role.c.user_id == g.user.get_id())
-                    .subquery()
+        role_ids = sorted(role.id for role in g.user.roles)
+        request_cache: Dict[Tuple[Any, ...], List[RLSFilter]] = g.setdefault(
+            "rls_filters", {}
+        )
+        request_key = (tuple(role_ids), table.id)
+        if request_key in request_cache:
+            return request_cache[request_key]
+
+        timeout = current_app.config["RLS_FILTERS_CACHE_TIMEOUT"]
+        cache_key = None
+        if timeout is not None:
+            cache_key = "rls_filters__{version}__{table_id}__{roles}".format(
+                version=self._get_cache_version(RLS_FILTERS_VERSION_KEY),
+                table_id=table.id,
+                roles=",".join(str(role_id) for role_id in role_ids),
             )
-            regular_filter_roles = (
-                self.get_session.query(RLSFilterRoles.c.rls_filter_id)
-                    .join(RowLevelSecurityFilter)
-                    .filter(
-                    RowLevelSecurityFilter.filter_type
-                    == RowLevelSecurityFilterType.REGULAR
-                )
-                    .filter(RLSFilterRoles.c.role_id.in_(user_roles))
-                    .subquery()
+            filters = cache_manager.cache.get(cache_key)
+            if filters is not None:
+                request_cache[request_key] = filters
+                return filters
+
+        filters = [RLSFilter(*row) for row in self._query_rls_filters(table)]
+        request_cache[request_key] = filters
+        if cache_key:
+            cache_manager.cache.set(cache_key, filters, timeout=timeout)
+        return filters
+
+    def _query_rls_filters(self, table: "BaseDatasource") -> SqlaQuery:
+        """
+        Builds the query of the row level security filters for the current user and
+        the passed table.
+
+        :param table: The table to check against
+        :returns: The query of the filters
+        """
+        from rabbitai.connectors.sqla.models import (
+            RLSFilterRoles,
+            RLSFilterTables,
+            RowLevelSecurityFilter,
+        )
+
+        user_roles = (
+            self.get_session.query(assoc_user_role.c.role_id)
+                .filter(assoc_user_role.c.user_id == g.user.get_id())
+                .subquery()
+        )
+        regular_filter_roles = (
+            self.get_session.query(RLSFilterRoles.c.rls_filter_id)
+                .join(RowLevelSecurityFilter)
+                .filter(
+                RowLevelSecurityFilter.filter_type
+                == RowLevelSecurityFilterType.REGULAR
             )
-            base_filter_roles = (
-                self.get_session.query(RLSFilterRoles.c.rls_filter_id)
-                    .join(RowLevelSecurityFilter)
-                    .filter(
-                    RowLevelSecurityFilter.filter_type
-                    == RowLevelSecurityFilterType.BASE
-                )
-                    .filter(RLSFilterRoles.c.role_id.in_(user_roles))
-                    .subquery()
+                .filter(RLSFilterRoles.c.role_id.in_(user_roles))
+                .subquery()
+        )
+        base_filter_roles = (
+            self.get_session.query(RLSFilterRoles.c.rls_filter_id)
+                .join(RowLevelSecurityFilter)
+                .filter(
+                RowLevelSecurityFilter.filter_type
+                == RowLevelSecurityFilterType.BASE
             )
-            filter_tables = (
-                self.get_session.query(RLSFilterTables.c.rls_filter_id)
-                    .filter(RLSFilterTables.c.table_id == table.id)
-                    .subquery()
+                .filter(RLSFilterRoles.c.role_id.in_(user_roles))
+                .subquery()
+        )
+        filter_tables = (
+            self.get_session.query(RLSFilterTables.c.rls_filter_id)
+                .filter(RLSFilterTables.c.table_id == table.id)
+                .subquery()
+        )
+        query = (
+            self.get_session.query(
+                RowLevelSecurityFilter.id,
+                RowLevelSecurityFilter.group_key,
+                RowLevelSecurityFilter.clause,
             )
-            query = (
-                self.get_session.query(
-                    RowLevelSecurityFilter.id,
-                    RowLevelSecurityFilter.group_key,
-                    RowLevelSecurityFilter.clause,
-                )
-                    .filter(RowLevelSecurityFilter.id.in_(filter_tables))
-                    .filter(
-                    or_(
-                        and_(
-                            RowLevelSecurityFilter.filter_type
-                            == RowLevelSecurityFilterType.REGULAR,
-                            RowLevelSecurityFilter.id.in_(regular_filter_roles),
-                        ),
-                        and_(
-                            RowLevelSecurityFilter.filter_type
-                            == RowLevelSecurityFilterType.BASE,
-                            RowLevelSecurityFilter.id.notin_(base_filter_roles),
-                        ),
-                    )
+                .filter(RowLevelSecurityFilter.id.in_(filter_tables))
+                .filter(
+                or_(
+                    and_(
+                        RowLevelSecurityFilter.filter_type
+                        == RowLevelSecurityFilterType.REGULAR,
+                        RowLevelSecurityFilter.id.in_(regular_filter_roles),
+                    ),
+                    and_(
+                        RowLevelSecurityFilter.filter_type
+                        == RowLevelSecurityFilterType.BASE,
+                        RowLevelSecurityFilter.id.notin_(base_filter_roles),
+                    ),
                 )
             )
-            return query.all()
-        return []
+        )
+        return query
+
+    @staticmethod
+    def _get_cache_version(version_key: str) -> str:
+        """
+        Returns the version token stored in the shared cache under the passed key,
+        which is part of the cache keys of the entries it versions.
+
+        :param version_key: The cache key of the version token
+        :returns: The version
+        """
+        cache = cache_manager.cache
+        version = cache.get(version_key)
+        if version is None:
+            version = uuid.uuid4().hex
+            if not cache.add(version_key, version, timeout=0):
+                version = cache.get(version_key) or version
+        return version
+
+    @staticmethod
+    def _bump_cache_version(version_key: str) -> None:
+        """
+        Replaces the version token under the passed key, so entries cached with the
+        previous version are no longer read.
+
+        :param version_key: The cache key of the version token
+        """
+        cache_manager.cache.set(version_key, uuid.uuid4().hex, timeout=0)
+
+    @staticmethod
+    def invalidate_rls_filters(  # pylint: disable=unused-argument
+        mapper: Mapper, connection: Connection, target: Any
+    ) -> None:
+        """
+        Invalidates the cached row level security filters when a filter, or its roles
+        or tables, change.
+
+        :param mapper: The mapper
+        :param connection: The DB-API connection
+        :param target: The mapped instance being persisted
+        """
+        if has_app_context():
+            g.pop("rls_filters", None)
+            if current_app.config["RLS_FILTERS_CACHE_TIMEOUT"] is not None:
+                RabbitaiSecurityManager._bump_cache_version(RLS_FILTERS_VERSION_KEY)
 
     def get_rls_ids(self, table: "BaseDatasource") -> List[int]:
         """
@@ -1208,3 +1366,18 @@ class RabbitaiSecurityManager(SecurityManager):
 
         exists = db.session.query(query.exists()).scalar()
         return exists
+
+
+for event_name in ("after_insert", "after_update", "after_delete"):
+    sqla.event.listen(
+        Role,
+        event_name,
+        RabbitaiSecurityManager.invalidate_permission_index,
+        propagate=True,
+    )
+sqla.event.listen(
+    PermissionView,
+    "after_delete",
+    RabbitaiSecurityManager.invalidate_permission_index,
+    propagate=True,
+)
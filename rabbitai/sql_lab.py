@@ -10,7 +10,6 @@ from typing import Any, cast, Dict, List, Optional, Tuple, Union
 
 import backoff
 import msgpack
-import pyarrow as pa
 import simplejson as json
 from celery import Task
 from celery.exceptions import SoftTimeLimitExceeded
@@ -22,21 +21,22 @@ from rabbitai import app, results_backend, results_backend_use_msgpack, security
 from rabbitai.dataframe import df_to_records
 from rabbitai.db_engine_specs import BaseEngineSpec
 from rabbitai.errors import ErrorLevel, RabbitaiError, RabbitaiErrorType
-from rabbitai.exceptions import RabbitaiErrorException, RabbitaiErrorsException
+from rabbitai.exceptions import (
+    RabbitaiErrorException,
+    RabbitaiErrorsException,
+    ResultSetTooLargeError,
+)
 from rabbitai.extensions import celery_app
 from rabbitai.models.core import Database
 from rabbitai.models.sql_lab import LimitingFactor, Query
-from rabbitai.result_set import RabbitaiResultSet
+from rabbitai.result_set import RabbitaiResultSet, row_batches_to_arrow_table
 from rabbitai.sql_parse import CtasMethod, ParsedQuery
 from rabbitai.utils.celery import session_scope
-from rabbitai.utils.core import (
-    json_iso_dttm_ser,
-    QuerySource,
-    QueryStatus,
-    zlib_compress,
-)
+from rabbitai.utils.core import json_iso_dttm_ser, QuerySource, QueryStatus
 from rabbitai.utils.dates import now_as_float
 from rabbitai.utils.decorators import stats_timing
+from rabbitai.utils.results_chunks import write_table_chunks
+from rabbitai.utils.results_format import compress_results, table_to_arrow_file
 
 
 # pylint: disable=unused-argument, redefined-outer-name
@@ -56,6 +56,8 @@ SQLLAB_TIMEOUT = config["SQLLAB_ASYNC_TIME_LIMIT_SEC"]
 SQLLAB_HARD_TIMEOUT = SQLLAB_TIMEOUT + 60
 SQL_MAX_ROW = config["SQL_MAX_ROW"]
 SQLLAB_CTAS_NO_LIMIT = config["SQLLAB_CTAS_NO_LIMIT"]
+RESULTS_FETCH_BATCH_SIZE = config["RESULTS_FETCH_BATCH_SIZE"]
+RESULTS_FETCH_MAX_BYTES = config["RESULTS_FETCH_MAX_BYTES"]
 SQL_QUERY_MUTATOR = config.get("SQL_QUERY_MUTATOR") or dummy_sql_query_mutator
 log_query = config["QUERY_LOGGER"]
 logger = logging.getLogger(__name__)
@@ -302,12 +304,22 @@ def execute_sql_statement(
                 query.id,
                 str(query.to_dict()),
             )
-            data = db_engine_spec.fetch_data(cursor, increased_limit)
+            data = db_engine_spec.fetch_data_as_arrow(cursor, increased_limit)
+            if data is None and RESULTS_FETCH_BATCH_SIZE:
+                # stream the rows into Arrow, fetching stops after `increased_limit`
+                data = row_batches_to_arrow_table(
+                    db_engine_spec.fetch_data_in_batches(
+                        cursor, increased_limit, RESULTS_FETCH_BATCH_SIZE
+                    ),
+                    RESULTS_FETCH_MAX_BYTES,
+                )
+            elif data is None:
+                data = db_engine_spec.fetch_data(cursor, increased_limit)
             if query.limit is None or len(data) <= query.limit:
                 query.limiting_factor = LimitingFactor.NOT_LIMITED
             else:
                 # return 1 row less than increased_query
-                data = data[:-1]
+                data = data[: query.limit]
     except SoftTimeLimitExceeded as ex:
         logger.warning("Query %d: Time limit exceeded", query.id)
         logger.debug("Query %d: %s", query.id, ex)
@@ -321,6 +333,10 @@ def execute_sql_statement(
                 level=ErrorLevel.ERROR,
             )
         )
+    except ResultSetTooLargeError:
+        logger.warning("Query %d: Result set too large", query.id)
+        stats_logger.incr("error_sqllab_result_set_too_large")
+        raise
     except Exception as ex:
         # query is stopped in another thread/worker
         # stopping raises expected exceptions which we should skip
@@ -376,14 +392,9 @@ def _serialize_and_expand_data(
 
     if use_msgpack:
         with stats_timing(
-            "sqllab.query.results_backend_pa_serialization", stats_logger
+            "sqllab.query.results_backend_arrow_serialization", stats_logger
         ):
-            data = (
-                pa.default_serialization_context()
-                    .serialize(result_set.pa_table)
-                    .to_buffer()
-                    .to_pybytes()
-            )
+            data = table_to_arrow_file(result_set.pa_table)
 
         # expand when loading data from results backend
         all_columns, expanded_columns = (selected_columns, [])
@@ -575,9 +586,24 @@ def execute_sql_statements(
     query.end_time = now_as_float()
 
     use_arrow_data = store_results and cast(bool, results_backend_use_msgpack)
-    data, selected_columns, all_columns, expanded_columns = _serialize_and_expand_data(
-        result_set, db_engine_spec, use_arrow_data, expand_data
-    )
+    chunk_rows = config["RESULTS_BACKEND_CHUNK_ROWS"] if use_arrow_data else None
+    if chunk_rows:
+        # the rows are stored as Arrow chunks below and expanded when loaded
+        data, selected_columns, all_columns, expanded_columns = (
+            None,
+            result_set.columns,
+            result_set.columns,
+            [],
+        )
+    else:
+        (
+            data,
+            selected_columns,
+            all_columns,
+            expanded_columns,
+        ) = _serialize_and_expand_data(
+            result_set, db_engine_spec, use_arrow_data, expand_data
+        )
 
     # TODO: data should be saved separately from metadata (likely in Parquet)
     payload.update(
@@ -598,17 +624,43 @@ def execute_sql_statements(
             "Query %s: Storing results in results backend, key: %s", str(query_id), key
         )
         with stats_timing("sqllab.query.results_backend_write", stats_logger):
+            cache_timeout = database.cache_timeout
+            if cache_timeout is None:
+                cache_timeout = config["CACHE_DEFAULT_TIMEOUT"]
+
+            stored_payload = payload
+            if chunk_rows:
+                # the entry under the results key only keeps the metadata and
+                # the manifest of the chunks
+                with stats_timing(
+                    "sqllab.query.results_backend_write_chunks", stats_logger
+                ):
+                    chunks = write_table_chunks(
+                        results_backend,
+                        key,
+                        result_set.pa_table,
+                        chunk_rows,
+                        cache_timeout,
+                        config["RESULTS_BACKEND_COMPRESSION"],
+                        config["RESULTS_BACKEND_COMPRESSION_LEVEL"],
+                    )
+                stored_payload = {**payload, "chunks": chunks}
+
             with stats_timing(
                 "sqllab.query.results_backend_write_serialization", stats_logger
             ):
                 serialized_payload = _serialize_payload(
-                    payload, cast(bool, results_backend_use_msgpack)
+                    stored_payload, cast(bool, results_backend_use_msgpack)
                 )
-            cache_timeout = database.cache_timeout
-            if cache_timeout is None:
-                cache_timeout = config["CACHE_DEFAULT_TIMEOUT"]
 
-            compressed = zlib_compress(serialized_payload)
+            with stats_timing(
+                "sqllab.query.results_backend_write_compression", stats_logger
+            ):
+                compressed = compress_results(
+                    serialized_payload,
+                    config["RESULTS_BACKEND_COMPRESSION"],
+                    config["RESULTS_BACKEND_COMPRESSION_LEVEL"],
+                )
             logger.debug(
                 "*** serialized payload size: %i", getsizeof(serialized_payload)
             )
@@ -1,17 +1,22 @@
 # -*- coding: utf-8 -*-
 
+import hashlib
 import logging
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass  # pylint: disable=wrong-import-order
 from enum import Enum
-from typing import List, Optional, Set
+from typing import Any, FrozenSet, List, Optional, Set, Tuple
 from urllib import parse
 
 import sqlparse
+from flask import Flask
 from sqlparse.sql import (
     Identifier,
     IdentifierList,
     Parenthesis,
     remove_quotes,
+    Statement,
     Token,
     TokenList,
 )
@@ -84,6 +89,148 @@ class Table:
         )
 
 
+@dataclass
+class _ParseResult:
+    """SQL 语句的解析结果，由同一语句的 ParsedQuery 实例共享，不可修改其中的语法树。"""
+
+    sql: str
+    statements: Tuple[Statement, ...]
+    limit: Optional[int]
+    size: int
+    tables: Optional[FrozenSet[Table]] = None
+
+
+class ParsedQueryCache:
+    """
+    SQL 语句解析结果的 LRU 缓存，键为语句的哈希值和是否去掉注释，
+    按解析结果的估算字节数淘汰，命中和未命中次数记录到统计日志。
+    """
+
+    # sqlparse 语法树中每个叶子词元占用的估算字节数，包括其所在的分组
+    TOKEN_SIZE = 512
+
+    def __init__(self, max_bytes: int = 0) -> None:
+        """
+        :param max_bytes: 缓存的最大估算字节数，为 0 时不缓存。
+        """
+
+        self.max_bytes = max_bytes
+        self.stats_logger: Any = None
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, bool], _ParseResult]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app: Flask) -> None:
+        """
+        依据应用配置 SQL_PARSE_CACHE_MAX_BYTES 初始化缓存。
+
+        :param app: Flask 应用。
+        """
+
+        self.max_bytes = app.config["SQL_PARSE_CACHE_MAX_BYTES"]
+        self.stats_logger = app.config["STATS_LOGGER"]
+        self.clear()
+
+    @staticmethod
+    def make_key(sql: str, strip_comments: bool) -> Tuple[str, bool]:
+        return hashlib.sha256(sql.encode("utf-8")).hexdigest(), strip_comments
+
+    def get(self, sql: str, strip_comments: bool) -> Optional[_ParseResult]:
+        """
+        获取 SQL 语句的解析结果。
+
+        :param sql: SQL 语句字符串。
+        :param strip_comments: 是否去掉注释。
+        :return: 解析结果，未缓存时返回 None。
+        """
+
+        if not self.max_bytes:
+            return None
+
+        key = self.make_key(sql, strip_comments)
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+
+        if self.stats_logger:
+            self.stats_logger.incr(
+                "sql_parse.cache_miss" if result is None else "sql_parse.cache_hit"
+            )
+        return result
+
+    def set(self, sql: str, strip_comments: bool, result: _ParseResult) -> None:
+        """
+        缓存 SQL 语句的解析结果，超出最大字节数时淘汰最久未使用的结果。
+
+        :param sql: SQL 语句字符串。
+        :param strip_comments: 是否去掉注释。
+        :param result: 解析结果。
+        """
+
+        if not self.max_bytes or result.size > self.max_bytes:
+            return
+
+        key = self.make_key(sql, strip_comments)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= previous.size
+            self._entries[key] = result
+            self.size += result.size
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= evicted.size
+
+    def clear(self) -> None:
+        """清空缓存。"""
+
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+            self.hits = 0
+            self.misses = 0
+
+
+parsed_query_cache = ParsedQueryCache()
+
+
+def _parse(sql_statement: str, strip_comments: bool) -> _ParseResult:
+    """
+    解析 SQL 语句，优先使用缓存的解析结果。
+
+    :param sql_statement: SQL 语句字符串。
+    :param strip_comments: 是否去掉注释。
+    :return: 解析结果。
+    """
+
+    result = parsed_query_cache.get(sql_statement, strip_comments)
+    if result is not None:
+        return result
+
+    sql = sql_statement
+    if strip_comments:
+        sql = sqlparse.format(sql, strip_comments=True)
+
+    logger.debug("Parsing with sqlparse statement: %s", sql)
+    statements = tuple(sqlparse.parse(sql.strip(" \t\n;")))
+    limit = None
+    for statement in statements:
+        limit = _extract_limit_from_query(statement)
+
+    size = len(sql) + ParsedQueryCache.TOKEN_SIZE * sum(
+        1 for statement in statements for _ in statement.flatten()
+    )
+    result = _ParseResult(sql=sql, statements=statements, limit=limit, size=size)
+    parsed_query_cache.set(sql_statement, strip_comments, result)
+    return result
+
+
 class ParsedQuery:
     """解析的查询，使用 sqlparse 包，提供将SQL语句解析为数据库对象的功能。"""
 
@@ -95,29 +242,27 @@ class ParsedQuery:
         :param strip_comments: 是否去掉注释（默认False）。
         """
 
-        if strip_comments:
-            sql_statement = sqlparse.format(sql_statement, strip_comments=True)
-
-        self.sql: str = sql_statement
+        self._result = _parse(sql_statement, strip_comments)
+        self.sql: str = self._result.sql
         self._tables: Set[Table] = set()
         self._alias_names: Set[str] = set()
-        self._limit: Optional[int] = None
-
-        logger.debug("Parsing with sqlparse statement: %s", self.sql)
-        self._parsed = sqlparse.parse(self.stripped())
-        for statement in self._parsed:
-            self._limit = _extract_limit_from_query(statement)
+        self._limit: Optional[int] = self._result.limit
+        self._parsed = self._result.statements
 
     @property
     def tables(self) -> Set[Table]:
         """获取数据表对象的集合。"""
         if not self._tables:
+            if self._result.tables is not None:
+                return set(self._result.tables)
+
             for statement in self._parsed:
                 self._extract_from_token(statement)
 
             self._tables = {
                 table for table in self._tables if str(table) not in self._alias_names
             }
+            self._result.tables = frozenset(self._tables)
         return self._tables
 
     @property
@@ -323,22 +468,25 @@ class ParsedQuery:
         if not self._limit:
             return f"{self.stripped()}\nLIMIT {new_limit}"
         limit_pos = None
+        # the parsed statements are shared through the cache, so the limit is
+        # swapped while joining the tokens rather than set on the token itself
         statement = self._parsed[0]
         # Add all items to before_str until there is a limit
         for pos, item in enumerate(statement.tokens):
             if item.ttype in Keyword and item.value.lower() == "limit":
                 limit_pos = pos
                 break
-        _, limit = statement.token_next(idx=limit_pos)
+        limit_idx, limit = statement.token_next(idx=limit_pos)
+        limit_value = limit.value
         # Override the limit only when it exceeds the configured value.
         if limit.ttype == sqlparse.tokens.Literal.Number.Integer and (
             force or new_limit < int(limit.value)
         ):
-            limit.value = new_limit
+            limit_value = str(new_limit)
         elif limit.is_group:
-            limit.value = f"{next(limit.get_identifiers())}, {new_limit}"
+            limit_value = f"{next(limit.get_identifiers())}, {new_limit}"
 
-        str_res = ""
-        for i in statement.tokens:
-            str_res += str(i.value)
-        return str_res
+        return "".join(
+            limit_value if i == limit_idx else str(token.value)
+            for i, token in enumerate(statement.tokens)
+        )
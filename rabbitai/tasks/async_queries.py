@@ -14,7 +14,11 @@ from rabbitai.extensions import (
     celery_app,
     security_manager,
 )
-from rabbitai.utils.cache import generate_cache_key, set_and_log_cache
+from rabbitai.utils.cache import (
+    generate_cache_key,
+    release_refresh_lock,
+    set_and_log_cache,
+)
 from rabbitai.views.utils import get_datasource_info, get_viz
 
 logger = logging.getLogger(__name__)
@@ -70,6 +74,110 @@ def load_chart_data_into_cache(job_metadata: Dict[str, Any], form_data: Dict[str
         raise exc
 
 
+@celery_app.task(name="refresh_chart_data_cache", soft_time_limit=query_timeout)
+def refresh_chart_data_cache(
+    form_data: Dict[str, Any], user_id: Optional[int], lock_key: str,
+) -> None:
+    """
+    在后台强制重新查询图表数据并写入缓存，用于刷新已超过软超时的缓存。
+
+    :param form_data: 查询上下文的表单数据。
+    :param user_id: 发起请求的用户标识。
+    :param lock_key: 刷新锁的键，任务结束时释放。
+    :return:
+    """
+
+    from rabbitai.charts.commands.data import ChartDataCommand
+
+    try:
+        ensure_user_is_set(user_id)
+        command = ChartDataCommand()
+        command.set_query_context({**form_data, "force": True})
+        command.run()
+    except SoftTimeLimitExceeded as ex:
+        logger.warning("A timeout occurred while refreshing chart data, error: %s", ex)
+        raise ex
+    finally:
+        release_refresh_lock(cache_manager.data_cache, lock_key)
+
+
+@celery_app.task(name="refresh_explore_json_cache", soft_time_limit=query_timeout)
+def refresh_explore_json_cache(
+    datasource_id: int,
+    datasource_type: str,
+    form_data: Dict[str, Any],
+    user_id: Optional[int],
+    lock_key: str,
+) -> None:
+    """
+    在后台强制重新查询可视化数据并写入缓存，用于刷新已超过软超时的缓存。
+
+    :param datasource_id: 数据源标识。
+    :param datasource_type: 数据源类型。
+    :param form_data: 表单数据。
+    :param user_id: 发起请求的用户标识。
+    :param lock_key: 刷新锁的键，任务结束时释放。
+    :return:
+    """
+
+    try:
+        ensure_user_is_set(user_id)
+        viz_obj = get_viz(
+            datasource_type=datasource_type,
+            datasource_id=datasource_id,
+            form_data=form_data,
+            force=True,
+        )
+        viz_obj.get_payload()
+    except SoftTimeLimitExceeded as ex:
+        logger.warning(
+            "A timeout occurred while refreshing explore json, error: %s", ex
+        )
+        raise ex
+    finally:
+        release_refresh_lock(cache_manager.data_cache, lock_key)
+
+
+@celery_app.task(name="refresh_distinct_values_cache", soft_time_limit=query_timeout)
+def refresh_distinct_values_cache(
+    datasource_type: str,
+    datasource_id: int,
+    column_name: str,
+    limit: int,
+    user_id: Optional[int],
+    lock_key: str,
+) -> None:
+    """
+    在后台重新查询列的不同值并写入缓存，用于刷新已超过软超时的缓存。
+
+    :param datasource_type: 数据源类型。
+    :param datasource_id: 数据源标识。
+    :param column_name: 列名称。
+    :param limit: 最大行数。
+    :param user_id: 发起请求的用户标识。
+    :param lock_key: 刷新锁的键，任务结束时释放。
+    :return:
+    """
+
+    from rabbitai import db
+    from rabbitai.connectors.connector_registry import ConnectorRegistry
+    from rabbitai.utils.distinct_values import load_distinct_values
+
+    try:
+        ensure_user_is_set(user_id)
+        datasource = ConnectorRegistry.get_datasource(
+            datasource_type, datasource_id, db.session
+        )
+        load_distinct_values(datasource, column_name, limit)
+    except SoftTimeLimitExceeded as ex:
+        logger.warning(
+            "A timeout occurred while refreshing distinct values, error: %s", ex
+        )
+        raise ex
+    finally:
+        release_refresh_lock(cache_manager.data_cache, lock_key)
+
+
 @celery_app.task(name="load_explore_json_into_cache", soft_time_limit=query_timeout)
 def load_explore_json_into_cache(
     job_metadata: Dict[str, Any],
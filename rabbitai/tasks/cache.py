@@ -2,24 +2,35 @@
 
 import json
 import logging
-from typing import Any, Dict, List, Optional, Union
-from urllib import request
-from urllib.error import URLError
+import pickle
+import threading
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from celery.utils.log import get_task_logger
 from sqlalchemy import and_, func
 
-from rabbitai import app, db
-from rabbitai.extensions import celery_app
+from rabbitai import app, db, security_manager
+from rabbitai.exceptions import RabbitaiVizException
+from rabbitai.extensions import cache_manager, celery_app
 from rabbitai.models.core import Log
 from rabbitai.models.dashboard import Dashboard
 from rabbitai.models.slice import Slice
 from rabbitai.models.tags import Tag, TaggedObject
+from rabbitai.utils.cache import get_cache_value
+from rabbitai.utils.concurrency import run_concurrently
+from rabbitai.utils.core import error_msg_from_exception, override_user
 from rabbitai.utils.date_parser import parse_human_datetime
-from rabbitai.views.utils import build_extra_filters
+from rabbitai.utils.dates import now_as_float
+from rabbitai.views.utils import build_extra_filters, get_viz
 
 logger = get_task_logger(__name__)
 logger.setLevel(logging.INFO)
+stats_logger = app.config["STATS_LOGGER"]
+
+# 预热目标：图表和其所在的仪表盘，单独预热的图表没有仪表盘
+WarmUpTarget = Tuple[Slice, Optional[Dashboard]]
 
 
 def get_form_data(
@@ -83,8 +94,10 @@ class Strategy:
     """
     A cache warm up strategy.
 
-    Each strategy defines a `get_urls` method that returns a list of URLs to
-    be fetched from the `/rabbitai/warm_up_cache/` endpoint.
+    Each strategy defines a `get_charts` method that returns the charts to warm
+    up, along with the dashboard they are warmed up for (whose default filters
+    are applied), or None for standalone charts. The charts are executed
+    in-process by the `cache-warmup` task.
 
     Strategies can be configured in `rabbitai/config.py`:
 
@@ -105,8 +118,14 @@ class Strategy:
     def __init__(self) -> None:
         pass
 
+    def get_charts(self) -> List[WarmUpTarget]:
+        raise NotImplementedError("Subclasses must implement get_charts!")
+
     def get_urls(self) -> List[str]:
-        raise NotImplementedError("Subclasses must implement get_urls!")
+        return [
+            get_url(chart, get_form_data(chart.id, dashboard) if dashboard else None)
+            for chart, dashboard in self.get_charts()
+        ]
 
 
 class DummyStrategy(Strategy):
@@ -127,11 +146,11 @@ class DummyStrategy(Strategy):
 
     name = "dummy"
 
-    def get_urls(self) -> List[str]:
+    def get_charts(self) -> List[WarmUpTarget]:
         session = db.create_scoped_session()
         charts = session.query(Slice).all()
 
-        return [get_url(chart) for chart in charts]
+        return [(chart, None) for chart in charts]
 
 
 class TopNDashboardsStrategy(Strategy):
@@ -159,8 +178,8 @@ class TopNDashboardsStrategy(Strategy):
         self.top_n = top_n
         self.since = parse_human_datetime(since) if since else None
 
-    def get_urls(self) -> List[str]:
-        urls = []
+    def get_charts(self) -> List[WarmUpTarget]:
+        targets: List[WarmUpTarget] = []
         session = db.create_scoped_session()
 
         records = (
@@ -175,10 +194,9 @@ class TopNDashboardsStrategy(Strategy):
         dashboards = session.query(Dashboard).filter(Dashboard.id.in_(dash_ids)).all()
         for dashboard in dashboards:
             for chart in dashboard.slices:
-                form_data_with_filters = get_form_data(chart.id, dashboard)
-                urls.append(get_url(chart, form_data_with_filters))
+                targets.append((chart, dashboard))
 
-        return urls
+        return targets
 
 
 class DashboardTagsStrategy(Strategy):
@@ -203,8 +221,8 @@ class DashboardTagsStrategy(Strategy):
         super(DashboardTagsStrategy, self).__init__()
         self.tags = tags or []
 
-    def get_urls(self) -> List[str]:
-        urls = []
+    def get_charts(self) -> List[WarmUpTarget]:
+        targets: List[WarmUpTarget] = []
         session = db.create_scoped_session()
 
         tags = session.query(Tag).filter(Tag.name.in_(self.tags)).all()
@@ -225,7 +243,7 @@ class DashboardTagsStrategy(Strategy):
         tagged_dashboards = session.query(Dashboard).filter(Dashboard.id.in_(dash_ids))
         for dashboard in tagged_dashboards:
             for chart in dashboard.slices:
-                urls.append(get_url(chart))
+                targets.append((chart, None))
 
         # add charts that are tagged
         tagged_objects = (
@@ -241,22 +259,250 @@ class DashboardTagsStrategy(Strategy):
         chart_ids = [tagged_object.object_id for tagged_object in tagged_objects]
         tagged_charts = session.query(Slice).filter(Slice.id.in_(chart_ids))
         for chart in tagged_charts:
-            urls.append(get_url(chart))
+            targets.append((chart, None))
+
+        return targets
 
-        return urls
 
+class NearExpiryStrategy(Strategy):
+    """
+    Warm up charts whose data cache entries expire soon.
+
+    Only charts that are cached and expire within `threshold` seconds are
+    warmed up, so that they are refreshed before users hit a cache miss.
+    Combine with `DATA_CACHE_STALE_TIMEOUT` to cover the charts that expire
+    between two runs.
+
+        CELERYBEAT_SCHEDULE = {
+            'cache-warmup-near-expiry': {
+                'task': 'cache-warmup',
+                'schedule': crontab(minute='*/10'),
+                'kwargs': {
+                    'strategy_name': 'near_expiry',
+                    'threshold': 900,
+                },
+            },
+        }
+
+    """
+
+    name = "near_expiry"
+
+    def __init__(self, threshold: int = 600) -> None:
+        super(NearExpiryStrategy, self).__init__()
+        self.threshold = threshold
+
+    def get_charts(self) -> List[WarmUpTarget]:
+        targets: List[WarmUpTarget] = []
+        session = db.create_scoped_session()
+        deadline = datetime.utcnow() + timedelta(seconds=self.threshold)
+
+        for chart in session.query(Slice).all():
+            try:
+                expires = get_cache_expiry(chart)
+            except Exception:  # pylint: disable=broad-except
+                logger.warning("Could not get the cache keys of chart %s", chart.id)
+                continue
+            if expires is not None and expires <= deadline:
+                targets.append((chart, None))
+
+        return targets
+
+
+strategies = [
+    DummyStrategy,
+    TopNDashboardsStrategy,
+    DashboardTagsStrategy,
+    NearExpiryStrategy,
+]
+
+
+def get_query_context(
+    chart: Slice, extra_filters: Optional[List[Dict[str, Any]]] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    获取图表保存的查询上下文，并将仪表盘的默认过滤器添加到每个查询的过滤器中。
+
+    :param chart: 图表。
+    :param extra_filters: 仪表盘的默认过滤器。
+    :return: 查询上下文，图表没有保存查询上下文时返回 None。
+    """
+
+    if not chart.query_context:
+        return None
+
+    query_context = json.loads(chart.query_context)
+    for query in query_context.get("queries", []):
+        query["filters"] = query.get("filters", []) + [
+            {**extra_filter, "op": extra_filter["op"].upper()}
+            for extra_filter in extra_filters or []
+        ]
+    return query_context
+
+
+def get_cache_keys(chart: Slice) -> List[Tuple[str, int]]:
+    """
+    获取图表数据在数据缓存中的键，不执行查询。
+
+    :param chart: 图表。
+    :return: 缓存键和缓存超时的列表。
+    """
+
+    # pylint: disable=import-outside-toplevel
+    from rabbitai.charts.schemas import ChartDataQueryContextSchema
+
+    query_context = get_query_context(chart)
+    if query_context is not None:
+        context = ChartDataQueryContextSchema().load(query_context)
+        cache_keys = [context.query_cache_key(query) for query in context.queries]
+        return [
+            (cache_key, context.cache_timeout) for cache_key in cache_keys if cache_key
+        ]
+
+    viz_obj = get_viz(
+        datasource_type=chart.datasource_type,
+        datasource_id=chart.datasource_id,
+        form_data=chart.form_data,
+    )
+    query_obj = viz_obj.query_obj()
+    if not query_obj:
+        return []
+    return [(viz_obj.cache_key(query_obj), viz_obj.cache_timeout)]
+
+
+def get_cache_expiry(chart: Slice) -> Optional[datetime]:
+    """
+    获取图表数据缓存最早的过期时间（UTC），启用旧数据时为软超时的时间。
+
+    :param chart: 图表。
+    :return: 过期时间，任一缓存条目不存在时返回 None。
+    """
 
-strategies = [DummyStrategy, TopNDashboardsStrategy, DashboardTagsStrategy]
+    expiries = []
+    for cache_key, cache_timeout in get_cache_keys(chart):
+        cache_value = get_cache_value(cache_manager.data_cache, cache_key)
+        if not cache_value:
+            return None
+        if cache_value.get("stale_after") is not None:
+            expiries.append(datetime.utcfromtimestamp(cache_value["stale_after"]))
+        else:
+            cached_dttm = datetime.fromisoformat(cache_value["dttm"])
+            expiries.append(cached_dttm + timedelta(seconds=cache_timeout))
+    return min(expiries) if expiries else None
+
+
+def get_cache_size(cache_key: Optional[str]) -> Optional[int]:
+    """
+    获取数据缓存条目的大小（字节），未编码的缓存值按其 pickle 序列化的大小估算。
+
+    :param cache_key: 缓存键。
+    :return: 大小，条目不存在时返回 None。
+    """
+
+    if not cache_key:
+        return None
+    cache_value = cache_manager.data_cache.get(cache_key)
+    if cache_value is None:
+        return None
+    if isinstance(cache_value, bytes):
+        return len(cache_value)
+    return len(pickle.dumps(cache_value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def warm_up_chart(
+    chart_id: int, extra_filters: Optional[List[Dict[str, Any]]] = None
+) -> Dict[str, Any]:
+    """
+    在当前进程中强制执行图表的查询并写入数据缓存。
+
+    保存了查询上下文的图表通过图表数据命令执行，否则通过可视化对象执行。
+
+    :param chart_id: 图表标识。
+    :param extra_filters: 仪表盘的默认过滤器。
+    :return: 图表标识、耗时（毫秒）、行数和缓存大小（字节）。
+    """
+
+    # pylint: disable=import-outside-toplevel
+    from rabbitai.charts.commands.data import ChartDataCommand
+
+    start = now_as_float()
+    chart = db.session.query(Slice).get(chart_id)
+    if chart is None:
+        raise Exception(f"Chart {chart_id} does not exist")
+
+    query_context = get_query_context(chart, extra_filters)
+    if query_context is not None:
+        command = ChartDataCommand()
+        command.set_query_context({**query_context, "force": True})
+        queries = command.run()["queries"]
+    else:
+        form_data = chart.form_data
+        if extra_filters:
+            form_data["extra_filters"] = extra_filters
+        viz_obj = get_viz(
+            datasource_type=chart.datasource_type,
+            datasource_id=chart.datasource_id,
+            form_data=form_data,
+            force=True,
+        )
+        payload = viz_obj.get_payload()
+        if viz_obj.has_error(payload):
+            raise RabbitaiVizException(errors=payload["errors"])
+        queries = [payload]
+
+    sizes = [get_cache_size(query.get("cache_key")) for query in queries]
+    return {
+        "chart_id": chart_id,
+        "duration_ms": round(now_as_float() - start, 2),
+        "rowcount": sum(query.get("rowcount") or 0 for query in queries),
+        "cache_size": sum(size or 0 for size in sizes),
+    }
+
+
+def _warm_up_chart_with_limit(
+    chart_id: int,
+    extra_filters: Optional[List[Dict[str, Any]]],
+    semaphore: threading.BoundedSemaphore,
+) -> Dict[str, Any]:
+    """
+    在数据库的并发限制内预热图表，记录耗时和缓存大小，捕获所有异常。
+
+    :param chart_id: 图表标识。
+    :param extra_filters: 仪表盘的默认过滤器。
+    :param semaphore: 图表所属数据库的信号量。
+    :return: 预热结果，失败时包括错误信息。
+    """
+
+    with semaphore:
+        try:
+            result = warm_up_chart(chart_id, extra_filters)
+        except Exception as ex:  # pylint: disable=broad-except
+            logger.exception("Error warming up cache for chart %s", chart_id)
+            stats_logger.incr("cache_warmup.chart.error")
+            return {"chart_id": chart_id, "error": error_msg_from_exception(ex)}
+
+    stats_logger.timing("cache_warmup.chart", result["duration_ms"])
+    stats_logger.gauge("cache_warmup.chart.cache_size", result["cache_size"])
+    logger.info(
+        "Warmed up chart %s in %sms, %s rows, %s bytes cached",
+        chart_id,
+        result["duration_ms"],
+        result["rowcount"],
+        result["cache_size"],
+    )
+    return result
 
 
 @celery_app.task(name="cache-warmup")
 def cache_warmup(
     strategy_name: str, *args: Any, **kwargs: Any
-) -> Union[Dict[str, List[str]], str]:
+) -> Union[Dict[str, List[Dict[str, Any]]], str]:
     """
     Warm up cache.
 
-    This task periodically hits charts to warm up the cache.
+    This task periodically executes charts in-process to warm up the cache, up to
+    `CACHE_WARMUP_MAX_WORKERS` charts concurrently and at most
+    `CACHE_WARMUP_CONCURRENCY_PER_DATABASE` charts per database.
 
     """
     logger.info("Loading strategy")
@@ -278,14 +524,53 @@ def cache_warmup(
         logger.exception(message)
         return message
 
-    results: Dict[str, List[str]] = {"success": [], "errors": []}
-    for url in strategy.get_urls():
-        try:
-            logger.info("Fetching %s", url)
-            request.urlopen(url)
-            results["success"].append(url)
-        except URLError:
-            logger.exception("Error warming up cache!")
-            results["errors"].append(url)
+    user = security_manager.find_user(
+        username=app.config["CACHE_WARMUP_USER"]
+    ) or security_manager.get_anonymous_user()
+    if not user.is_anonymous:
+        # the roles are read by the worker threads for the row level security filters
+        list(user.roles)
+
+    with override_user(user):
+        return _warm_up_charts(strategy)
+
+
+def _warm_up_charts(strategy: Strategy) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    按数据库的并发限制并发预热策略选出的图表，查询按当前用户（g.user）的权限执行。
+
+    :param strategy: 缓存预热策略。
+    :return: 成功和失败的预热结果。
+    """
+
+    semaphores: Dict[Optional[int], threading.BoundedSemaphore] = {}
+    tasks = []
+    seen = set()
+    for chart, dashboard in strategy.get_charts():
+        extra_filters = get_form_data(chart.id, dashboard).get("extra_filters")
+        key = (chart.id, json.dumps(extra_filters, sort_keys=True))
+        if key in seen:
+            continue
+        seen.add(key)
+
+        database_id = chart.datasource.database.id if chart.datasource else None
+        if database_id not in semaphores:
+            semaphores[database_id] = threading.BoundedSemaphore(
+                app.config["CACHE_WARMUP_CONCURRENCY_PER_DATABASE"]
+            )
+        tasks.append(
+            partial(
+                _warm_up_chart_with_limit,
+                chart.id,
+                extra_filters,
+                semaphores[database_id],
+            )
+        )
+
+    start = now_as_float()
+    results: Dict[str, List[Dict[str, Any]]] = {"success": [], "errors": []}
+    for result in run_concurrently(tasks, app.config["CACHE_WARMUP_MAX_WORKERS"]):
+        results["errors" if "error" in result else "success"].append(result)
+    stats_logger.timing("cache_warmup", now_as_float() - start)
 
     return results
@@ -5,7 +5,7 @@ it needs to call create_app() in order to initialize things properly
 
 from typing import Any
 
-from celery.signals import worker_process_init
+from celery.signals import worker_process_init, worker_process_shutdown
 
 # Rabbitai framework imports
 from rabbitai import create_app
@@ -27,3 +27,17 @@ def reset_db_connection_pool(**kwargs: Any) -> None:
     with flask_app.app_context():
         # https://docs.sqlalchemy.org/en/14/core/connections.html#engine-disposal
         db.engine.dispose()
+
+
+@worker_process_shutdown.connect
+def shutdown_worker_process(**kwargs: Any) -> None:
+    # pool processes exit with os._exit(), which skips the atexit handlers
+    # pylint: disable=import-outside-toplevel
+    from rabbitai.extensions import event_logger
+    from rabbitai.utils.log import AsyncDBEventLogger
+    from rabbitai.utils.webdriver import webdriver_pool
+
+    webdriver_pool.clear()
+    if isinstance(event_logger, AsyncDBEventLogger):
+        # write the events still queued in this process
+        event_logger.shutdown()
@@ -3,19 +3,40 @@
 from __future__ import annotations
 
 import logging
+import threading
+import time
+import uuid
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from functools import wraps
-from typing import Any, Callable, Dict, Optional, TYPE_CHECKING, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    Optional,
+    Tuple,
+    TYPE_CHECKING,
+    Union,
+)
 
 from flask import current_app as app, request
 from flask_caching import Cache
 from flask_caching.backends import NullCache
+from pandas import DataFrame
 from werkzeug.wrappers import ETagResponseMixin  # .etag
 
 from rabbitai import db
 from rabbitai.extensions import cache_manager
 from rabbitai.models.cache import CacheKey
+from rabbitai.utils.cache_codec import (
+    CacheCodec,
+    decode_cache_value,
+    encode_cache_value,
+    is_encoded,
+)
 from rabbitai.utils.core import json_int_dttm_ser
+from rabbitai.utils.dates import now_as_float
 from rabbitai.utils.hashing import md5_sha_from_dict
 
 if TYPE_CHECKING:
@@ -39,21 +60,215 @@ def generate_cache_key(values_dict: Dict[str, Any], key_prefix: str = "") -> str
     return f"{key_prefix}{hash_str}"
 
 
+class _LocalLock:  # pylint: disable=too-few-public-methods
+    """进程内按缓存键共享的锁，记录等待者数量以便释放后清理。"""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.refcount = 0
+
+
+_local_locks: Dict[str, _LocalLock] = {}
+_local_locks_guard = threading.Lock()
+
+
+def _has_value(cache_instance: Cache, cache_key: str) -> bool:
+    """缓存后端中是否已有指定键的值，后端不支持 ``has`` 时回退为读取。"""
+
+    try:
+        return bool(cache_instance.has(cache_key))
+    except NotImplementedError:
+        return cache_instance.get(cache_key) is not None
+
+
+def _acquire_remote_lock(  # pylint: disable=too-many-arguments
+    cache_instance: Cache,
+    cache_key: str,
+    lock_key: str,
+    lock_timeout: int,
+    deadline: float,
+    poll_interval: float,
+) -> Tuple[Optional[str], bool]:
+    """
+    获取缓存后端中的锁，锁被其它工作进程持有时等待其释放。
+
+    持有者释放锁后缓存仍未命中（其计算失败）时，等待者通过 ``add`` 竞争锁，
+    只有一个成为新的计算者，其余的继续等待，直到缓存命中或等待超时。
+
+    :return: 锁的令牌（未获取时为 None）和是否等待过其它调用方的计算组成的元组。
+    """
+
+    token = str(uuid.uuid4())
+    try:
+        while not cache_instance.add(lock_key, token, timeout=lock_timeout):
+            stats_logger.incr("single_flight.remote_wait")
+            while (
+                cache_instance.get(lock_key) is not None
+                and time.monotonic() < deadline
+            ):
+                time.sleep(poll_interval)
+            if time.monotonic() >= deadline or _has_value(cache_instance, cache_key):
+                return None, True
+            stats_logger.incr("single_flight.takeover")
+    except Exception:  # pylint: disable=broad-except
+        # the cache backend is unavailable, only coalesce locally
+        logger.warning("Could not acquire cache lock %s", lock_key)
+        return None, False
+    return token, False
+
+
+@contextmanager
+def single_flight(
+    cache_instance: Cache, cache_key: Optional[str], poll_interval: float = 0.1
+) -> Iterator[bool]:
+    """
+    合并相同缓存键的并发计算，只让一个调用方执行计算，其它调用方等待其完成。
+
+    先通过进程内的本地锁合并同一进程中的线程，再通过缓存后端中的锁（``add`` 原子写入）
+    合并不同的工作进程。上下文返回值表示调用方是否等待过其它计算：为 True 时应重新读取缓存，
+    仍未命中（等待超时）时再自行计算。计算结果应写入同一缓存实例的 ``cache_key``。
+
+    计算者失败（释放锁时缓存仍未命中）时，只有一个等待者接替成为新的计算者（返回 False），
+    其余等待者继续等待，不会依次重复计算。
+
+    缓存键为空、未启用 DATA_CACHE_SINGLE_FLIGHT 或缓存后端为 NullCache 时不加锁，
+    直接返回 False。
+
+    :param cache_instance: 缓存实例。
+    :param cache_key: 缓存键。
+    :param poll_interval: 轮询缓存后端锁的间隔（秒）。
+    :return: 是否等待过其它调用方的计算。
+    """
+
+    if (
+        not cache_key
+        or not config["DATA_CACHE_SINGLE_FLIGHT"]
+        or isinstance(cache_instance.cache, NullCache)
+    ):
+        yield False
+        return
+
+    lock_key = f"{cache_key}__lock"
+    lock_timeout = config["DATA_CACHE_SINGLE_FLIGHT_LOCK_TIMEOUT"]
+    wait_timeout = config["DATA_CACHE_SINGLE_FLIGHT_WAIT_TIMEOUT"]
+    deadline = time.monotonic() + wait_timeout
+    waited = False
+    token: Optional[str] = None
+
+    with _local_locks_guard:
+        local_lock = _local_locks.setdefault(cache_key, _LocalLock())
+        local_lock.refcount += 1
+
+    acquired = local_lock.lock.acquire(blocking=False)
+    if not acquired:
+        waited = True
+        stats_logger.incr("single_flight.local_wait")
+        acquired = local_lock.lock.acquire(timeout=wait_timeout)
+
+    try:
+        if acquired and waited and not _has_value(cache_instance, cache_key):
+            # the previous leader in this process failed, take over from it
+            stats_logger.incr("single_flight.takeover")
+            waited = False
+        if acquired and not waited:
+            token, waited = _acquire_remote_lock(
+                cache_instance,
+                cache_key,
+                lock_key,
+                lock_timeout,
+                deadline,
+                poll_interval,
+            )
+
+        if waited and time.monotonic() >= deadline:
+            stats_logger.incr("single_flight.wait_timeout")
+        if not waited:
+            stats_logger.incr("single_flight.leader")
+        yield waited
+    finally:
+        if token is not None:
+            try:
+                if cache_instance.get(lock_key) == token:
+                    cache_instance.delete(lock_key)
+            except Exception:  # pylint: disable=broad-except
+                logger.warning("Could not release cache lock %s", lock_key)
+        if acquired:
+            local_lock.lock.release()
+        with _local_locks_guard:
+            local_lock.refcount -= 1
+            if not local_lock.refcount:
+                _local_locks.pop(cache_key, None)
+
+
+def _encode_cache_value(codec: CacheCodec, value: Dict[str, Any]) -> Any:
+    """
+    使用指定编解码器编码包含数据帧的缓存值，数据帧无法编码时原样返回。
+
+    :param codec: 编解码器。
+    :param value: 缓存值。
+    :return: 编码后的缓存值。
+    """
+
+    start = now_as_float()
+    try:
+        payload = encode_cache_value(codec, value)
+    except Exception as ex:  # pylint: disable=broad-except
+        logger.warning("Could not encode cache value with codec %s: %s", codec.name, ex)
+        stats_logger.incr(f"data_cache.codec.{codec.name}.encode_error")
+        return value
+
+    stats_logger.timing(f"data_cache.codec.{codec.name}.encode", now_as_float() - start)
+    stats_logger.gauge(f"data_cache.codec.{codec.name}.size", len(payload))
+    return payload
+
+
+def get_cache_value(
+    cache_instance: Cache, cache_key: str
+) -> Optional[Dict[str, Any]]:
+    """
+    读取缓存值，解码由数据缓存编解码器编码的缓存值，旧版本直接缓存的字典原样返回。
+
+    :param cache_instance: 缓存实例。
+    :param cache_key: 缓存键。
+    :return: 缓存值，不存在或无法解码时返回 None。
+    """
+
+    cache_value = cache_instance.get(cache_key)
+    if not is_encoded(cache_value):
+        return cache_value
+
+    start = now_as_float()
+    try:
+        codec, value = decode_cache_value(cache_value)
+    except Exception as ex:  # pylint: disable=broad-except
+        logger.warning("Could not decode cache key %s: %s", cache_key, ex)
+        stats_logger.incr("data_cache.codec.decode_error")
+        return None
+
+    stats_logger.timing(f"data_cache.codec.{codec.name}.decode", now_as_float() - start)
+    return value
+
+
 def set_and_log_cache(
     cache_instance: Cache,
     cache_key: str,
     cache_value: Dict[str, Any],
     cache_timeout: Optional[int] = None,
     datasource_uid: Optional[str] = None,
+    stale_timeout: Optional[int] = None,
 ) -> None:
     """
     设置并记录到指定缓存实例，同时存储到数据库。
 
+    指定 ``stale_timeout`` 时，缓存超时作为软超时记录在缓存值的 ``stale_after`` 中，
+    缓存后端中的条目再保留 ``stale_timeout`` 秒，参见 :func:`is_stale`。
+
     :param cache_instance: 缓存实例。
     :param cache_key: 缓存键。
     :param cache_value: 缓存值。
     :param cache_timeout: 缓存超时。
     :param datasource_uid: 数据源对象标识。
+    :param stale_timeout: 软超时后仍保留旧数据的时长（秒）。
     :return:
     """
 
@@ -63,7 +278,12 @@ def set_and_log_cache(
     timeout = cache_timeout if cache_timeout else config["CACHE_DEFAULT_TIMEOUT"]
     try:
         dttm = datetime.utcnow().isoformat().split(".")[0]
-        value = {**cache_value, "dttm": dttm}
+        value: Any = {**cache_value, "dttm": dttm}
+        if stale_timeout:
+            value["stale_after"] = time.time() + timeout
+            timeout += stale_timeout
+        if config["DATA_CACHE_CODEC"] and isinstance(value.get("df"), DataFrame):
+            value = _encode_cache_value(config["DATA_CACHE_CODEC"], value)
         cache_instance.set(cache_key, value, timeout=timeout)
         stats_logger.incr("set_cache_key")
 
@@ -81,6 +301,55 @@ def set_and_log_cache(
         logger.exception(ex)
 
 
+def is_stale(cache_value: Optional[Dict[str, Any]]) -> bool:
+    """
+    判断缓存值是否已超过软超时，只有以 ``stale_timeout`` 写入的缓存值才会过期。
+
+    :param cache_value: 缓存值。
+    :return: 是否为旧数据。
+    """
+
+    stale_after = (cache_value or {}).get("stale_after")
+    return stale_after is not None and time.time() >= stale_after
+
+
+def acquire_refresh_lock(cache_instance: Cache, cache_key: str) -> Optional[str]:
+    """
+    获取指定缓存键的后台刷新锁，保证每个缓存键同时只有一个刷新任务。
+
+    锁在刷新任务结束时通过 :func:`release_refresh_lock` 释放，
+    最长保留 ``SQLLAB_ASYNC_TIME_LIMIT_SEC`` 秒。
+
+    :param cache_instance: 缓存实例。
+    :param cache_key: 缓存键。
+    :return: 获取成功时返回锁的键，否则返回 None。
+    """
+
+    lock_key = f"{cache_key}__refresh"
+    try:
+        if cache_instance.add(
+            lock_key, 1, timeout=config["SQLLAB_ASYNC_TIME_LIMIT_SEC"]
+        ):
+            return lock_key
+    except Exception:  # pylint: disable=broad-except
+        logger.warning("Could not acquire cache lock %s", lock_key)
+    return None
+
+
+def release_refresh_lock(cache_instance: Cache, lock_key: str) -> None:
+    """
+    释放后台刷新锁。
+
+    :param cache_instance: 缓存实例。
+    :param lock_key: 锁的键。
+    """
+
+    try:
+        cache_instance.delete(lock_key)
+    except Exception:  # pylint: disable=broad-except
+        logger.warning("Could not release cache lock %s", lock_key)
+
+
 # If a user sets `max_age` to 0, for long the browser should cache the
 # resource? Flask-Caching will cache forever, but for the HTTP header we need
 # to specify a "far future" date.
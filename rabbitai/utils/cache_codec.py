@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+
+"""
+数据缓存值的编解码器。
+
+缓存值中的数据帧（``df``）按编解码器编码为二进制，其它字段（查询语句、注释数据等）
+作为头部一并写入，格式如下::
+
+    MAGIC | 编解码器名称长度（1 字节）| 编解码器名称 | 头部长度（4 字节）| 头部 | 数据帧
+
+解码时按写入的编解码器名称选择编解码器，与当前配置无关；
+不带 MAGIC 的缓存值（旧版本直接缓存的字典）原样返回。
+"""
+
+import pickle
+import struct
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+
+MAGIC = b"RBCC\x01"
+
+
+class CacheCodec:
+    """数据帧编解码器基类，使用 pickle 编码数据帧。"""
+
+    name = "pickle"
+
+    def encode_df(self, df: pd.DataFrame) -> bytes:
+        """
+        编码数据帧。
+
+        :param df: 数据帧。
+        :return: 二进制数据。
+        """
+
+        return pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def decode_df(self, data: bytes) -> pd.DataFrame:
+        """
+        解码数据帧。
+
+        :param data: 二进制数据。
+        :return: 数据帧。
+        """
+
+        return pickle.loads(data)
+
+
+class ArrowCacheCodec(CacheCodec):
+    """
+    以 Arrow IPC 流格式编码数据帧的编解码器，可选 ``lz4`` 或 ``zstd`` 压缩。
+
+    数据帧的索引和数据类型通过 Arrow 模式中的 pandas 元数据还原，
+    Arrow 无法表示的数据帧（如重复列名、混合类型的对象列）编码时抛出异常。
+    """
+
+    name = "arrow"
+
+    def __init__(self, compression: Optional[str] = None) -> None:
+        """
+        :param compression: 压缩算法，``lz4``、``zstd`` 或 None。
+        """
+
+        self.compression = compression
+
+    def encode_df(self, df: pd.DataFrame) -> bytes:
+        table = pa.Table.from_pandas(df)
+        sink = pa.BufferOutputStream()
+        options = pa.ipc.IpcWriteOptions(compression=self.compression)
+        with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+    def decode_df(self, data: bytes) -> pd.DataFrame:
+        # the compression codec is recorded in the stream itself, nullable integer
+        # columns are object columns in query results, as in RabbitaiResultSet
+        table = pa.ipc.open_stream(data).read_all()
+        return table.to_pandas(integer_object_nulls=True)
+
+
+CODECS: Dict[str, CacheCodec] = {
+    codec.name: codec for codec in (CacheCodec(), ArrowCacheCodec())
+}
+
+
+def encode_cache_value(codec: CacheCodec, value: Dict[str, Any]) -> bytes:
+    """
+    使用指定编解码器编码包含数据帧的缓存值。
+
+    :param codec: 编解码器。
+    :param value: 包含 ``df`` 的缓存值。
+    :return: 二进制数据。
+    """
+
+    header = pickle.dumps(
+        {key: val for key, val in value.items() if key != "df"},
+        protocol=pickle.HIGHEST_PROTOCOL,
+    )
+    name = codec.name.encode("utf-8")
+    return b"".join(
+        [
+            MAGIC,
+            struct.pack("!B", len(name)),
+            name,
+            struct.pack("!I", len(header)),
+            header,
+            codec.encode_df(value["df"]),
+        ]
+    )
+
+
+def is_encoded(payload: Any) -> bool:
+    """
+    判断缓存值是否为编解码器编码的二进制数据。
+
+    :param payload: 缓存值。
+    :return:
+    """
+
+    return isinstance(payload, bytes) and payload.startswith(MAGIC)
+
+
+def decode_cache_value(payload: bytes) -> Tuple[CacheCodec, Dict[str, Any]]:
+    """
+    解码编解码器编码的缓存值。
+
+    :param payload: 二进制数据。
+    :return: 编码时使用的编解码器和包含 ``df`` 的缓存值。
+    :raises KeyError: 编解码器未注册时抛出。
+    """
+
+    offset = len(MAGIC)
+    (name_length,) = struct.unpack_from("!B", payload, offset)
+    offset += 1
+    name = payload[offset : offset + name_length].decode("utf-8")
+    offset += name_length
+    (header_length,) = struct.unpack_from("!I", payload, offset)
+    offset += 4
+    value = pickle.loads(payload[offset : offset + header_length])
+    offset += header_length
+    codec = CODECS[name]
+    value["df"] = codec.decode_df(payload[offset:])
+    return codec, value
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+"""在应用上下文中并发执行任务的工具。"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Sequence, TypeVar
+
+from flask import copy_current_request_context, current_app, g, has_request_context
+from sqlalchemy import inspect
+
+from rabbitai.extensions import db
+
+T = TypeVar("T")
+
+_local = threading.local()
+
+
+def _wrap_in_context(func: Callable[[], T]) -> Callable[[], T]:
+    """
+    包装指定函数，使其在工作线程中拥有与调用方相同的应用上下文、请求上下文和当前用户。
+
+    :param func: 要包装的函数。
+    :return: 可在工作线程中执行的函数。
+    """
+
+    app = current_app._get_current_object()  # pylint: disable=protected-access
+    user = getattr(g, "user", None)
+
+    def run() -> T:
+        # access checks, RLS filters and Jinja macros rely on the current user
+        g.user = user
+        _local.in_worker = True
+        try:
+            return func()
+        finally:
+            _local.in_worker = False
+            # each worker thread gets its own scoped session
+            db.session.remove()
+
+    if has_request_context():
+        return copy_current_request_context(run)
+
+    def run_in_app_context() -> T:
+        with app.app_context():
+            return run()
+
+    return run_in_app_context
+
+
+def run_concurrently(funcs: Sequence[Callable[[], T]], max_workers: int) -> List[T]:
+    """
+    使用有界线程池并发执行指定函数，返回结果的顺序与函数的顺序一致。
+
+    ``max_workers`` 不大于 1、只有一个函数或已在工作线程中调用时在当前线程中顺序执行，
+    嵌套调用不会再创建线程池，并发的线程数不超过 ``max_workers``。
+    任一函数抛出的异常会按函数顺序在调用方重新抛出。
+
+    传入的函数会访问调用方会话中加载的 ORM 对象，调用前应通过 :func:`preload_attributes`
+    预先加载其需要的属性，避免多个线程同时通过同一会话延迟加载。
+
+    :param funcs: 无参数函数的序列。
+    :param max_workers: 最大工作线程数。
+    :return: 结果列表。
+    """
+
+    if max_workers <= 1 or len(funcs) <= 1 or getattr(_local, "in_worker", False):
+        return [func() for func in funcs]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(funcs))) as executor:
+        futures = [executor.submit(_wrap_in_context(func)) for func in funcs]
+        return [future.result() for future in futures]
+
+
+def preload_attributes(*objs: Any) -> None:
+    """
+    加载指定 ORM 对象所有未加载（包括提交后过期）的列属性，之后工作线程读取这些属性时
+    不再通过对象所属的会话查询数据库。关系不会加载，需要时应单独传入关联的对象。
+
+    :param objs: ORM 对象，None 会被忽略。
+    """
+
+    for obj in objs:
+        if obj is None:
+            continue
+        state = inspect(obj)
+        unloaded = state.unloaded
+        for attr in state.mapper.column_attrs:
+            if attr.key in unloaded:
+                getattr(obj, attr.key)
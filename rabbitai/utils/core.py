@@ -17,6 +17,7 @@ import threading
 import traceback
 import uuid
 import zlib
+from contextlib import contextmanager
 from datetime import date, datetime, time, timedelta
 from distutils.util import strtobool
 from email.mime.application import MIMEApplication
@@ -153,10 +154,15 @@ class GenericDataType(IntEnum):
 
 
 class ChartDataResultFormat(str, Enum):
-    """图表数据结构格式枚举，csv、json。"""
+    """图表数据结构格式枚举，csv、json、json_columns、arrow、parquet。"""
 
     CSV = "csv"
     JSON = "json"
+    # columnar JSON, {"columns": [...], "data": [[...], ...]}
+    JSON_COLUMNS = "json_columns"
+    # binary formats, Arrow IPC stream and Parquet file
+    ARROW = "arrow"
+    PARQUET = "parquet"
 
 
 class ChartDataResultType(str, Enum):
@@ -1490,6 +1496,35 @@ def get_username() -> Optional[str]:
         return None
 
 
+def get_user_id() -> Optional[int]:
+    """Get user id if within the flask context, otherwise return None"""
+    try:
+        return g.user.get_id()
+    except Exception:  # pylint: disable=broad-except
+        return None
+
+
+@contextmanager
+def override_user(user: Optional[User]) -> Iterator[Any]:
+    """
+    在上下文中临时将当前用户（g.user）替换为指定用户，退出时恢复。
+
+    :param user: 用户。
+    :return:
+    """
+
+    had_user = hasattr(g, "user")
+    previous = getattr(g, "user", None)
+    g.user = user
+    try:
+        yield
+    finally:
+        if had_user:
+            g.user = previous
+        else:
+            delattr(g, "user")
+
+
 def parse_ssl_cert(certificate: str) -> _Certificate:
     """
     Parses the contents of a certificate and returns a valid certificate object
@@ -1,12 +1,14 @@
 # -*- coding: utf-8 -*-
 
+import json
 import re
-import urllib.request
-from typing import Any, Dict, Optional
-from urllib.error import URLError
+from typing import Any, Iterable, Iterator, TYPE_CHECKING
 
 import pandas as pd
 
+if TYPE_CHECKING:
+    from rabbitai.models.slice import Slice
+
 negative_number_re = re.compile(r"^-[0-9.]+$")
 
 # This regex will match if the string starts with:
@@ -55,25 +57,63 @@ def df_to_escaped_csv(df: pd.DataFrame, **kwargs: Any) -> Any:
     return df.to_csv(**kwargs)
 
 
-def get_chart_csv_data(
-    chart_url: str, auth_cookies: Optional[Dict[str, str]] = None
-) -> Optional[bytes]:
+def df_chunks_to_escaped_csv(
+    chunks: Iterable[pd.DataFrame], **kwargs: Any
+) -> Iterator[str]:
+    """
+    逐块转换数据帧为转义后的 CSV 文本，只在第一块中输出列标题。
+
+    :param chunks: 数据帧的迭代器。
+    :param kwargs: 传递给 ``DataFrame.to_csv`` 的参数。
+    :return: CSV 文本块的迭代器。
+    """
+
+    header = kwargs.pop("header", True)
+    for df in chunks:
+        yield df_to_escaped_csv(df, header=header, **kwargs)
+        header = False
+
+
+def get_chart_dataframe(chart: "Slice") -> pd.DataFrame:
     """
+    在当前进程中执行图表的查询，返回与图表展示一致的数据帧，查询按当前用户（g.user）的权限执行，
+    并复用数据缓存。
+
+    保存了查询上下文的图表通过图表数据命令执行，在格式化之前应用后处理（如透视表），
+    结果以 Arrow 格式传递，与图表数据接口 ``format=csv&type=post_processed`` 的结果一致；
+    否则通过可视化对象执行，与旧版本浏览视图导出的 CSV 一致。
 
-    :param chart_url:
-    :param auth_cookies:
-    :return:
+    :param chart: 图表。
+    :return: 数据帧。
+    :raises RabbitaiSecurityException: 当前用户不能访问图表的数据源时抛出。
     """
 
-    content = None
-    if auth_cookies:
-        opener = urllib.request.build_opener()
-        cookie_str = ";".join([f"{key}={val}" for key, val in auth_cookies.items()])
-        opener.addheaders.append(("Cookie", cookie_str))
-        response = opener.open(chart_url)
-        content = response.read()
-    if response.getcode() != 200:
-        raise URLError(response.getcode())
-    if content:
-        return content
-    return None
+    # pylint: disable=import-outside-toplevel
+    from rabbitai.charts.commands.data import ChartDataCommand
+    from rabbitai.dataframe import arrow_ipc_to_df
+    from rabbitai.exceptions import RabbitaiVizException
+    from rabbitai.utils.core import ChartDataResultFormat, ChartDataResultType
+    from rabbitai.views.utils import get_viz
+
+    if not chart.query_context:
+        viz_obj = get_viz(
+            datasource_type=chart.datasource_type,
+            datasource_id=chart.datasource_id,
+            form_data=chart.form_data,
+        )
+        viz_obj.raise_for_access()
+        payload = viz_obj.get_df_payload()
+        if viz_obj.has_error(payload):
+            raise RabbitaiVizException(errors=payload["errors"])
+        return payload["df"]
+
+    query_context = json.loads(chart.query_context)
+    query_context["result_format"] = ChartDataResultFormat.ARROW.value
+    query_context["result_type"] = ChartDataResultType.POST_PROCESSED.value
+    query_context["form_data"] = json.loads(chart.params or "{}")
+    command = ChartDataCommand()
+    command.set_query_context(query_context)
+    command.validate()
+    result = command.run()
+    # the first query holds the data displayed by the chart
+    return arrow_ipc_to_df(result["queries"][0]["data"])
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+
+"""
+数据源列的不同值（过滤器下拉列表的选项）的缓存。
+
+不同值缓存在数据缓存中，缓存键包括数据源、列、行数限制、``fetch_values_predicate``
+和当前用户适用的行级安全过滤器，超时为数据集的缓存超时。缓存值中同时保存按小写字符串排序的
+搜索索引，前缀搜索通过二分查找在缓存中完成，不再查询数据库。
+
+配置 DATA_CACHE_STALE_TIMEOUT 时，超过缓存超时的不同值仍会返回，并通过 Celery 在后台刷新。
+"""
+
+from __future__ import annotations
+
+import logging
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
+
+from flask import current_app as app
+
+from rabbitai import is_feature_enabled, security_manager
+from rabbitai.extensions import cache_manager
+from rabbitai.utils.cache import (
+    acquire_refresh_lock,
+    generate_cache_key,
+    get_cache_value,
+    is_stale,
+    release_refresh_lock,
+    set_and_log_cache,
+    single_flight,
+)
+from rabbitai.utils.core import get_user_id
+
+if TYPE_CHECKING:
+    from rabbitai.connectors.base.models import BaseDatasource
+    from rabbitai.stats_logger import BaseStatsLogger
+
+config = app.config
+stats_logger: BaseStatsLogger = config["STATS_LOGGER"]
+logger = logging.getLogger(__name__)
+
+
+def get_cache_key(datasource: BaseDatasource, column_name: str, limit: int) -> str:
+    """
+    获取列的不同值的缓存键。
+
+    :param datasource: 数据源。
+    :param column_name: 列名称。
+    :param limit: 最大行数。
+    :return: 缓存键。
+    """
+
+    rls_ids: List[int] = []
+    if is_feature_enabled("ROW_LEVEL_SECURITY") and datasource.is_rls_supported:
+        rls_ids = security_manager.get_rls_ids(datasource)
+
+    # the predicate may be templated with the current user
+    fetch_values_predicate = None
+    if getattr(datasource, "fetch_values_predicate", None):
+        fetch_values_predicate = str(datasource.get_fetch_values_predicate())
+
+    return generate_cache_key(
+        {
+            "datasource": datasource.uid,
+            "changed_on": datasource.changed_on,
+            "column": column_name,
+            "limit": limit,
+            "fetch_values_predicate": fetch_values_predicate,
+            "rls": rls_ids,
+        },
+        "distinct_values_",
+    )
+
+
+def get_cache_timeout(datasource: BaseDatasource) -> int:
+    """
+    获取不同值的缓存超时：数据集的缓存超时、数据库的缓存超时或默认缓存超时。
+
+    :param datasource: 数据源。
+    :return: 缓存超时（秒）。
+    """
+
+    if datasource.cache_timeout is not None:
+        return datasource.cache_timeout
+    database = getattr(datasource, "database", None)
+    if database is not None and database.cache_timeout is not None:
+        return database.cache_timeout
+    return config["CACHE_DEFAULT_TIMEOUT"]
+
+
+def _sort_values(values: List[Any]) -> List[Any]:
+    """
+    排序不同值，空值（None 和 NaN）合并为一个 None 放在最后，不能相互比较的值按字符串排序。
+
+    :param values: 不同值。
+    :return: 排序后的不同值。
+    """
+
+    # pylint: disable=comparison-with-itself
+    not_null = [value for value in values if value is not None and value == value]
+    try:
+        not_null.sort()
+    except TypeError:
+        not_null.sort(key=str)
+    if len(not_null) < len(values):
+        not_null.append(None)
+    return not_null
+
+
+def build_cache_value(values: List[Any]) -> Dict[str, Any]:
+    """
+    构建不同值的缓存值，包括排序后的不同值和前缀搜索的索引。
+
+    :param values: 不同值。
+    :return: 缓存值，``search_keys`` 为按顺序排列的小写字符串，
+        ``search_positions`` 为其对应的值在 ``values`` 中的位置。
+    """
+
+    values = _sort_values(values)
+    search_index = sorted(
+        (str(value).lower(), position)
+        for position, value in enumerate(values)
+        if value is not None
+    )
+    return {
+        "values": values,
+        "search_keys": [key for key, _ in search_index],
+        "search_positions": [position for _, position in search_index],
+    }
+
+
+def search_values(cache_value: Dict[str, Any], search: str) -> List[Any]:
+    """
+    返回以指定字符串开头（不区分大小写）的不同值，顺序与不同值一致。
+
+    :param cache_value: 不同值的缓存值。
+    :param search: 搜索的前缀。
+    :return: 匹配的不同值。
+    """
+
+    prefix = search.lower()
+    keys = cache_value["search_keys"]
+    start = bisect_left(keys, prefix)
+    end = start
+    while end < len(keys) and keys[end].startswith(prefix):
+        end += 1
+
+    values = cache_value["values"]
+    positions = sorted(cache_value["search_positions"][start:end])
+    return [values[position] for position in positions]
+
+
+def load_distinct_values(
+    datasource: BaseDatasource,
+    column_name: str,
+    limit: int,
+    cache_key: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    查询列的不同值并写入缓存。
+
+    :param datasource: 数据源。
+    :param column_name: 列名称。
+    :param limit: 最大行数。
+    :param cache_key: 缓存键，为 None 时按当前用户计算。
+    :return: 不同值的缓存值。
+    """
+
+    cache_value = build_cache_value(datasource.values_for_column(column_name, limit))
+    set_and_log_cache(
+        cache_manager.data_cache,
+        cache_key or get_cache_key(datasource, column_name, limit),
+        cache_value,
+        get_cache_timeout(datasource),
+        datasource_uid=datasource.uid,
+        stale_timeout=config["DATA_CACHE_STALE_TIMEOUT"],
+    )
+    return cache_value
+
+
+def refresh_stale_distinct_values(
+    datasource: BaseDatasource, column_name: str, limit: int, cache_key: str
+) -> None:
+    """
+    通过 Celery 在后台刷新已超过软超时的不同值，每个缓存键同时只有一个刷新任务。
+
+    :param datasource: 数据源。
+    :param column_name: 列名称。
+    :param limit: 最大行数。
+    :param cache_key: 已过期的缓存键。
+    """
+
+    # pylint: disable=import-outside-toplevel
+    from rabbitai.tasks.async_queries import refresh_distinct_values_cache
+
+    lock_key = acquire_refresh_lock(cache_manager.data_cache, cache_key)
+    if not lock_key:
+        return
+
+    try:
+        refresh_distinct_values_cache.delay(
+            datasource.type, datasource.id, column_name, limit, get_user_id(), lock_key
+        )
+        stats_logger.incr("distinct_values.stale_refresh")
+    except Exception as ex:  # pylint: disable=broad-except
+        logger.warning("Could not schedule cache refresh for key %s", cache_key)
+        logger.exception(ex)
+        release_refresh_lock(cache_manager.data_cache, lock_key)
+
+
+def get_distinct_values(
+    datasource: BaseDatasource,
+    column_name: str,
+    limit: int,
+    search: Optional[str] = None,
+    force: bool = False,
+) -> List[Any]:
+    """
+    获取列的不同值，优先从缓存中读取，并发的相同请求只查询一次数据库。
+
+    :param datasource: 数据源。
+    :param column_name: 列名称。
+    :param limit: 最大行数。
+    :param search: 搜索的前缀，为 None 时返回所有不同值。
+    :param force: 是否忽略缓存重新查询。
+    :return: 不同值。
+    """
+
+    cache_instance = cache_manager.data_cache
+    cache_key = get_cache_key(datasource, column_name, limit)
+    cache_value = None if force else get_cache_value(cache_instance, cache_key)
+
+    if cache_value is None:
+        stats_logger.incr("distinct_values.miss")
+        with single_flight(cache_instance, cache_key) as waited:
+            if waited and not force:
+                # another worker loaded the same values meanwhile
+                cache_value = get_cache_value(cache_instance, cache_key)
+            if cache_value is None:
+                cache_value = load_distinct_values(
+                    datasource, column_name, limit, cache_key
+                )
+    else:
+        stats_logger.incr("distinct_values.hit")
+        if is_stale(cache_value):
+            refresh_stale_distinct_values(datasource, column_name, limit, cache_key)
+
+    if search:
+        return search_values(cache_value, search)
+    return cache_value["values"]
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+
+"""按连接参数缓存带连接池的 SQLAlchemy 引擎。"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from rabbitai.stats_logger import BaseStatsLogger
+
+logger = logging.getLogger(__name__)
+
+QUEUE_POOL_PARAMS = ("pool_size", "max_overflow", "pool_timeout")
+"""只适用于 QueuePool 的 create_engine 参数，不使用连接池时需要移除。"""
+
+
+class _RegisteredEngine:  # pylint: disable=too-few-public-methods
+    """注册表中的引擎条目，记录所属数据库、数据库配置的版本和最后使用时间。"""
+
+    def __init__(
+        self, engine: Engine, database_id: Optional[int], version: Optional[str]
+    ) -> None:
+        self.engine = engine
+        self.database_id = database_id
+        self.version = version
+        self.last_used = time.monotonic()
+
+
+class EngineRegistry:
+    """
+    进程内的 SQLAlchemy 引擎注册表。
+
+    引擎以解析后的连接地址、模拟用户和 ``DB_CONNECTION_MUTATOR`` 输出的参数为键缓存，
+    从而在多次查询之间复用连接池，避免每次查询都重新建立连接。
+    空闲超时的引擎会被释放，数据库对象变更时可按数据库标识失效。
+
+    ``invalidate`` 只作用于当前进程，因此每个引擎还记录数据库配置（连接地址和连接参数）的版本，
+    其它进程中的数据库对象重新加载后以新版本获取引擎，同时释放该数据库旧版本的引擎。
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._engines: Dict[str, _RegisteredEngine] = {}
+        self._pid = os.getpid()
+
+    def _check_fork(self) -> None:
+        """
+        在派生的子进程中丢弃从父进程继承的引擎，连接不能跨进程共享。
+        """
+
+        if self._pid != os.getpid():
+            self._engines = {}
+            self._pid = os.getpid()
+
+    def get_engine(
+        self,
+        key: str,
+        database_id: Optional[int],
+        factory: Callable[[], Engine],
+        idle_timeout: Optional[int] = None,
+        stats_logger: Optional[BaseStatsLogger] = None,
+        version: Optional[str] = None,
+    ) -> Engine:
+        """
+        返回指定键的引擎，不存在时调用工厂函数创建并注册。
+
+        :param key: 引擎键。
+        :param database_id: 引擎所属的数据库标识。
+        :param factory: 创建引擎的工厂函数。
+        :param idle_timeout: 空闲超时秒数，超时的引擎将被释放。
+        :param stats_logger: 统计日志记录器。
+        :param version: 数据库配置的版本，该数据库其它版本的引擎将被释放。
+        :return: SQLAlchemy 引擎。
+        """
+
+        with self._lock:
+            self._check_fork()
+            if idle_timeout:
+                self._evict_idle(idle_timeout, stats_logger)
+            if version is not None:
+                self._evict_stale(database_id, version, stats_logger)
+
+            entry = self._engines.get(key)
+            if entry:
+                if stats_logger:
+                    stats_logger.incr("engine_registry.hit")
+            else:
+                if stats_logger:
+                    stats_logger.incr("engine_registry.miss")
+                engine = factory()
+                if stats_logger:
+                    self._instrument_pool(engine, database_id, stats_logger)
+                entry = _RegisteredEngine(engine, database_id, version)
+                self._engines[key] = entry
+                if stats_logger:
+                    stats_logger.gauge("engine_registry.size", len(self._engines))
+
+            entry.last_used = time.monotonic()
+            return entry.engine
+
+    def invalidate(self, database_id: Optional[int]) -> None:
+        """
+        释放指定数据库的全部引擎。
+
+        :param database_id: 数据库标识。
+        """
+
+        with self._lock:
+            self._check_fork()
+            for key in [
+                key
+                for key, entry in self._engines.items()
+                if entry.database_id == database_id
+            ]:
+                self._engines.pop(key).engine.dispose()
+
+    def clear(self) -> None:
+        """释放全部引擎。"""
+
+        with self._lock:
+            self._check_fork()
+            for entry in self._engines.values():
+                entry.engine.dispose()
+            self._engines = {}
+
+    def _evict_idle(
+        self, idle_timeout: int, stats_logger: Optional[BaseStatsLogger]
+    ) -> None:
+        now = time.monotonic()
+        for key in [
+            key
+            for key, entry in self._engines.items()
+            if now - entry.last_used > idle_timeout
+        ]:
+            logger.debug("Disposing idle engine %s", key)
+            self._engines.pop(key).engine.dispose()
+            if stats_logger:
+                stats_logger.incr("engine_registry.evicted")
+
+    def _evict_stale(
+        self,
+        database_id: Optional[int],
+        version: str,
+        stats_logger: Optional[BaseStatsLogger],
+    ) -> None:
+        for key in [
+            key
+            for key, entry in self._engines.items()
+            if entry.database_id == database_id
+            and entry.version is not None
+            and entry.version != version
+        ]:
+            logger.debug("Disposing stale engine %s", key)
+            self._engines.pop(key).engine.dispose()
+            if stats_logger:
+                stats_logger.incr("engine_registry.stale")
+
+    @staticmethod
+    def _instrument_pool(
+        engine: Engine, database_id: Optional[int], stats_logger: BaseStatsLogger
+    ) -> None:
+        """
+        注册连接池事件，通过统计日志记录器上报连接和检出指标。
+
+        :param engine: SQLAlchemy 引擎。
+        :param database_id: 数据库标识。
+        :param stats_logger: 统计日志记录器。
+        """
+
+        prefix = f"engine_pool.{database_id}"
+
+        def report_checked_out() -> None:
+            checkedout = getattr(engine.pool, "checkedout", None)
+            if checkedout:
+                stats_logger.gauge(f"{prefix}.checkedout", checkedout())
+
+        def on_connect(*args: Any) -> None:
+            stats_logger.incr(f"{prefix}.connect")
+
+        def on_checkout(*args: Any) -> None:
+            stats_logger.incr(f"{prefix}.checkout")
+            report_checked_out()
+
+        def on_checkin(*args: Any) -> None:
+            report_checked_out()
+
+        event.listen(engine, "connect", on_connect)
+        event.listen(engine, "checkout", on_checkout)
+        event.listen(engine, "checkin", on_checkin)
+
+
+engine_registry = EngineRegistry()
@@ -2,20 +2,26 @@
 
 from __future__ import annotations
 
+import atexit
 import functools
 import inspect
 import json
 import logging
+import os
 import textwrap
+import threading
+import time
 from abc import ABC, abstractmethod
 from contextlib import contextmanager
 from datetime import datetime, timedelta
+from queue import Empty, Full, Queue
 from typing import (
     Any,
     Callable,
     cast,
     Dict,
     Iterator,
+    List,
     Optional,
     Type,
     TYPE_CHECKING,
@@ -313,6 +319,20 @@ def get_event_logger_from_cfg_value(cfg_value: Any) -> AbstractEventLogger:
     return cast(AbstractEventLogger, result)
 
 
+def record_to_json(record: Any) -> Optional[str]:
+    """
+    序列化日志记录为 JSON 字符串。
+
+    :param record: 日志记录。
+    :return: JSON 字符串，不能序列化时返回 None。
+    """
+
+    try:
+        return json.dumps(record)
+    except Exception:  # pylint: disable=broad-except
+        return None
+
+
 class DBEventLogger(AbstractEventLogger):
     """基于数据库的事件日志记录器，提交日志到 Rabbitai 数据库。"""
 
@@ -332,14 +352,9 @@ class DBEventLogger(AbstractEventLogger):
         records = kwargs.get("records", [])
         logs = []
         for record in records:
-            json_string: Optional[str]
-            try:
-                json_string = json.dumps(record)
-            except Exception:  # pylint: disable=broad-except
-                json_string = None
             log = Log(
                 action=action,
-                json=json_string,
+                json=record_to_json(record),
                 dashboard_id=dashboard_id,
                 slice_id=slice_id,
                 duration_ms=duration_ms,
@@ -354,3 +369,183 @@ class DBEventLogger(AbstractEventLogger):
         except SQLAlchemyError as ex:
             logging.error("DBEventLogger failed to log event(s)")
             logging.exception(ex)
+
+
+class AsyncDBEventLogger(DBEventLogger):
+    """
+    异步批量写入的数据库事件日志记录器，日志表与 DBEventLogger 相同。
+
+    日志记录先放入有界的内存队列，由后台线程在累积到 ``batch_size`` 条或等待超过
+    ``flush_interval`` 秒时批量写入 Rabbitai 数据库，请求不再等待数据库写入。
+    队列已满时丢弃新的记录并计数，进程退出时写入队列中剩余的记录。
+    """
+
+    def __init__(
+        self,
+        max_queue_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+    ) -> None:
+        """
+        :param max_queue_size: 队列的最大记录数。
+        :param batch_size: 每批写入的最大记录数。
+        :param flush_interval: 两次写入之间的最长等待时间（秒）。
+        """
+
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.failed = 0
+        self._queue: "Queue[Dict[str, Any]]" = Queue(maxsize=max_queue_size)
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._app: Any = None
+        self._pid = os.getpid()
+        # Celery pool processes exit with os._exit(), which skips the atexit
+        # handlers, they shut down on worker_process_shutdown instead, see
+        # rabbitai.tasks.celery_app
+        atexit.register(self.shutdown)
+
+    def log(
+        self,
+        user_id: Optional[int],
+        action: str,
+        dashboard_id: Optional[int],
+        duration_ms: Optional[int],
+        slice_id: Optional[int],
+        referrer: Optional[str],
+        *args: Any,
+        **kwargs: Any,
+    ) -> None:
+        self._check_fork()
+        if self._app is None:
+            # pylint: disable=protected-access
+            self._app = current_app._get_current_object()  # type: ignore
+
+        # the time of the event, not the time the batch is written
+        dttm = datetime.utcnow()
+        for record in kwargs.get("records", []):
+            try:
+                self._queue.put_nowait(
+                    {
+                        "action": action,
+                        "json": record_to_json(record),
+                        "dashboard_id": dashboard_id,
+                        "slice_id": slice_id,
+                        "duration_ms": duration_ms,
+                        "referrer": referrer,
+                        "user_id": user_id,
+                        "dttm": dttm,
+                    }
+                )
+            except Full:
+                self.dropped += 1
+                self.stats_logger.incr("event_logger.dropped")
+
+        self._start_worker()
+
+    def flush(self) -> None:
+        """在当前线程中写入队列中的所有记录。"""
+
+        while True:
+            batch = self._next_batch(block=False)
+            if not batch:
+                return
+            self._write(batch)
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """
+        停止后台线程并写入队列中剩余的记录。
+
+        :param timeout: 等待后台线程结束的最长时间（秒）。
+        """
+
+        self._stopped.set()
+        thread = self._thread
+        if thread and thread.is_alive():
+            thread.join(timeout)
+        self.flush()
+
+    def _check_fork(self) -> None:
+        """
+        在派生的子进程中重建队列，后台线程不会被子进程继承。
+        """
+
+        if self._pid != os.getpid():
+            self._queue = Queue(maxsize=self.max_queue_size)
+            self._lock = threading.Lock()
+            self._thread = None
+            self._pid = os.getpid()
+
+    def _start_worker(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="event-logger", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            batch = self._next_batch(block=True)
+            if batch:
+                self._write(batch)
+
+    def _next_batch(self, block: bool) -> List[Dict[str, Any]]:
+        """
+        从队列中取出一批记录，阻塞时最多等待 ``flush_interval`` 秒。
+
+        :param block: 是否等待新的记录。
+        :return: 记录的列表。
+        """
+
+        batch: List[Dict[str, Any]] = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            try:
+                if block:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    batch.append(self._queue.get(timeout=timeout))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except Empty:
+                break
+        return batch
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        from rabbitai.models.core import Log
+
+        if self._app is None:
+            return
+
+        with self._app.app_context():
+            stats_logger = self.stats_logger
+            # a dedicated session, so that the scoped session of the caller
+            # is left untouched
+            sesh = current_app.appbuilder.get_session.session_factory()
+            start = time.monotonic()
+            try:
+                sesh.bulk_insert_mappings(Log, batch)
+                sesh.commit()
+            except SQLAlchemyError as ex:
+                sesh.rollback()
+                self.failed += len(batch)
+                stats_logger.incr("event_logger.failed")
+                logging.error(
+                    "AsyncDBEventLogger failed to log %s event(s)", len(batch)
+                )
+                logging.exception(ex)
+            finally:
+                sesh.close()
+            stats_logger.timing(
+                "event_logger.flush", (time.monotonic() - start) * 1000
+            )
+            stats_logger.gauge("event_logger.queue_size", self._queue.qsize())
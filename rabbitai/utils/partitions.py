@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+
+"""
+分区表元数据（分区字段和最近分区值）的缓存，供 Presto、Hive 等引擎规范的最近分区宏和
+``where_latest_partition`` 共用。
+
+元数据缓存在数据缓存中，超时为 PARTITION_METADATA_CACHE_TIMEOUT。缓存键包括数据表的版本令牌，
+:func:`invalidate_partition_cache` 替换版本令牌后，该数据表之前缓存的所有元数据都不再读取。
+并发的相同缓存未命中通过 :func:`~rabbitai.utils.cache.single_flight` 合并，只查询一次数据库。
+"""
+
+from __future__ import annotations
+
+import logging
+import uuid
+from typing import Any, Callable, Dict, Optional, TYPE_CHECKING, TypeVar
+
+from flask import current_app as app
+
+from rabbitai.extensions import cache_manager
+from rabbitai.utils.cache import generate_cache_key, single_flight
+from rabbitai.utils.core import get_username
+
+if TYPE_CHECKING:
+    from rabbitai.models.core import Database
+    from rabbitai.stats_logger import BaseStatsLogger
+
+config = app.config
+stats_logger: BaseStatsLogger = config["STATS_LOGGER"]
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def _get_table_key(
+    database: Database, schema: Optional[str], table_name: str
+) -> Dict[str, Any]:
+    # impersonated users may see different partitions
+    username = get_username() if database.impersonate_user else None
+    return {
+        "database": database.id,
+        "schema": schema,
+        "table": table_name,
+        "user": username,
+    }
+
+
+def _get_version_key(
+    database: Database, schema: Optional[str], table_name: str
+) -> str:
+    return generate_cache_key(
+        {"database": database.id, "schema": schema, "table": table_name},
+        "partitions__version__",
+    )
+
+
+def _get_version(version_key: str, timeout: int) -> str:
+    """
+    获取数据表的版本令牌，不存在时生成新的令牌。
+
+    :param version_key: 版本令牌的缓存键。
+    :param timeout: 版本令牌的超时，令牌过期时缓存的元数据也已过期。
+    :return: 版本令牌。
+    """
+
+    cache = cache_manager.data_cache
+    version = cache.get(version_key)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(version_key, version, timeout=timeout):
+            version = cache.get(version_key) or version
+    return version
+
+
+def get_cache_key(
+    database: Database,
+    schema: Optional[str],
+    table_name: str,
+    kind: str,
+    params: Optional[Dict[str, Any]] = None,
+) -> str:
+    """
+    获取分区元数据的缓存键。
+
+    :param database: 数据库对象。
+    :param schema: 模式。
+    :param table_name: 数据表名称。
+    :param kind: 元数据的类型，如 ``indexes``、``latest_partition``。
+    :param params: 影响元数据的其它参数，如最近子分区的过滤条件。
+    :return: 缓存键。
+    """
+
+    version = _get_version(
+        _get_version_key(database, schema, table_name),
+        config["PARTITION_METADATA_CACHE_TIMEOUT"],
+    )
+    return generate_cache_key(
+        {
+            **_get_table_key(database, schema, table_name),
+            "version": version,
+            "kind": kind,
+            "params": params or {},
+        },
+        "partitions__",
+    )
+
+
+def get_partition_metadata(  # pylint: disable=too-many-arguments
+    database: Database,
+    schema: Optional[str],
+    table_name: str,
+    kind: str,
+    load: Callable[[], T],
+    params: Optional[Dict[str, Any]] = None,
+) -> T:
+    """
+    获取分区元数据，优先从缓存中读取，未命中时调用 ``load`` 查询并写入缓存。
+
+    ``load`` 抛出的异常（如数据表没有分区）不会缓存。PARTITION_METADATA_CACHE_TIMEOUT
+    为 0 或 None 时直接调用 ``load``。
+
+    :param database: 数据库对象。
+    :param schema: 模式。
+    :param table_name: 数据表名称。
+    :param kind: 元数据的类型。
+    :param load: 查询元数据的函数。
+    :param params: 影响元数据的其它参数。
+    :return: 分区元数据。
+    """
+
+    timeout = config["PARTITION_METADATA_CACHE_TIMEOUT"]
+    if not timeout:
+        return load()
+
+    cache_instance = cache_manager.data_cache
+    cache_key = get_cache_key(database, schema, table_name, kind, params)
+    # the value is wrapped, since None is a valid latest partition
+    cache_value = cache_instance.get(cache_key)
+    if cache_value is not None:
+        stats_logger.incr("partition_cache.hit")
+        return cache_value["value"]
+
+    stats_logger.incr("partition_cache.miss")
+    with single_flight(cache_instance, cache_key) as waited:
+        if waited:
+            # another worker loaded the same metadata meanwhile
+            cache_value = cache_instance.get(cache_key)
+            if cache_value is not None:
+                return cache_value["value"]
+
+        value = load()
+        try:
+            cache_instance.set(cache_key, {"value": value}, timeout=timeout)
+        except Exception:  # pylint: disable=broad-except
+            logger.warning("Could not cache key %s", cache_key)
+        return value
+
+
+def invalidate_partition_cache(
+    database: Database, schema: Optional[str], table_name: str
+) -> None:
+    """
+    使数据表缓存的所有分区元数据失效，例如写入新分区之后。
+
+    :param database: 数据库对象。
+    :param schema: 模式。
+    :param table_name: 数据表名称。
+    """
+
+    version_key = _get_version_key(database, schema, table_name)
+    try:
+        cache_manager.data_cache.set(
+            version_key,
+            uuid.uuid4().hex,
+            timeout=config["PARTITION_METADATA_CACHE_TIMEOUT"],
+        )
+    except Exception:  # pylint: disable=broad-except
+        logger.warning("Could not invalidate cache key %s", version_key)
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+
+"""
+SQL Lab 查询结果在结果后端中的分块存储。
+
+结果表按固定行数切分为 Arrow 记录批，每块以 Arrow IPC 流格式单独存储，
+结果后端中的主条目只保存元数据和分块清单，读取某一页时只需获取覆盖该页的分块。
+"""
+
+from typing import Any, cast, Dict, List, Optional
+
+import pyarrow as pa
+from cachelib.base import BaseCache
+
+from rabbitai.exceptions import SerializationError
+from rabbitai.utils.results_format import compress_results, decompress_results
+
+
+def table_to_ipc(table: pa.Table) -> bytes:
+    """
+    编码 Arrow 表为 IPC 流格式。
+
+    :param table: Arrow 表。
+    :return: 二进制数据。
+    """
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def ipc_to_table(data: bytes) -> pa.Table:
+    """
+    解码 IPC 流格式的 Arrow 表。
+
+    :param data: 二进制数据。
+    :return: Arrow 表。
+    """
+
+    return pa.ipc.open_stream(data).read_all()
+
+
+def write_table_chunks(
+    results_backend: BaseCache,
+    key: str,
+    table: pa.Table,
+    chunk_rows: int,
+    timeout: Optional[int] = None,
+    compression: Optional[str] = None,
+    compression_level: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    按固定行数切分 Arrow 表并逐块写入结果后端，空表也写入一个分块以保留模式。
+
+    :param results_backend: 结果后端。
+    :param key: 结果的键，分块的键为 ``{key}-{序号}``。
+    :param table: 结果表。
+    :param chunk_rows: 每块的行数。
+    :param timeout: 缓存超时。
+    :param compression: 压缩算法，为 None 时使用 zlib。
+    :param compression_level: 压缩级别。
+    :return: 分块清单，每项包括 key、offset 和 rows。
+    """
+
+    chunks = []
+    for i, offset in enumerate(range(0, max(table.num_rows, 1), chunk_rows)):
+        chunk_key = f"{key}-{i}"
+        chunk = table.slice(offset, chunk_rows)
+        blob = compress_results(table_to_ipc(chunk), compression, compression_level)
+        results_backend.set(chunk_key, blob, timeout)
+        chunks.append({"key": chunk_key, "offset": offset, "rows": chunk.num_rows})
+    return chunks
+
+
+def _read_chunk(results_backend: BaseCache, chunk: Dict[str, Any]) -> pa.Table:
+    blob = results_backend.get(chunk["key"])
+    if blob is None:
+        raise SerializationError(f"Result chunk {chunk['key']} is missing")
+    return ipc_to_table(cast(bytes, decompress_results(blob)))
+
+
+def read_table_chunks(
+    results_backend: BaseCache,
+    chunks: List[Dict[str, Any]],
+    offset: int = 0,
+    limit: Optional[int] = None,
+) -> pa.Table:
+    """
+    从结果后端读取覆盖 ``[offset, offset + limit)`` 的分块，返回该范围内的行。
+
+    :param results_backend: 结果后端。
+    :param chunks: 分块清单。
+    :param offset: 起始行。
+    :param limit: 最大行数，为 None 时读取到末尾。
+    :return: Arrow 表。
+    :raises SerializationError: 分块已不存在时抛出。
+    """
+
+    end = offset + limit if limit is not None else None
+    selected = [
+        chunk
+        for chunk in chunks
+        if chunk["offset"] + chunk["rows"] > offset
+        and (end is None or chunk["offset"] < end)
+    ]
+    if not selected:
+        # read the first chunk for the schema only
+        return _read_chunk(results_backend, chunks[0]).slice(0, 0)
+
+    table = pa.concat_tables(
+        [_read_chunk(results_backend, chunk) for chunk in selected]
+    )
+    start = offset - selected[0]["offset"]
+    return table.slice(start, None if end is None else end - offset)
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+
+"""
+SQL Lab 查询结果在结果后端中的存储格式。
+
+结果表以 Arrow IPC 文件格式序列化（以 ``ARROW1`` 开头），整个载荷按配置的算法和级别压缩，
+压缩后的数据带有版本化的头部::
+
+    MAGIC | 版本（1 字节）| 算法名称长度（1 字节）| 算法名称 | 原始长度（8 字节）| 压缩数据
+
+不带 MAGIC 的数据为旧版本使用 zlib 压缩的载荷，读取时透明兼容。
+"""
+
+import struct
+from typing import Optional, Union
+
+import pyarrow as pa
+
+from rabbitai.utils.core import zlib_compress, zlib_decompress
+
+MAGIC = b"RBRS"
+VERSION = 2
+ARROW_FILE_MAGIC = b"ARROW1"
+
+
+def table_to_arrow_file(table: pa.Table) -> bytes:
+    """
+    编码 Arrow 表为 IPC 文件格式。
+
+    :param table: Arrow 表。
+    :return: 二进制数据。
+    """
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def arrow_file_to_table(data: bytes) -> pa.Table:
+    """
+    解码 IPC 文件格式的 Arrow 表。
+
+    :param data: 二进制数据。
+    :return: Arrow 表。
+    """
+
+    return pa.ipc.open_file(pa.py_buffer(data)).read_all()
+
+
+def is_arrow_file(data: bytes) -> bool:
+    """
+    判断数据是否为 IPC 文件格式的 Arrow 表，旧版本使用 ``pa.serialize`` 序列化。
+
+    :param data: 二进制数据。
+    :return:
+    """
+
+    return data[: len(ARROW_FILE_MAGIC)] == ARROW_FILE_MAGIC
+
+
+def compress_results(
+    data: Union[bytes, str],
+    compression: Optional[str] = None,
+    compression_level: Optional[int] = None,
+) -> bytes:
+    """
+    压缩写入结果后端的数据。
+
+    :param data: 序列化后的载荷。
+    :param compression: 压缩算法，如 ``zstd``、``lz4``，为 None 时使用旧版本的 zlib 格式。
+    :param compression_level: 压缩级别，为 None 时使用算法的默认级别。
+    :return: 压缩后的数据。
+    """
+
+    if not compression:
+        return zlib_compress(data)
+
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    codec = pa.Codec(compression, compression_level=compression_level)
+    name = compression.encode("utf-8")
+    return b"".join(
+        [
+            MAGIC,
+            struct.pack("!BB", VERSION, len(name)),
+            name,
+            struct.pack("!Q", len(data)),
+            codec.compress(data, asbytes=True),
+        ]
+    )
+
+
+def decompress_results(blob: bytes, decode: bool = False) -> Union[bytes, str]:
+    """
+    解压结果后端中的数据，压缩算法由头部决定，与当前配置无关。
+
+    :param blob: 压缩后的数据。
+    :param decode: 是否解码为字符串。
+    :return: 序列化后的载荷。
+    """
+
+    if not blob.startswith(MAGIC):
+        return zlib_decompress(blob, decode=decode)
+
+    offset = len(MAGIC)
+    _, name_length = struct.unpack_from("!BB", blob, offset)
+    offset += 2
+    name = blob[offset : offset + name_length].decode("utf-8")
+    offset += name_length
+    (size,) = struct.unpack_from("!Q", blob, offset)
+    offset += 8
+    data = pa.Codec(name).decompress(
+        blob[offset:], decompressed_size=size, asbytes=True
+    )
+    return data.decode("utf-8") if decode else data
@@ -1,9 +1,14 @@
 # -*- coding: utf-8 -*-
 
+import atexit
 import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
 from enum import Enum
 from time import sleep
-from typing import Any, Dict, Optional, Tuple, TYPE_CHECKING
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING
 
 from flask import current_app
 from selenium.common.exceptions import (
@@ -34,6 +39,200 @@ class DashboardStandaloneMode(Enum):
     REPORT = 3
 
 
+class _PooledDriver:  # pylint: disable=too-few-public-methods
+    """池中的Web驱动器，记录使用次数和创建时间，使用方可将其标记为不可用。"""
+
+    def __init__(self, driver: WebDriver) -> None:
+        self.driver = driver
+        self.uses = 0
+        self.created = time.monotonic()
+        self.healthy = True
+
+
+class WebDriverPool:
+    """
+    进程内已认证的Web驱动器池。
+
+    驱动器以驱动器类型和用户为键复用，避免每次截图都重新启动浏览器并登录。
+    取出时检查驱动器是否可用，使用次数达到 ``WEBDRIVER_POOL_MAX_USES`` 或存在时间超过
+    ``WEBDRIVER_POOL_MAX_AGE`` 的驱动器被销毁后重新创建。驱动器总数不超过
+    ``WEBDRIVER_POOL_SIZE``，已满时等待其它驱动器归还，必要时销毁其它键的空闲驱动器。
+    """
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition()
+        self._idle: Dict[Tuple[str, int], List[_PooledDriver]] = {}
+        self._size = 0
+        self._pid = os.getpid()
+
+    def _check_fork(self) -> None:
+        """
+        在派生的子进程中丢弃从父进程继承的驱动器，浏览器进程不能跨进程共享。
+        """
+
+        if self._pid != os.getpid():
+            self._idle = {}
+            self._size = 0
+            self._pid = os.getpid()
+
+    @contextmanager
+    def driver(
+        self, key: Tuple[str, int], factory: Callable[[], WebDriver]
+    ) -> Iterator[_PooledDriver]:
+        """
+        从池中取出指定键的驱动器，上下文结束时归还。上下文中抛出异常或驱动器被标记为不可用时
+        销毁该驱动器。
+
+        :param key: 驱动器类型和用户标识。
+        :param factory: 创建并认证驱动器的工厂函数。
+        :return: 池中的驱动器。
+        """
+
+        pooled = self._acquire(key, factory)
+        try:
+            yield pooled
+        except Exception:
+            pooled.healthy = False
+            raise
+        finally:
+            self._release(key, pooled)
+
+    def _acquire(
+        self, key: Tuple[str, int], factory: Callable[[], WebDriver]
+    ) -> _PooledDriver:
+        config = current_app.config
+        stats_logger = config["STATS_LOGGER"]
+        start = time.monotonic()
+        deadline = start + config["WEBDRIVER_POOL_WAIT_TIMEOUT"]
+
+        while True:
+            evicted: List[_PooledDriver] = []
+            with self._condition:
+                self._check_fork()
+                pooled = self._pop_idle(key)
+                if not pooled:
+                    if self._size >= config["WEBDRIVER_POOL_SIZE"]:
+                        # make room by closing an idle driver of another user
+                        others = [idle for idle in self._idle.values() if idle]
+                        if others:
+                            stats_logger.incr("webdriver_pool.evicted")
+                            evicted.append(others[0].pop())
+                            self._size -= 1
+                    if self._size >= config["WEBDRIVER_POOL_SIZE"]:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            stats_logger.incr("webdriver_pool.wait_timeout")
+                            raise WebDriverException(
+                                "Timed out waiting for a pooled webdriver"
+                            )
+                        self._condition.wait(remaining)
+                        continue
+                    stats_logger.incr("webdriver_pool.miss")
+                    self._size += 1
+
+            # talking to the browsers may block, do it outside the lock
+            self._destroy(evicted)
+            if not pooled:
+                break
+            if self._is_healthy(pooled):
+                stats_logger.incr("webdriver_pool.hit")
+                break
+            stats_logger.incr("webdriver_pool.unhealthy")
+            self._discard(pooled)
+
+        stats_logger.timing("webdriver_pool.wait", (time.monotonic() - start) * 1000)
+        if pooled:
+            return pooled
+
+        # create the driver outside the lock, starting a browser takes seconds
+        try:
+            return _PooledDriver(factory())
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+
+    def _release(self, key: Tuple[str, int], pooled: _PooledDriver) -> None:
+        config = current_app.config
+        pooled.uses += 1
+        with self._condition:
+            self._check_fork()
+            if (
+                pooled.healthy
+                and pooled.uses < config["WEBDRIVER_POOL_MAX_USES"]
+                and not self._is_expired(pooled)
+            ):
+                self._idle.setdefault(key, []).append(pooled)
+                self._condition.notify()
+                return
+
+        config["STATS_LOGGER"].incr("webdriver_pool.recycled")
+        self._discard(pooled)
+
+    def _pop_idle(self, key: Tuple[str, int]) -> Optional[_PooledDriver]:
+        idle = self._idle.get(key)
+        return idle.pop() if idle else None
+
+    def _discard(self, pooled: _PooledDriver) -> None:
+        """
+        从池中移除已取出的驱动器并销毁，调用时不能持有池的锁。
+
+        :param pooled: 池中的驱动器。
+        """
+
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+        self._destroy([pooled])
+
+    @staticmethod
+    def _destroy(drivers: List[_PooledDriver], tries: Optional[int] = None) -> None:
+        if tries is None:
+            tries = current_app.config["SCREENSHOT_SELENIUM_RETRIES"]
+        for pooled in drivers:
+            WebDriverProxy.destroy(pooled.driver, tries)
+
+    @staticmethod
+    def _is_expired(pooled: _PooledDriver) -> bool:
+        # the login session of the driver may expire
+        max_age = current_app.config["WEBDRIVER_POOL_MAX_AGE"]
+        return time.monotonic() - pooled.created >= max_age
+
+    def _is_healthy(self, pooled: _PooledDriver) -> bool:
+        """
+        检查驱动器的浏览器会话是否仍然可用，存在时间超过最大存在时间的驱动器视为不可用。
+
+        :param pooled: 池中的驱动器。
+        :return: 是否可用。
+        """
+
+        if self._is_expired(pooled):
+            return False
+        try:
+            pooled.driver.execute_script("return document.readyState")
+        except WebDriverException:
+            return False
+        return True
+
+    def clear(self) -> None:
+        """销毁全部空闲的驱动器，可在应用上下文之外调用（如进程退出时）。"""
+
+        with self._condition:
+            self._check_fork()
+            drivers = [pooled for idle in self._idle.values() for pooled in idle]
+            self._size -= len(drivers)
+            self._idle = {}
+            self._condition.notify_all()
+        self._destroy(drivers, tries=2)
+
+
+webdriver_pool = WebDriverPool()
+# Celery pool processes exit with os._exit(), which skips the atexit handlers, the
+# pool is also cleared on worker_process_shutdown, see rabbitai.tasks.celery_app
+atexit.register(webdriver_pool.clear)
+
+
 class WebDriverProxy:
     """Web驱动器代理，依据驱动器类型（firefox、chrome）创建相应Web驱动器。"""
 
@@ -108,13 +307,44 @@ class WebDriverProxy:
         req.prepare_url(url, params)
         url = req.url or ""
 
+        if user and current_app.config["WEBDRIVER_POOL_SIZE"]:
+            key = (self._driver_type, user.id)
+            with webdriver_pool.driver(key, lambda: self.auth(user)) as pooled:
+                try:
+                    return self._take_screenshot(pooled.driver, url, element_name)
+                except WebDriverException:
+                    # the browser session may be unusable, do not return it to the pool
+                    pooled.healthy = False
+                    return None
+
         driver = self.auth(user)
+        try:
+            return self._take_screenshot(driver, url, element_name)
+        except WebDriverException:
+            return None
+        finally:
+            self.destroy(driver, current_app.config["SCREENSHOT_SELENIUM_RETRIES"])
+
+    def _take_screenshot(
+        self, driver: WebDriver, url: str, element_name: str
+    ) -> Optional[bytes]:
+        """
+        打开页面，等待元素渲染完成后截图。
+
+        :param driver: 已认证的Web驱动器。
+        :param url: 地址。
+        :param element_name: 元素名称。
+        :return:
+        """
+
         driver.set_window_size(*self._window)
         driver.get(url)
         img: Optional[bytes] = None
-        selenium_headstart = current_app.config["SCREENSHOT_SELENIUM_HEADSTART"]
-        logger.debug("Sleeping for %i seconds", selenium_headstart)
-        sleep(selenium_headstart)
+        wait_for_stable = current_app.config["SCREENSHOT_SELENIUM_WAIT_FOR_STABLE"]
+        if not wait_for_stable:
+            selenium_headstart = current_app.config["SCREENSHOT_SELENIUM_HEADSTART"]
+            logger.debug("Sleeping for %i seconds", selenium_headstart)
+            sleep(selenium_headstart)
 
         try:
             logger.debug("Wait for the presence of %s", element_name)
@@ -134,10 +364,17 @@ class WebDriverProxy:
             selenium_animation_wait = current_app.config[
                 "SCREENSHOT_SELENIUM_ANIMATION_WAIT"
             ]
-            logger.debug("Wait %i seconds for chart animation", selenium_animation_wait)
-            sleep(selenium_animation_wait)
             logger.info("Taking a PNG screenshot or url %s", url)
-            img = element.screenshot_as_png
+            if wait_for_stable:
+                img = self._wait_for_stable_screenshot(
+                    element, selenium_animation_wait
+                )
+            else:
+                logger.debug(
+                    "Wait %i seconds for chart animation", selenium_animation_wait
+                )
+                sleep(selenium_animation_wait)
+                img = element.screenshot_as_png
         except TimeoutException:
             logger.warning("Selenium timed out requesting url %s", url, exc_info=True)
         except StaleElementReferenceException:
@@ -148,6 +385,27 @@ class WebDriverProxy:
             )
         except WebDriverException as ex:
             logger.error(ex, exc_info=True)
-        finally:
-            self.destroy(driver, current_app.config["SCREENSHOT_SELENIUM_RETRIES"])
+            raise
+        return img
+
+    @staticmethod
+    def _wait_for_stable_screenshot(element: Any, timeout: float) -> bytes:
+        """
+        重复截图直到相邻两次截图相同，即加载提示和动画已结束，最长等待指定时间。
+
+        :param element: 要截图的元素。
+        :param timeout: 最长等待秒数。
+        :return: 最后一次截图。
+        """
+
+        interval = current_app.config["SCREENSHOT_SELENIUM_STABLE_INTERVAL"]
+        deadline = time.monotonic() + timeout
+        img = element.screenshot_as_png
+        while time.monotonic() < deadline:
+            sleep(interval)
+            previous, img = img, element.screenshot_as_png
+            if img == previous:
+                break
+        else:
+            logger.debug("Chart did not stop changing in %s seconds", timeout)
         return img
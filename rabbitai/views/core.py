@@ -3,16 +3,27 @@
 import dataclasses
 import logging
 import re
+import zlib
 from contextlib import closing
 from datetime import datetime, timedelta
-from typing import Any, Callable, cast, Dict, List, Optional, Union
+from typing import Any, Callable, cast, Dict, Iterable, Iterator, List, Optional, Union
 from urllib import parse
 
 import backoff
 import humanize
 import pandas as pd
 import simplejson as json
-from flask import abort, flash, g, Markup, redirect, render_template, request, Response
+from flask import (
+    abort,
+    flash,
+    g,
+    Markup,
+    redirect,
+    render_template,
+    request,
+    Response,
+    stream_with_context,
+)
 from flask_appbuilder import expose
 from flask_appbuilder.models.sqla.interface import SQLAInterface
 from flask_appbuilder.security.decorators import (
@@ -94,7 +105,9 @@ from rabbitai.utils.async_query_manager import AsyncQueryTokenException
 from rabbitai.utils.cache import etag_cache
 from rabbitai.utils.core import ReservedUrlParameters
 from rabbitai.utils.dates import now_as_float
-from rabbitai.utils.decorators import check_dashboard_access
+from rabbitai.utils.decorators import check_dashboard_access, stats_timing
+from rabbitai.utils.distinct_values import get_distinct_values
+from rabbitai.utils.results_format import decompress_results
 from rabbitai.views.base import (
     api,
     BaseRabbitaiView,
@@ -990,7 +1003,6 @@ class Rabbitai(BaseRabbitaiView):
         :returns: The Flask response
         :raises RabbitaiSecurityException: If the user cannot access the resource
         """
-        # TODO: Cache endpoint by user, datasource and column
         datasource = ConnectorRegistry.get_datasource(
             datasource_type, datasource_id, db.session,
         )
@@ -998,8 +1010,16 @@ class Rabbitai(BaseRabbitaiView):
             return json_error_response(DATASOURCE_MISSING_ERR)
 
         datasource.raise_for_access()
+        # values are cached per user row level security filters, and can be
+        # narrowed down to the ones starting with `search`
         payload = json.dumps(
-            datasource.values_for_column(column, config["FILTER_SELECT_ROW_LIMIT"]),
+            get_distinct_values(
+                datasource,
+                column,
+                config["FILTER_SELECT_ROW_LIMIT"],
+                search=request.args.get("search"),
+                force=utils.parse_boolean_string(request.args.get("force")),
+            ),
             default=utils.json_int_dttm_ser,
             ignore_nan=True,
         )
@@ -1410,7 +1430,7 @@ class Rabbitai(BaseRabbitaiView):
             username = (
                 g.user.username if g.user and hasattr(g.user, "username") else None
             )
-            engine = database.get_sqla_engine(user_name=username)
+            engine = database.get_sqla_engine(user_name=username, nullpool=True)
 
             with closing(engine.raw_connection()) as conn:
                 if engine.dialect.do_ping(conn):
@@ -2285,7 +2305,8 @@ class Rabbitai(BaseRabbitaiView):
         """Serves a key off of the results backend
 
         It is possible to pass the `rows` query argument to limit the number
-        of rows returned.
+        of rows returned, and the `offset` query argument to skip rows. Results
+        stored in chunks only read the chunks covering the requested page.
         """
         if not results_backend:
             raise RabbitaiErrorException(
@@ -2344,10 +2365,41 @@ class Rabbitai(BaseRabbitaiView):
                 status=403,
             ) from ex
 
-        payload = utils.zlib_decompress(blob, decode=not results_backend_use_msgpack)
+        rows: Optional[int] = None
+        offset = 0
+        for arg in ("rows", "offset"):
+            if arg not in request.args:
+                continue
+            try:
+                value = int(request.args[arg])
+                if value < 0:
+                    raise ValueError(value)
+            except ValueError as ex:
+                raise RabbitaiErrorException(
+                    RabbitaiError(
+                        message=__(
+                            "The provided `%(arg)s` argument is not a valid integer.",
+                            arg=arg,
+                        ),
+                        error_type=RabbitaiErrorType.INVALID_PAYLOAD_SCHEMA_ERROR,
+                        level=ErrorLevel.ERROR,
+                    ),
+                    status=400,
+                ) from ex
+            if arg == "rows":
+                rows = value
+            else:
+                offset = value
+
+        with stats_timing("sqllab.query.results_backend_decompress", stats_logger):
+            payload = decompress_results(blob, decode=not results_backend_use_msgpack)
         try:
             obj = _deserialize_results_payload(
-                payload, query, cast(bool, results_backend_use_msgpack)
+                payload,
+                query,
+                cast(bool, results_backend_use_msgpack),
+                offset=offset,
+                rows=rows,
             )
         except SerializationError as ex:
             raise RabbitaiErrorException(
@@ -2364,20 +2416,6 @@ class Rabbitai(BaseRabbitaiView):
             ) from ex
 
         if "rows" in request.args:
-            try:
-                rows = int(request.args["rows"])
-            except ValueError as ex:
-                raise RabbitaiErrorException(
-                    RabbitaiError(
-                        message=__(
-                            "The provided `rows` argument is not a valid integer."
-                        ),
-                        error_type=RabbitaiErrorType.INVALID_PAYLOAD_SCHEMA_ERROR,
-                        level=ErrorLevel.ERROR,
-                    ),
-                    status=400,
-                ) from ex
-
             obj = apply_display_max_row_limit(obj, rows)
 
         return json_success(
@@ -2844,20 +2882,30 @@ class Rabbitai(BaseRabbitaiView):
             flash(ex.error.message)
             return redirect("/")
 
+        streaming = config["CSV_STREAMING_EXPORT"]
+        batch_size = config["CSV_STREAMING_BATCH_SIZE"]
+        chunks: Iterable[pd.DataFrame] = []
         blob = None
         if results_backend and query.results_key:
             logger.info("Fetching CSV from results backend [%s]", query.results_key)
             blob = results_backend.get(query.results_key)
         if blob:
             logger.info("Decompressing")
-            payload = utils.zlib_decompress(
-                blob, decode=not results_backend_use_msgpack
-            )
+            payload = decompress_results(blob, decode=not results_backend_use_msgpack)
             obj = _deserialize_results_payload(
                 payload, query, cast(bool, results_backend_use_msgpack)
             )
             columns = [c["name"] for c in obj["columns"]]
-            df = pd.DataFrame.from_records(obj["data"], columns=columns)
+            if streaming:
+                # the results backend stores a single blob, so it is still loaded
+                # whole; only the CSV conversion and the response are streamed
+                data = obj["data"]
+                chunks = (
+                    pd.DataFrame.from_records(data[i : i + batch_size], columns=columns)
+                    for i in range(0, max(len(data), 1), batch_size)
+                )
+            else:
+                df = pd.DataFrame.from_records(obj["data"], columns=columns)
             logger.info("Using pandas to convert to CSV")
         else:
             logger.info("Running a query to turn into CSV")
@@ -2874,28 +2922,92 @@ class Rabbitai(BaseRabbitaiView):
             }:
                 # remove extra row from `increased_limit`
                 limit -= 1
-            df = query.database.get_df(sql, query.schema)[:limit]
+            if streaming:
+                chunks = query.database.iter_df(
+                    sql, query.schema, batch_size=batch_size, limit=limit
+                )
+            else:
+                df = query.database.get_df(sql, query.schema)[:limit]
 
-        csv_data = csv.df_to_escaped_csv(df, index=False, **config["CSV_EXPORT"])
         quoted_csv_name = parse.quote(query.name)
-        response = CsvResponse(
-            csv_data, headers=generate_download_headers("csv", quoted_csv_name)
-        )
         event_info = {
             "event_type": "data_export",
             "client_id": client_id,
-            "row_count": len(df.index),
             "database": query.database.name,
             "schema": query.schema,
             "sql": query.sql,
             "exported_format": "csv",
         }
+        if streaming:
+            return self._stream_csv(chunks, quoted_csv_name, event_info)
+
+        csv_data = csv.df_to_escaped_csv(df, index=False, **config["CSV_EXPORT"])
+        response = CsvResponse(
+            csv_data, headers=generate_download_headers("csv", quoted_csv_name)
+        )
+        event_info.update(row_count=len(df.index), byte_count=len(csv_data))
         event_rep = repr(event_info)
         logger.debug(
             "CSV exported: %s", event_rep, extra={"rabbitai_event": event_info}
         )
         return response
 
+    @staticmethod
+    def _stream_csv(
+        chunks: Iterable[pd.DataFrame], csv_name: str, event_info: Dict[str, Any]
+    ) -> FlaskResponse:
+        """
+        以分块传输的响应流式返回 CSV，客户端支持时使用 gzip 压缩，导出结束后记录导出事件。
+
+        :param chunks: 数据帧的迭代器。
+        :param csv_name: 文件名称。
+        :param event_info: 导出事件信息，导出结束后补充行数和字节数。
+        :return: 流式响应。
+        """
+
+        encoding = config["CSV_EXPORT"].get("encoding", "utf-8")
+        use_gzip = config["CSV_STREAMING_GZIP"] and "gzip" in request.accept_encodings
+
+        def generate() -> Iterator[bytes]:
+            row_count = byte_count = 0
+            compressor = (
+                zlib.compressobj(wbits=zlib.MAX_WBITS | 16) if use_gzip else None
+            )
+
+            def counted(dfs: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+                nonlocal row_count
+                for df in dfs:
+                    row_count += len(df.index)
+                    yield df
+
+            try:
+                for text in csv.df_chunks_to_escaped_csv(
+                    counted(chunks), index=False, **config["CSV_EXPORT"]
+                ):
+                    data = text.encode(encoding)
+                    byte_count += len(data)
+                    if compressor:
+                        data = compressor.compress(data)
+                    if data:
+                        yield data
+                if compressor:
+                    yield compressor.flush()
+            finally:
+                event_info.update(row_count=row_count, byte_count=byte_count)
+                logger.debug(
+                    "CSV exported: %s",
+                    repr(event_info),
+                    extra={"rabbitai_event": event_info},
+                )
+
+        headers = generate_download_headers("csv", csv_name)
+        if use_gzip:
+            headers.update({"Content-Encoding": "gzip", "Vary": "Accept-Encoding"})
+        response = CsvResponse(stream_with_context(generate()), headers=headers)
+        # the body is already encoded, keep response compression from buffering it
+        response.direct_passthrough = True
+        return response
+
     @api
     @handle_api_exception
     @has_access
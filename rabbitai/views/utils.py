@@ -17,7 +17,7 @@ from flask_babel import _
 from sqlalchemy.orm.exc import NoResultFound
 
 import rabbitai.models.core as models
-from rabbitai import app, dataframe, db, result_set, viz
+from rabbitai import app, dataframe, db, result_set, results_backend, viz
 from rabbitai.connectors.connector_registry import ConnectorRegistry
 from rabbitai.errors import ErrorLevel, RabbitaiError, RabbitaiErrorType
 from rabbitai.exceptions import (
@@ -35,6 +35,8 @@ from rabbitai.models.sql_lab import Query
 from rabbitai.typing import FormData
 from rabbitai.utils.core import QueryStatus, TimeRangeEndpoint
 from rabbitai.utils.decorators import stats_timing
+from rabbitai.utils.results_chunks import read_table_chunks
+from rabbitai.utils.results_format import arrow_file_to_table, is_arrow_file
 from rabbitai.viz import BaseViz
 
 logger = logging.getLogger(__name__)
@@ -313,13 +315,14 @@ def apply_display_max_row_limit(
     该方法限制方法结果的行数，添加 `displayLimitReached: True` 标志到元数据中。
 
     :param sql_results: 来自 sql_lab.get_sql_results 的 SQL 查询结果。
+    :param rows: 显示的行数，为 None 时使用 DISPLAY_MAX_ROW，为 0 时不返回数据行。
     :returns: The mutated sql_results structure
     """
 
-    display_limit = rows or app.config["DISPLAY_MAX_ROW"]
+    display_limit = app.config["DISPLAY_MAX_ROW"] if rows is None else rows
 
     if (
-        display_limit
+        (display_limit or rows is not None)
         and sql_results["status"] == QueryStatus.SUCCESS
         and display_limit < sql_results["query"]["rows"]
     ):
@@ -652,8 +655,25 @@ def check_slice_perms(_self: Any, slice_id: int) -> None:
 
 
 def _deserialize_results_payload(
-    payload: Union[bytes, str], query: Query, use_msgpack: Optional[bool] = False
+    payload: Union[bytes, str],
+    query: Query,
+    use_msgpack: Optional[bool] = False,
+    offset: int = 0,
+    rows: Optional[int] = None,
 ) -> Dict[str, Any]:
+    """
+    反序列化结果后端中的查询结果，只返回从 ``offset`` 开始的 ``rows`` 行。
+
+    分块存储的结果只读取覆盖所需行的分块。
+
+    :param payload: 解压后的载荷。
+    :param query: 查询对象。
+    :param use_msgpack: 是否使用 msgpack 序列化。
+    :param offset: 起始行。
+    :param rows: 最大行数，为 None 时返回全部行。
+    :return: 查询结果。
+    """
+
     logger.debug("Deserializing from msgpack: %r", use_msgpack)
     if use_msgpack:
         with stats_timing(
@@ -661,11 +681,25 @@ def _deserialize_results_payload(
         ):
             ds_payload = msgpack.loads(payload, raw=False)
 
-        with stats_timing("sqllab.query.results_backend_pa_deserialize", stats_logger):
-            try:
-                pa_table = pa.deserialize(ds_payload["data"])
-            except pa.ArrowSerializationError:
-                raise SerializationError("Unable to deserialize table")
+        chunks = ds_payload.pop("chunks", None)
+        if chunks is not None:
+            with stats_timing(
+                "sqllab.query.results_backend_chunks_read", stats_logger
+            ):
+                pa_table = read_table_chunks(results_backend, chunks, offset, rows)
+        else:
+            with stats_timing(
+                "sqllab.query.results_backend_pa_deserialize", stats_logger
+            ):
+                try:
+                    if is_arrow_file(ds_payload["data"]):
+                        pa_table = arrow_file_to_table(ds_payload["data"])
+                    else:
+                        # written by pa.serialize before the Arrow IPC format
+                        pa_table = pa.deserialize(ds_payload["data"])
+                except pa.ArrowException:
+                    raise SerializationError("Unable to deserialize table")
+            pa_table = pa_table.slice(offset, rows)
 
         df = result_set.RabbitaiResultSet.convert_table_to_df(pa_table)
         ds_payload["data"] = dataframe.df_to_records(df) or []
@@ -681,7 +715,12 @@ def _deserialize_results_payload(
         return ds_payload
 
     with stats_timing("sqllab.query.results_backend_json_deserialize", stats_logger):
-        return json.loads(payload)
+        ds_payload = json.loads(payload)
+
+    if offset or rows is not None:
+        end = offset + rows if rows is not None else None
+        ds_payload["data"] = ds_payload["data"][offset:end]
+    return ds_payload
 
 
 def get_cta_schema_name(
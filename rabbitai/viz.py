@@ -54,7 +54,14 @@ from rabbitai.models.cache import CacheKey
 from rabbitai.models.helpers import QueryResult
 from rabbitai.typing import Metric, QueryObjectDict, VizData, VizPayload
 from rabbitai.utils import core as utils, csv
-from rabbitai.utils.cache import set_and_log_cache
+from rabbitai.utils.cache import (
+    acquire_refresh_lock,
+    get_cache_value,
+    is_stale,
+    release_refresh_lock,
+    set_and_log_cache,
+    single_flight,
+)
 from rabbitai.utils.core import (
     DTTM_ALIAS,
     JS_MAX_INTEGER,
@@ -584,6 +591,7 @@ class BaseViz:
         - errors,
         - form_data,
         - is_cached,
+        - is_stale,
         - query,
         - from_dttm,
         - to_dttm,
@@ -606,7 +614,7 @@ class BaseViz:
         stacktrace = None
         df = None
         if cache_key and cache_manager.data_cache and not self.force:
-            cache_value = cache_manager.data_cache.get(cache_key)
+            cache_value = get_cache_value(cache_manager.data_cache, cache_key)
             if cache_value:
                 stats_logger.incr("loading_from_cache")
                 try:
@@ -615,6 +623,9 @@ class BaseViz:
                     self.status = utils.QueryStatus.SUCCESS
                     is_loaded = True
                     stats_logger.incr("loaded_from_cache")
+                    if is_stale(cache_value):
+                        stats_logger.incr("loaded_stale_from_cache")
+                        self.refresh_stale_cache(cache_key)
                 except Exception as ex:
                     logger.exception(ex)
                     logger.error(
@@ -629,61 +640,78 @@ class BaseViz:
                     f"force_cached (viz.py): value not found for cache key {cache_key}"
                 )
                 raise CacheLoadError(_("Cached value not found"))
-            try:
-                invalid_columns = [
-                    col
-                    for col in (query_obj.get("columns") or [])
-                    + (query_obj.get("groupby") or [])
-                    + utils.get_column_names_from_metrics(
-                        cast(List[Metric], query_obj.get("metrics") or [],)
-                    )
-                    if col not in self.datasource.column_names
-                ]
-                if invalid_columns:
-                    raise QueryObjectValidationError(
-                        _(
-                            "Columns missing in datasource: %(invalid_columns)s",
-                            invalid_columns=invalid_columns,
+            with single_flight(cache_manager.data_cache, cache_key) as waited:
+                if waited:
+                    # another worker computed the same key meanwhile
+                    cache_value = get_cache_value(cache_manager.data_cache, cache_key)
+                    if cache_value:
+                        df = cache_value["df"]
+                        self.query = cache_value["query"]
+                        self.status = utils.QueryStatus.SUCCESS
+                        is_loaded = True
+                        stats_logger.incr("loaded_from_cache")
+
+                if not is_loaded:
+                    try:
+                        invalid_columns = [
+                            col
+                            for col in (query_obj.get("columns") or [])
+                            + (query_obj.get("groupby") or [])
+                            + utils.get_column_names_from_metrics(
+                                cast(List[Metric], query_obj.get("metrics") or [],)
+                            )
+                            if col not in self.datasource.column_names
+                        ]
+                        if invalid_columns:
+                            raise QueryObjectValidationError(
+                                _(
+                                    "Columns missing in datasource: %(invalid_columns)s",
+                                    invalid_columns=invalid_columns,
+                                )
+                            )
+                        df = self.get_df(query_obj)
+                        if self.status != utils.QueryStatus.FAILED:
+                            stats_logger.incr("loaded_from_source")
+                            if not self.force:
+                                stats_logger.incr("loaded_from_source_without_force")
+                            is_loaded = True
+                    except QueryObjectValidationError as ex:
+                        error = dataclasses.asdict(
+                            RabbitaiError(
+                                message=str(ex),
+                                level=ErrorLevel.ERROR,
+                                error_type=RabbitaiErrorType.VIZ_GET_DF_ERROR,
+                            )
+                        )
+                        self.errors.append(error)
+                        self.status = utils.QueryStatus.FAILED
+                    except Exception as ex:
+                        logger.exception(ex)
+
+                        error = dataclasses.asdict(
+                            RabbitaiError(
+                                message=str(ex),
+                                level=ErrorLevel.ERROR,
+                                error_type=RabbitaiErrorType.VIZ_GET_DF_ERROR,
+                            )
+                        )
+                        self.errors.append(error)
+                        self.status = utils.QueryStatus.FAILED
+                        stacktrace = utils.get_stacktrace()
+
+                    if (
+                        is_loaded
+                        and cache_key
+                        and self.status != utils.QueryStatus.FAILED
+                    ):
+                        set_and_log_cache(
+                            cache_manager.data_cache,
+                            cache_key,
+                            {"df": df, "query": self.query},
+                            self.cache_timeout,
+                            self.datasource.uid,
+                            stale_timeout=config["DATA_CACHE_STALE_TIMEOUT"],
                         )
-                    )
-                df = self.get_df(query_obj)
-                if self.status != utils.QueryStatus.FAILED:
-                    stats_logger.incr("loaded_from_source")
-                    if not self.force:
-                        stats_logger.incr("loaded_from_source_without_force")
-                    is_loaded = True
-            except QueryObjectValidationError as ex:
-                error = dataclasses.asdict(
-                    RabbitaiError(
-                        message=str(ex),
-                        level=ErrorLevel.ERROR,
-                        error_type=RabbitaiErrorType.VIZ_GET_DF_ERROR,
-                    )
-                )
-                self.errors.append(error)
-                self.status = utils.QueryStatus.FAILED
-            except Exception as ex:
-                logger.exception(ex)
-
-                error = dataclasses.asdict(
-                    RabbitaiError(
-                        message=str(ex),
-                        level=ErrorLevel.ERROR,
-                        error_type=RabbitaiErrorType.VIZ_GET_DF_ERROR,
-                    )
-                )
-                self.errors.append(error)
-                self.status = utils.QueryStatus.FAILED
-                stacktrace = utils.get_stacktrace()
-
-            if is_loaded and cache_key and self.status != utils.QueryStatus.FAILED:
-                set_and_log_cache(
-                    cache_manager.data_cache,
-                    cache_key,
-                    {"df": df, "query": self.query},
-                    self.cache_timeout,
-                    self.datasource.uid,
-                )
 
         return {
             "cache_key": cache_key,
@@ -693,6 +721,7 @@ class BaseViz:
             "errors": self.errors,
             "form_data": self.form_data,
             "is_cached": cache_value is not None,
+            "is_stale": is_stale(cache_value),
             "query": self.query,
             "from_dttm": self.from_dttm,
             "to_dttm": self.to_dttm,
@@ -701,6 +730,36 @@ class BaseViz:
             "rowcount": len(df.index) if df is not None else 0,
         }
 
+    def refresh_stale_cache(self, cache_key: str) -> None:
+        """
+        通过 Celery 在后台刷新已超过软超时的数据缓存，每个缓存键同时只有一个刷新任务。
+
+        :param cache_key: 已过期的缓存键。
+        :return:
+        """
+
+        # pylint: disable=import-outside-toplevel
+        from rabbitai.tasks.async_queries import refresh_explore_json_cache
+
+        lock_key = acquire_refresh_lock(cache_manager.data_cache, cache_key)
+        if not lock_key:
+            return
+
+        try:
+            user_id = utils.get_user_id()
+            refresh_explore_json_cache.delay(
+                self.datasource.id,
+                self.datasource.type,
+                self.form_data,
+                user_id,
+                lock_key,
+            )
+            stats_logger.incr("stale_cache_refresh")
+        except Exception as ex:  # pylint: disable=broad-except
+            logger.warning("Could not schedule cache refresh for key %s", cache_key)
+            logger.exception(ex)
+            release_refresh_lock(cache_manager.data_cache, lock_key)
+
     def json_dumps(self, obj: Any, sort_keys: bool = False) -> str:
         """
         序列化指定对象为Json字符串。
@@ -0,0 +1,87 @@
+import logging
+import random
+import string
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, List, Tuple
+
+import click
+import numpy as np
+import pyarrow as pa
+
+from rabbitai.db_engine_specs import BaseEngineSpec
+from rabbitai.result_set import RabbitaiResultSet, stringify_values
+
+logger = logging.getLogger(__name__)
+
+
+def generate_rows(rows: int, columns: int) -> List[Tuple[Any, ...]]:
+    """
+    Generate synthetic DB-API rows cycling through int, float, string and
+    datetime columns, with a sprinkle of NULLs.
+    """
+    start = datetime(2021, 1, 1)
+    generators: List[Callable[[int], Any]] = [
+        lambda i: i,
+        lambda i: i * 0.5,
+        lambda i: "".join(random.choices(string.ascii_letters, k=8)),
+        lambda i: start + timedelta(seconds=i),
+    ]
+    return [
+        tuple(
+            None if (i + j) % 97 == 0 else generators[j % len(generators)](i)
+            for j in range(columns)
+        )
+        for i in range(rows)
+    ]
+
+
+def legacy_table(data: List[Tuple[Any, ...]], column_names: List[str]) -> pa.Table:
+    """
+    Row-oriented conversion through a numpy structured object array, as done
+    before the columnar ingestion path.
+    """
+    array = np.array(data, dtype=[(name, "object") for name in column_names])
+    pa_data = []
+    for column in column_names:
+        try:
+            pa_data.append(pa.array(array[column].tolist()))
+        except (pa.lib.ArrowInvalid, pa.lib.ArrowTypeError, TypeError):
+            pa_data.append(pa.array(stringify_values(array[column]).tolist()))
+    return pa.Table.from_arrays(pa_data, names=column_names)
+
+
+def measure(func: Callable[[], Any], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+@click.command()
+@click.option("--rows", default=500000, help="Number of rows to convert.")
+@click.option("--columns", default=8, help="Number of columns to convert.")
+@click.option("--repeat", default=3, help="Number of runs, the best one is kept.")
+def main(rows: int, columns: int, repeat: int) -> None:
+    """
+    Benchmark the conversion of DB-API rows into a RabbitaiResultSet.
+    """
+    click.echo(f"Generating {rows} rows x {columns} columns")
+    data = generate_rows(rows, columns)
+    cursor_description = [(f"col_{i}", None) for i in range(columns)]
+    column_names = [col[0] for col in cursor_description]
+
+    legacy = measure(lambda: legacy_table(data, column_names), repeat)
+    columnar = measure(
+        lambda: RabbitaiResultSet(data, cursor_description, BaseEngineSpec), repeat
+    )
+
+    click.echo(f"numpy object array: {legacy:.3f}s")
+    click.echo(f"columnar ingestion: {columnar:.3f}s")
+    click.echo(f"speedup:            {legacy / columnar:.2f}x")
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
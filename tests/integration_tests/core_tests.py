@@ -1231,9 +1231,11 @@ class TestCore(SupersetTestCase):
             # get all results
             result_key = json.loads(self.get_resp("/rabbitai/results/key/"))
             result_limited = json.loads(self.get_resp("/rabbitai/results/key/?rows=1"))
+            result_empty = json.loads(self.get_resp("/rabbitai/results/key/?rows=0"))
 
         self.assertEqual(result_key, expected_key)
         self.assertEqual(result_limited, expected_limited)
+        self.assertEqual(result_empty, {**expected_limited, "data": []})
 
         app.config["RESULTS_BACKEND_USE_MSGPACK"] = use_msgpack
 
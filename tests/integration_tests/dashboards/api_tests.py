@@ -287,6 +287,38 @@ class TestDashboardApi(SupersetTestCase, ApiOwnersTestCaseMixin, InsertChartMixi
         data = json.loads(response.data.decode("utf-8"))
         self.assertEqual(data["result"], [])
 
+    @pytest.mark.usefixtures("load_world_bank_dashboard_with_slices")
+    def test_get_dashboard_bootstrap(self):
+        """
+        Dashboard API: Test getting a dashboard with its charts and datasets
+        """
+        self.login(username="admin")
+        uri = "api/v1/dashboard/world_health/bootstrap"
+        response = self.get_assert_metric(uri, "bootstrap")
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data.decode("utf-8"))
+        result = data["result"]
+        dashboard = Dashboard.get("world_health")
+        self.assertEqual(result["dashboard"]["id"], dashboard.id)
+        self.assertEqual(
+            {chart["slice_name"] for chart in result["charts"]},
+            {slc.slice_name for slc in dashboard.slices},
+        )
+        self.assertEqual(
+            {dataset["id"] for dataset in result["datasets"]},
+            {slc.datasource_id for slc in dashboard.slices},
+        )
+
+    @pytest.mark.usefixtures("load_world_bank_dashboard_with_slices")
+    def test_get_dashboard_bootstrap_not_found(self):
+        """
+        Dashboard API: Test bootstrapping a dashboard that does not exist
+        """
+        self.login(username="admin")
+        uri = "api/v1/dashboard/not_found/bootstrap"
+        response = self.get_assert_metric(uri, "bootstrap")
+        self.assertEqual(response.status_code, 404)
+
     def test_get_dashboard(self):
         """
         Dashboard API: Test get dashboard
@@ -329,6 +329,8 @@ def test_fetch_data_success(fetch_data_mock):
 def test_where_latest_partition(mock_method):
     mock_method.return_value = ("01-01-19", 1)
     db = mock.Mock()
+    db.id = 1003
+    db.impersonate_user = False
     db.get_indexes = mock.Mock(return_value=[{"column_names": ["ds", "hour"]}])
     db.get_extra = mock.Mock(return_value={})
     db.get_df = mock.Mock()
@@ -365,6 +365,8 @@ class TestPrestoDbEngineSpec(TestDbEngineSpec):
 
     def test_presto_extra_table_metadata(self):
         db = mock.Mock()
+        db.id = 1001
+        db.impersonate_user = False
         db.get_indexes = mock.Mock(return_value=[{"column_names": ["ds", "hour"]}])
         db.get_extra = mock.Mock(return_value={})
         df = pd.DataFrame({"ds": ["01-01-19"], "hour": [1]})
@@ -375,6 +377,8 @@ class TestPrestoDbEngineSpec(TestDbEngineSpec):
 
     def test_presto_where_latest_partition(self):
         db = mock.Mock()
+        db.id = 1002
+        db.impersonate_user = False
         db.get_indexes = mock.Mock(return_value=[{"column_names": ["ds", "hour"]}])
         db.get_extra = mock.Mock(return_value={})
         df = pd.DataFrame({"ds": ["01-01-19"], "hour": [1]})
@@ -1,3 +1,4 @@
+import json
 import logging
 import time
 import unittest
@@ -8,9 +9,11 @@ from unittest.mock import patch
 from flask import current_app
 from freezegun import freeze_time
 
-from rabbitai import security_manager
+from rabbitai import db, security_manager
+from rabbitai.models.core import Log
 from rabbitai.utils.log import (
     AbstractEventLogger,
+    AsyncDBEventLogger,
     DBEventLogger,
     get_event_logger_from_cfg_value,
 )
@@ -214,3 +217,62 @@ class TestEventLogger(unittest.TestCase):
             )
 
         assert logger.records[0]["user_id"] == None
+
+    def test_async_db_event_logger(self):
+        logger = AsyncDBEventLogger(batch_size=10, flush_interval=0.01)
+
+        with app.test_request_context():
+            logger.log(
+                user_id=None,
+                action="test_async_db_event_logger",
+                dashboard_id=1,
+                duration_ms=10,
+                slice_id=2,
+                referrer=None,
+                records=[{"a": 1}, {"a": 2}],
+            )
+        logger.shutdown()
+        assert logger.dropped == 0
+
+        with app.app_context():
+            logs = (
+                db.session.query(Log)
+                .filter_by(action="test_async_db_event_logger")
+                .order_by(Log.id)
+                .all()
+            )
+            assert [json.loads(log.json) for log in logs] == [{"a": 1}, {"a": 2}]
+            assert {(log.dashboard_id, log.slice_id) for log in logs} == {(1, 2)}
+
+            for log in logs:
+                db.session.delete(log)
+            db.session.commit()
+
+    @patch.object(AsyncDBEventLogger, "_start_worker")
+    def test_async_db_event_logger_drops_when_full(self, mock_start_worker):
+        logger = AsyncDBEventLogger(max_queue_size=1)
+
+        with app.test_request_context():
+            logger.log(
+                user_id=None,
+                action="test_async_db_event_logger_full",
+                dashboard_id=None,
+                duration_ms=None,
+                slice_id=None,
+                referrer=None,
+                records=[{"a": 1}, {"a": 2}, {"a": 3}],
+            )
+        assert logger.dropped == 2
+
+        logger.flush()
+        with app.app_context():
+            logs = (
+                db.session.query(Log)
+                .filter_by(action="test_async_db_event_logger_full")
+                .all()
+            )
+            assert [json.loads(log.json) for log in logs] == [{"a": 1}]
+
+            for log in logs:
+                db.session.delete(log)
+            db.session.commit()
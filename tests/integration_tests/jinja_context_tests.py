@@ -8,7 +8,12 @@ import pytest
 import tests.integration_tests.test_app
 from rabbitai import app
 from rabbitai.exceptions import SupersetTemplateException
-from rabbitai.jinja_context import ExtraCache, get_template_processor, safe_proxy
+from rabbitai.jinja_context import (
+    ExtraCache,
+    get_template_processor,
+    has_extra_cache_calls,
+    safe_proxy,
+)
 from rabbitai.utils import core as utils
 from tests.integration_tests.base_tests import SupersetTestCase
 
@@ -367,3 +372,27 @@ class TestJinja2Context(SupersetTestCase):
         tp = get_template_processor(database=maindb)
         rendered = tp.process_template(sql)
         assert sql == rendered
+
+    def test_template_cache(self) -> None:
+        maindb = utils.get_example_database()
+        sql = "SELECT '{{ 1 + 1 }}'"
+        tp = get_template_processor(database=maindb)
+        template = tp.get_template(sql)
+
+        other = get_template_processor(database=maindb)
+        assert other.get_template(sql) is template
+        assert other.process_template(sql) == "SELECT '2'"
+        assert tp.get_template("SELECT '{{ 2 }}'") is not template
+
+    def test_has_extra_cache_calls(self) -> None:
+        assert has_extra_cache_calls("SELECT '{{ current_username() }}'")
+        assert has_extra_cache_calls("SELECT '{{ url_param('foo', 'bar') }}'")
+        assert has_extra_cache_calls(
+            "{% set user = current_user_id() %}\nSELECT '{{ user }}'"
+        )
+        assert has_extra_cache_calls("SELECT '{{\n cache_key_wrapper('foo')\n}}'")
+        assert not has_extra_cache_calls("SELECT 'url_param()'")
+        assert not has_extra_cache_calls("SELECT '{{ filter_values('foo') }}'")
+        assert not has_extra_cache_calls(
+            "{% set url_param = 'foo' %}SELECT '{{ url_param }}'"
+        )
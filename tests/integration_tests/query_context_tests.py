@@ -2,6 +2,7 @@ import datetime
 import re
 import time
 from typing import Any, Dict
+from unittest import mock
 
 import pytest
 
@@ -12,6 +13,7 @@ from rabbitai.common.query_object import QueryObject
 from rabbitai.connectors.connector_registry import ConnectorRegistry
 from rabbitai.connectors.sqla.models import SqlMetric
 from rabbitai.extensions import cache_manager
+from rabbitai.utils.cache import release_refresh_lock
 from rabbitai.utils.core import (
     AdhocMetricExpressionType,
     backend,
@@ -102,6 +104,42 @@ class TestQueryContext(SupersetTestCase):
         self.assertEqual(rehydrated_qc.result_format, query_context.result_format)
         self.assertFalse(rehydrated_qc.force)
 
+    @pytest.mark.usefixtures("load_birth_names_dashboard_with_slices")
+    @mock.patch("rabbitai.tasks.async_queries.refresh_chart_data_cache")
+    def test_refresh_stale_cache_once_per_context(self, refresh_chart_data_cache):
+        """
+        Ensure that stale query objects and time offsets of one query context
+        schedule a single refresh of the whole context
+        """
+        self.login(username="admin")
+        payload = get_query_context("birth_names")
+        payload["queries"][0]["metrics"] = ["sum__num"]
+        payload["queries"][0]["is_timeseries"] = True
+        payload["queries"][0]["time_range"] = "1990 : 1991"
+        payload["queries"].append({**payload["queries"][0], "row_limit": 5})
+        ChartDataQueryContextSchema().load(payload).get_payload()
+
+        query_context = ChartDataQueryContextSchema().load(payload)
+        query_object = query_context.queries[0]
+        query_object.time_offsets = ["1 year ago"]
+        lock_key = f"{query_context.cache_key()}__refresh"
+        try:
+            with mock.patch("rabbitai.common.utils.is_stale", return_value=True):
+                query_context.processing_time_offsets(
+                    query_context.get_query_result(query_object).df, query_object
+                )
+                responses = query_context.get_payload()
+                assert responses["queries"][1]["is_stale"]
+                query_context.processing_time_offsets(
+                    query_context.get_query_result(query_object).df, query_object
+                )
+        finally:
+            release_refresh_lock(cache_manager.data_cache, lock_key)
+
+        refresh_chart_data_cache.delay.assert_called_once_with(
+            query_context.cache_values, mock.ANY, lock_key
+        )
+
     def test_query_cache_key_changes_when_datasource_is_updated(self):
         self.login(username="admin")
         payload = get_query_context("birth_names")
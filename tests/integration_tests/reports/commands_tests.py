@@ -1,10 +1,12 @@
 import json
 from contextlib import contextmanager
 from datetime import datetime, timedelta
+from io import BytesIO
 from typing import List, Optional
 from unittest.mock import Mock, patch
 from uuid import uuid4
 
+import pandas as pd
 import pytest
 from flask_sqlalchemy import BaseQuery
 from freezegun import freeze_time
@@ -61,6 +63,10 @@ SCREENSHOT_FILE = read_fixture("sample.png")
 OWNER_EMAIL = "admin@fab.org"
 
 
+def get_chart_dataframe_fixture() -> pd.DataFrame:
+    return pd.read_csv(BytesIO(CSV_FILE))
+
+
 def get_target_from_report_schedule(report_schedule: ReportSchedule) -> List[str]:
     return [
         json.loads(recipient.recipient_config_json)["target"]
@@ -653,22 +659,16 @@ def test_email_chart_report_dry_run(
 @pytest.mark.usefixtures(
     "load_birth_names_dashboard_with_slices", "create_report_email_chart_with_csv"
 )
-@patch("rabbitai.utils.csv.urllib.request.urlopen")
-@patch("rabbitai.utils.csv.urllib.request.OpenerDirector.open")
 @patch("rabbitai.reports.notifications.email.send_email_smtp")
-@patch("rabbitai.utils.csv.get_chart_csv_data")
+@patch("rabbitai.reports.commands.execute.get_chart_dataframe")
 def test_email_chart_report_schedule_with_csv(
-    csv_mock, email_mock, mock_open, mock_urlopen, create_report_email_chart_with_csv,
+    chart_data_mock, email_mock, create_report_email_chart_with_csv,
 ):
     """
     ExecuteReport Command: Test chart email report schedule with CSV
     """
-    # setup csv mock
-    response = Mock()
-    mock_open.return_value = response
-    mock_urlopen.return_value = response
-    mock_urlopen.return_value.getcode.return_value = 200
-    response.read.return_value = CSV_FILE
+    # setup chart data mock
+    chart_data_mock.return_value = get_chart_dataframe_fixture()
 
     with freeze_time("2020-01-01T00:00:00Z"):
         AsyncExecuteReportScheduleCommand(
@@ -697,17 +697,13 @@ def test_email_chart_report_schedule_with_csv(
     "load_birth_names_dashboard_with_slices",
     "create_report_email_chart_with_csv_no_query_context",
 )
-@patch("rabbitai.utils.csv.urllib.request.urlopen")
-@patch("rabbitai.utils.csv.urllib.request.OpenerDirector.open")
 @patch("rabbitai.reports.notifications.email.send_email_smtp")
-@patch("rabbitai.utils.csv.get_chart_csv_data")
+@patch("rabbitai.reports.commands.execute.get_chart_dataframe")
 @patch("rabbitai.utils.screenshots.ChartScreenshot.get_screenshot")
 def test_email_chart_report_schedule_with_csv_no_query_context(
     screenshot_mock,
-    csv_mock,
+    chart_data_mock,
     email_mock,
-    mock_open,
-    mock_urlopen,
     create_report_email_chart_with_csv_no_query_context,
 ):
     """
@@ -716,12 +712,8 @@ def test_email_chart_report_schedule_with_csv_no_query_context(
     # setup screenshot mock
     screenshot_mock.return_value = SCREENSHOT_FILE
 
-    # setup csv mock
-    response = Mock()
-    mock_open.return_value = response
-    mock_urlopen.return_value = response
-    mock_urlopen.return_value.getcode.return_value = 200
-    response.read.return_value = CSV_FILE
+    # setup chart data mock
+    chart_data_mock.return_value = get_chart_dataframe_fixture()
 
     with freeze_time("2020-01-01T00:00:00Z"):
         AsyncExecuteReportScheduleCommand(
@@ -730,29 +722,24 @@ def test_email_chart_report_schedule_with_csv_no_query_context(
             datetime.utcnow(),
         ).run()
 
-        # verify that when query context is null we request a screenshot
-        screenshot_mock.assert_called_once()
+        # verify that charts without query context are queried without a screenshot
+        screenshot_mock.assert_not_called()
+        chart_data_mock.assert_called_once()
 
 
 @pytest.mark.usefixtures(
     "load_birth_names_dashboard_with_slices", "create_report_email_chart_with_text"
 )
-@patch("rabbitai.utils.csv.urllib.request.urlopen")
-@patch("rabbitai.utils.csv.urllib.request.OpenerDirector.open")
 @patch("rabbitai.reports.notifications.email.send_email_smtp")
-@patch("rabbitai.utils.csv.get_chart_csv_data")
+@patch("rabbitai.reports.commands.execute.get_chart_dataframe")
 def test_email_chart_report_schedule_with_text(
-    csv_mock, email_mock, mock_open, mock_urlopen, create_report_email_chart_with_text,
+    chart_data_mock, email_mock, create_report_email_chart_with_text,
 ):
     """
     ExecuteReport Command: Test chart email report schedule with text
     """
-    # setup csv mock
-    response = Mock()
-    mock_open.return_value = response
-    mock_urlopen.return_value = response
-    mock_urlopen.return_value.getcode.return_value = 200
-    response.read.return_value = CSV_FILE
+    # setup chart data mock
+    chart_data_mock.return_value = get_chart_dataframe_fixture()
 
     with freeze_time("2020-01-01T00:00:00Z"):
         AsyncExecuteReportScheduleCommand(
@@ -851,25 +838,17 @@ def test_slack_chart_report_schedule(
     "load_birth_names_dashboard_with_slices", "create_report_slack_chart_with_csv"
 )
 @patch("rabbitai.reports.notifications.slack.WebClient.files_upload")
-@patch("rabbitai.utils.csv.urllib.request.urlopen")
-@patch("rabbitai.utils.csv.urllib.request.OpenerDirector.open")
-@patch("rabbitai.utils.csv.get_chart_csv_data")
+@patch("rabbitai.reports.commands.execute.get_chart_dataframe")
 def test_slack_chart_report_schedule_with_csv(
-    csv_mock,
-    mock_open,
-    mock_urlopen,
+    chart_data_mock,
     file_upload_mock,
     create_report_slack_chart_with_csv,
 ):
     """
     ExecuteReport Command: Test chart slack report schedule with CSV
     """
-    # setup csv mock
-    response = Mock()
-    mock_open.return_value = response
-    mock_urlopen.return_value = response
-    mock_urlopen.return_value.getcode.return_value = 200
-    response.read.return_value = CSV_FILE
+    # setup chart data mock
+    chart_data_mock.return_value = get_chart_dataframe_fixture()
 
     with freeze_time("2020-01-01T00:00:00Z"):
         AsyncExecuteReportScheduleCommand(
@@ -890,25 +869,17 @@ def test_slack_chart_report_schedule_with_csv(
     "load_birth_names_dashboard_with_slices", "create_report_slack_chart_with_text"
 )
 @patch("rabbitai.reports.notifications.slack.WebClient.chat_postMessage")
-@patch("rabbitai.utils.csv.urllib.request.urlopen")
-@patch("rabbitai.utils.csv.urllib.request.OpenerDirector.open")
-@patch("rabbitai.utils.csv.get_chart_csv_data")
+@patch("rabbitai.reports.commands.execute.get_chart_dataframe")
 def test_slack_chart_report_schedule_with_text(
-    csv_mock,
-    mock_open,
-    mock_urlopen,
+    chart_data_mock,
     post_message_mock,
     create_report_slack_chart_with_text,
 ):
     """
     ExecuteReport Command: Test chart slack report schedule with text
     """
-    # setup csv mock
-    response = Mock()
-    mock_open.return_value = response
-    mock_urlopen.return_value = response
-    mock_urlopen.return_value.getcode.return_value = 200
-    response.read.return_value = CSV_FILE
+    # setup chart data mock
+    chart_data_mock.return_value = get_chart_dataframe_fixture()
 
     with freeze_time("2020-01-01T00:00:00Z"):
         AsyncExecuteReportScheduleCommand(
@@ -1244,22 +1215,17 @@ def test_soft_timeout_screenshot(screenshot_mock, email_mock, create_alert_email
 @pytest.mark.usefixtures(
     "load_birth_names_dashboard_with_slices", "create_report_email_chart_with_csv"
 )
-@patch("rabbitai.utils.csv.urllib.request.urlopen")
-@patch("rabbitai.utils.csv.urllib.request.OpenerDirector.open")
 @patch("rabbitai.reports.notifications.email.send_email_smtp")
-@patch("rabbitai.utils.csv.get_chart_csv_data")
+@patch("rabbitai.reports.commands.execute.get_chart_dataframe")
 def test_soft_timeout_csv(
-    csv_mock, email_mock, mock_open, mock_urlopen, create_report_email_chart_with_csv,
+    chart_data_mock, email_mock, create_report_email_chart_with_csv,
 ):
     """
     ExecuteReport Command: Test fail on generating csv
     """
     from celery.exceptions import SoftTimeLimitExceeded
 
-    response = Mock()
-    mock_open.return_value = response
-    mock_urlopen.return_value = response
-    mock_urlopen.return_value.getcode.side_effect = SoftTimeLimitExceeded()
+    chart_data_mock.side_effect = SoftTimeLimitExceeded()
 
     with pytest.raises(ReportScheduleCsvTimeout):
         AsyncExecuteReportScheduleCommand(
@@ -1280,21 +1246,15 @@ def test_soft_timeout_csv(
 @pytest.mark.usefixtures(
     "load_birth_names_dashboard_with_slices", "create_report_email_chart_with_csv"
 )
-@patch("rabbitai.utils.csv.urllib.request.urlopen")
-@patch("rabbitai.utils.csv.urllib.request.OpenerDirector.open")
 @patch("rabbitai.reports.notifications.email.send_email_smtp")
-@patch("rabbitai.utils.csv.get_chart_csv_data")
+@patch("rabbitai.reports.commands.execute.get_chart_dataframe")
 def test_generate_no_csv(
-    csv_mock, email_mock, mock_open, mock_urlopen, create_report_email_chart_with_csv,
+    chart_data_mock, email_mock, create_report_email_chart_with_csv,
 ):
     """
     ExecuteReport Command: Test fail on generating csv
     """
-    response = Mock()
-    mock_open.return_value = response
-    mock_urlopen.return_value = response
-    mock_urlopen.return_value.getcode.return_value = 200
-    response.read.return_value = None
+    chart_data_mock.return_value = None
 
     with pytest.raises(ReportScheduleCsvFailedError):
         AsyncExecuteReportScheduleCommand(
@@ -1345,20 +1305,15 @@ def test_fail_screenshot(screenshot_mock, email_mock, create_report_email_chart)
     "load_birth_names_dashboard_with_slices", "create_report_email_chart_with_csv"
 )
 @patch("rabbitai.reports.notifications.email.send_email_smtp")
-@patch("rabbitai.utils.csv.urllib.request.urlopen")
-@patch("rabbitai.utils.csv.urllib.request.OpenerDirector.open")
-@patch("rabbitai.utils.csv.get_chart_csv_data")
+@patch("rabbitai.reports.commands.execute.get_chart_dataframe")
 def test_fail_csv(
-    csv_mock, mock_open, mock_urlopen, email_mock, create_report_email_chart_with_csv
+    chart_data_mock, email_mock, create_report_email_chart_with_csv
 ):
     """
     ExecuteReport Command: Test error on csv
     """
 
-    response = Mock()
-    mock_open.return_value = response
-    mock_urlopen.return_value = response
-    mock_urlopen.return_value.getcode.return_value = 500
+    chart_data_mock.side_effect = Exception("Unexpected error")
 
     with pytest.raises(ReportScheduleCsvFailedError):
         AsyncExecuteReportScheduleCommand(
@@ -1372,7 +1327,7 @@ def test_fail_csv(
     assert email_mock.call_args[0][0] == OWNER_EMAIL
 
     assert_log(
-        ReportState.ERROR, error_message="Failed generating csv <urlopen error 500>"
+        ReportState.ERROR, error_message="Failed generating csv Unexpected error"
     )
 
 
@@ -9,6 +9,7 @@ from typing import Any, Dict
 
 import prison
 import pytest
+from cachelib import SimpleCache
 
 from flask import current_app, g
 
@@ -958,6 +959,37 @@ class TestSecurityManager(SupersetTestCase):
 
         self.assertFalse(security_manager.can_access_table(database, table))
 
+    def test_permission_index(self):
+        g.user = self.get_user(username="gamma")
+        g.pop("permission_index", None)
+        with patch.object(
+            security_manager.get_session,
+            "query",
+            wraps=security_manager.get_session.query,
+        ) as query:
+            assert security_manager.can_access("can_read", "Chart")
+            assert security_manager.can_access("can_csv", "Rabbitai")
+            assert not security_manager.can_access(
+                "all_datasource_access", "all_datasource_access"
+            )
+            assert query.call_count == 1
+
+        # editing the role invalidates the index
+        role = security_manager.find_role("Gamma")
+        pvm = security_manager.find_permission_view_menu(
+            "all_datasource_access", "all_datasource_access"
+        )
+        security_manager.add_permission_role(role, pvm)
+        try:
+            assert security_manager.can_access(
+                "all_datasource_access", "all_datasource_access"
+            )
+        finally:
+            security_manager.del_permission_role(role, pvm)
+        assert not security_manager.can_access(
+            "all_datasource_access", "all_datasource_access"
+        )
+
     @patch("rabbitai.security.SupersetSecurityManager.can_access")
     @patch("rabbitai.security.SupersetSecurityManager.can_access_schema")
     def test_raise_for_access_datasource(self, mock_can_access_schema, mock_can_access):
@@ -1198,6 +1230,48 @@ class TestRowLevelSecurity(SupersetTestCase):
         assert not self.NAMES_Q_REGEX.search(sql)
         assert not self.BASE_FILTER_REGEX.search(sql)
 
+    @pytest.mark.usefixtures("load_birth_names_dashboard_with_slices")
+    def test_rls_filters_cache(self):
+        g.user = self.get_user(username="gamma")
+        tbl = self.get_table(name="birth_names")
+        with patch.object(
+            security_manager,
+            "_query_rls_filters",
+            wraps=security_manager._query_rls_filters,
+        ) as query_rls_filters:
+            filters = security_manager.get_rls_filters(tbl)
+            assert security_manager.get_rls_filters(tbl) == filters
+            assert query_rls_filters.call_count == 1
+
+            # changing a filter invalidates the cached filters
+            self.rls_entry2.clause = "name like 'C%'"
+            db.session.commit()
+            clauses = {f.clause for f in security_manager.get_rls_filters(tbl)}
+            assert "name like 'C%'" in clauses
+            assert query_rls_filters.call_count == 2
+
+    @pytest.mark.usefixtures("load_birth_names_dashboard_with_slices")
+    def test_rls_filters_shared_cache(self):
+        g.user = self.get_user(username="gamma")
+        tbl = self.get_table(name="birth_names")
+        cache = SimpleCache()
+        with patch.dict(app.config, {"RLS_FILTERS_CACHE_TIMEOUT": 60}), patch(
+            "rabbitai.security.manager.cache_manager"
+        ) as cache_manager:
+            cache_manager.cache = cache
+            filters = security_manager.get_rls_filters(tbl)
+            g.pop("rls_filters")
+            with patch.object(security_manager, "_query_rls_filters") as query:
+                assert security_manager.get_rls_filters(tbl) == filters
+                query.assert_not_called()
+
+            version = cache.get("rls_filters__version")
+            self.rls_entry2.clause = "name like 'C%'"
+            db.session.commit()
+            assert cache.get("rls_filters__version") != version
+            clauses = {f.clause for f in security_manager.get_rls_filters(tbl)}
+            assert "name like 'C%'" in clauses
+
 
 class TestAccessRequestEndpoints(SupersetTestCase):
     def test_access_request_disabled(self):
@@ -1,8 +1,14 @@
 import unittest
+from unittest import mock
 
 import sqlparse
 
-from rabbitai.sql_parse import ParsedQuery, strip_comments_from_sql, Table
+from rabbitai.sql_parse import (
+    ParsedQuery,
+    ParsedQueryCache,
+    strip_comments_from_sql,
+    Table,
+)
 
 
 class TestSupersetSqlParse(unittest.TestCase):
@@ -739,3 +745,47 @@ class TestSupersetSqlParse(unittest.TestCase):
             strip_comments_from_sql("SELECT '--abc' as abc, col2 FROM table1\n")
             == "SELECT '--abc' as abc, col2 FROM table1"
         )
+
+    def test_parsed_query_cache(self):
+        cache = ParsedQueryCache(max_bytes=10 * 1024 * 1024)
+        with mock.patch("rabbitai.sql_parse.parsed_query_cache", cache):
+            sql = "SELECT * FROM tbname LIMIT 100"
+            first = ParsedQuery(sql)
+            second = ParsedQuery(sql)
+            assert second._parsed is first._parsed
+            assert (cache.hits, cache.misses) == (1, 1)
+
+            assert first.tables == {Table("tbname")}
+            assert second.tables == {Table("tbname")}
+            assert second.limit == 100
+
+            # comments are stripped under a separate key
+            assert ParsedQuery(sql, strip_comments=True)._parsed is not first._parsed
+
+            # updating the limit does not modify the shared statement
+            limited = first.set_or_update_query_limit(10)
+            assert limited == "SELECT * FROM tbname LIMIT 10"
+            assert ParsedQuery(sql).stripped() == sql
+            assert str(ParsedQuery(sql)._parsed[0]) == sql
+
+    def test_parsed_query_cache_eviction(self):
+        cache = ParsedQueryCache(max_bytes=10 * 1024 * 1024)
+        with mock.patch("rabbitai.sql_parse.parsed_query_cache", cache):
+            ParsedQuery("SELECT * FROM a")
+            size = cache.size
+            cache.max_bytes = size * 2
+            ParsedQuery("SELECT * FROM b")
+            ParsedQuery("SELECT * FROM a")
+            ParsedQuery("SELECT * FROM c")
+
+            # "b" is the least recently used statement
+            assert cache.get("SELECT * FROM a", False) is not None
+            assert cache.get("SELECT * FROM b", False) is None
+            assert cache.size <= cache.max_bytes
+
+    def test_parsed_query_cache_disabled(self):
+        cache = ParsedQueryCache(max_bytes=0)
+        with mock.patch("rabbitai.sql_parse.parsed_query_cache", cache):
+            sql = "SELECT * FROM tbname"
+            assert ParsedQuery(sql)._parsed is not ParsedQuery(sql)._parsed
+            assert cache.size == 0
@@ -2,6 +2,7 @@
 import re
 from typing import Any, Dict, NamedTuple, List, Pattern, Tuple, Union
 from unittest.mock import patch
+import pandas as pd
 import pytest
 
 import sqlalchemy as sa
@@ -415,6 +416,22 @@ class TestDatabaseModel(SupersetTestCase):
         assert VIRTUAL_TABLE_STRING_TYPES[backend].match(cols["mycase"].type)
         assert cols["expr"].expression == "case when 1 then 1 else 0 end"
 
+    def test_get_top_groups(self):
+        table = SqlaTable(table_name="tbl")
+        groupby_exprs = {"a": sa.column("a"), "b": sa.column("b")}
+        df = pd.DataFrame(
+            {"a": ["x", "x", "y", None], "b": [1, 2, 1, 3], "metric": [4, 3, 2, 1]}
+        )
+
+        def compile_predicate(dimensions):
+            predicate = table._get_top_groups(df, dimensions, groupby_exprs)
+            return str(predicate.compile(compile_kwargs={"literal_binds": True}))
+
+        assert compile_predicate(["a"]) == "a IN ('x', 'y') OR a IS NULL"
+        assert compile_predicate(["a", "b"]) == (
+            "a = 'x' AND b IN (1, 2) OR a = 'y' AND b IN (1) OR a IS NULL AND b IN (3)"
+        )
+
     @patch("rabbitai.models.core.Database.db_engine_spec", BigQueryEngineSpec)
     def test_labels_expected_on_mutated_query(self):
         query_obj = {
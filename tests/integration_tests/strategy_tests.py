@@ -2,27 +2,36 @@
 """Unit tests for Superset cache warmup"""
 import datetime
 import json
+from unittest import mock
 from unittest.mock import MagicMock
 from tests.integration_tests.fixtures.birth_names_dashboard import (
     load_birth_names_dashboard_with_slices,
 )
 
+from flask import g
 from sqlalchemy import String, Date, Float
 
 import pytest
 import pandas as pd
 
 from rabbitai.models.slice import Slice
-from rabbitai.utils.core import get_example_database
+from rabbitai.utils.core import get_example_database, override_user
 
-from rabbitai import db
+from rabbitai import db, security_manager
+from rabbitai.extensions import cache_manager
 
 from rabbitai.models.core import Log
 from rabbitai.models.tags import get_tag, ObjectTypes, TaggedObject, TagTypes
 from rabbitai.tasks.cache import (
+    cache_warmup,
     DashboardTagsStrategy,
+    get_cache_expiry,
+    get_cache_keys,
     get_form_data,
+    get_query_context,
+    NearExpiryStrategy,
     TopNDashboardsStrategy,
+    warm_up_chart,
 )
 
 from .base_tests import SupersetTestCase
@@ -244,3 +253,100 @@ class TestCacheWarmUp(SupersetTestCase):
         result = sorted(strategy.get_urls())
         expected = sorted(tag1_urls + tag2_urls)
         self.assertEqual(result, expected)
+
+    def test_get_query_context_extra_filters(self):
+        chart = MagicMock()
+        chart.query_context = json.dumps(
+            {"queries": [{"filters": [{"col": "a", "op": "==", "val": 1}]}, {}]}
+        )
+        extra_filters = [{"col": "name", "op": "in", "val": ["Alice"]}]
+
+        result = get_query_context(chart, extra_filters)
+        self.assertEqual(
+            result["queries"][0]["filters"],
+            [
+                {"col": "a", "op": "==", "val": 1},
+                {"col": "name", "op": "IN", "val": ["Alice"]},
+            ],
+        )
+        self.assertEqual(
+            result["queries"][1]["filters"],
+            [{"col": "name", "op": "IN", "val": ["Alice"]}],
+        )
+
+        chart.query_context = None
+        self.assertIsNone(get_query_context(chart, extra_filters))
+
+    @pytest.mark.usefixtures("load_birth_names_dashboard_with_slices")
+    def test_near_expiry_strategy(self):
+        now = datetime.datetime.utcnow()
+        charts = db.session.query(Slice).all()
+        expiring_ids = {charts[0].id}
+
+        def get_cache_expiry(chart):
+            if chart.id in expiring_ids:
+                return now + datetime.timedelta(seconds=60)
+            if chart.id == charts[1].id:
+                return None
+            return now + datetime.timedelta(days=1)
+
+        with mock.patch(
+            "rabbitai.tasks.cache.get_cache_expiry", side_effect=get_cache_expiry
+        ):
+            strategy = NearExpiryStrategy(threshold=600)
+            result = {chart.id for chart, _ in strategy.get_charts()}
+
+        self.assertEqual(result, expiring_ids)
+
+    @pytest.mark.usefixtures("load_birth_names_dashboard_with_slices")
+    def test_cache_warmup(self):
+        dash = self.get_dash_by_slug("births")
+        chart_ids = sorted(slc.id for slc in dash.slices)
+
+        def warm_up_chart(chart_id, extra_filters=None):
+            if chart_id == chart_ids[0]:
+                raise Exception("error")
+            return {
+                "chart_id": chart_id,
+                "duration_ms": 1.0,
+                "rowcount": 1,
+                "cache_size": 10,
+            }
+
+        user = getattr(g, "user", None)
+        with mock.patch(
+            "rabbitai.tasks.cache.warm_up_chart", side_effect=warm_up_chart
+        ), mock.patch.object(
+            TopNDashboardsStrategy,
+            "get_charts",
+            return_value=[(slc, dash) for slc in dash.slices],
+        ):
+            result = cache_warmup("top_n_dashboards", top_n=1)
+
+        # the warm-up user does not leak out of the task
+        self.assertIs(getattr(g, "user", None), user)
+
+        self.assertEqual(
+            sorted(item["chart_id"] for item in result["success"]), chart_ids[1:]
+        )
+        self.assertEqual(
+            result["errors"], [{"chart_id": chart_ids[0], "error": "error"}]
+        )
+
+    @pytest.mark.usefixtures("load_birth_names_dashboard_with_slices")
+    def test_warm_up_chart(self):
+        chart = db.session.query(Slice).filter_by(slice_name="Genders").one()
+
+        with override_user(security_manager.find_user("admin")):
+            now = datetime.datetime.utcnow()
+            result = warm_up_chart(chart.id)
+            [(cache_key, cache_timeout)] = get_cache_keys(chart)
+            expiry = get_cache_expiry(chart)
+
+        self.assertEqual(result["chart_id"], chart.id)
+        self.assertGreater(result["rowcount"], 0)
+        self.assertGreater(result["cache_size"], 0)
+        self.assertIsNotNone(cache_manager.data_cache.get(cache_key))
+        # the cached timestamp is truncated to seconds
+        expected = now + datetime.timedelta(seconds=cache_timeout)
+        self.assertLess(abs((expiry - expected).total_seconds()), 5)
@@ -1,11 +1,13 @@
 # from rabbitai import db
 # from rabbitai.models.dashboard import Dashboard
+import threading
 import urllib.request
 from io import BytesIO
 from unittest import skipUnless
-from unittest.mock import ANY, call, patch
+from unittest.mock import ANY, call, patch, PropertyMock
 
 from flask_testing import LiveServerTestCase
+from selenium.common.exceptions import WebDriverException
 from sqlalchemy.sql import func
 
 from rabbitai import db, is_feature_enabled, security_manager
@@ -14,7 +16,7 @@ from rabbitai.models.dashboard import Dashboard
 from rabbitai.models.slice import Slice
 from rabbitai.utils.screenshots import ChartScreenshot, DashboardScreenshot
 from rabbitai.utils.urls import get_url_host, get_url_path
-from rabbitai.utils.webdriver import WebDriverProxy
+from rabbitai.utils.webdriver import WebDriverProxy, webdriver_pool
 from tests.integration_tests.conftest import with_feature_flags
 from tests.integration_tests.test_app import app
 
@@ -47,6 +49,10 @@ class TestThumbnailsSeleniumLive(LiveServerTestCase):
 
 
 class TestWebDriverProxy(SupersetTestCase):
+    def tearDown(self):
+        webdriver_pool.clear()
+        super().tearDown()
+
     @patch("rabbitai.utils.webdriver.WebDriverWait")
     @patch("rabbitai.utils.webdriver.firefox")
     @patch("rabbitai.utils.webdriver.sleep")
@@ -59,7 +65,8 @@ class TestWebDriverProxy(SupersetTestCase):
         )
         url = get_url_path("Superset.slice", slice_id=1, standalone="true")
         app.config["SCREENSHOT_SELENIUM_HEADSTART"] = 5
-        webdriver.get_screenshot(url, "chart-container", user=user)
+        with patch.dict(app.config, {"SCREENSHOT_SELENIUM_WAIT_FOR_STABLE": False}):
+            webdriver.get_screenshot(url, "chart-container", user=user)
         assert mock_sleep.call_args_list[0] == call(5)
 
     @patch("rabbitai.utils.webdriver.WebDriverWait")
@@ -98,9 +105,108 @@ class TestWebDriverProxy(SupersetTestCase):
         )
         url = get_url_path("Superset.slice", slice_id=1, standalone="true")
         app.config["SCREENSHOT_SELENIUM_ANIMATION_WAIT"] = 4
-        webdriver.get_screenshot(url, "chart-container", user=user)
+        with patch.dict(app.config, {"SCREENSHOT_SELENIUM_WAIT_FOR_STABLE": False}):
+            webdriver.get_screenshot(url, "chart-container", user=user)
         assert mock_sleep.call_args_list[1] == call(4)
 
+    @patch("rabbitai.utils.webdriver.WebDriverWait")
+    @patch("rabbitai.utils.webdriver.firefox")
+    @patch("rabbitai.utils.webdriver.sleep")
+    def test_screenshot_selenium_wait_for_stable(
+        self, mock_sleep, mock_webdriver, mock_webdriver_wait
+    ):
+        element = mock_webdriver_wait.return_value.until.return_value
+        type(element).screenshot_as_png = PropertyMock(
+            side_effect=[b"loading", b"chart", b"chart"]
+        )
+        webdriver = WebDriverProxy("firefox")
+        user = security_manager.get_user_by_username(
+            app.config["THUMBNAIL_SELENIUM_USER"]
+        )
+        url = get_url_path("Superset.slice", slice_id=1, standalone="true")
+        with patch.dict(
+            app.config,
+            {
+                "SCREENSHOT_SELENIUM_WAIT_FOR_STABLE": True,
+                "SCREENSHOT_SELENIUM_STABLE_INTERVAL": 0.1,
+                "SCREENSHOT_SELENIUM_ANIMATION_WAIT": 5,
+            },
+        ):
+            img = webdriver.get_screenshot(url, "chart-container", user=user)
+        assert img == b"chart"
+        assert mock_sleep.call_args_list == [call(0.1), call(0.1)]
+
+    @patch("rabbitai.utils.webdriver.WebDriverWait")
+    @patch("rabbitai.utils.webdriver.firefox")
+    def test_webdriver_pool_reuses_driver(self, mock_webdriver, mock_webdriver_wait):
+        webdriver = WebDriverProxy("firefox")
+        user = security_manager.get_user_by_username(
+            app.config["THUMBNAIL_SELENIUM_USER"]
+        )
+        url = get_url_path("Superset.slice", slice_id=1, standalone="true")
+        with patch.dict(
+            app.config, {"WEBDRIVER_POOL_SIZE": 1, "WEBDRIVER_POOL_MAX_USES": 2}
+        ):
+            for _ in range(3):
+                webdriver.get_screenshot(url, "chart-container", user=user)
+
+        # the driver is recycled after two screenshots
+        assert mock_webdriver.webdriver.WebDriver.call_count == 2
+        driver = mock_webdriver.webdriver.WebDriver.return_value
+        assert driver.quit.call_count == 1
+
+    @patch("rabbitai.utils.webdriver.WebDriverWait")
+    @patch("rabbitai.utils.webdriver.firefox")
+    def test_webdriver_pool_discards_unhealthy_driver(
+        self, mock_webdriver, mock_webdriver_wait
+    ):
+        webdriver = WebDriverProxy("firefox")
+        user = security_manager.get_user_by_username(
+            app.config["THUMBNAIL_SELENIUM_USER"]
+        )
+        url = get_url_path("Superset.slice", slice_id=1, standalone="true")
+        with patch.dict(app.config, {"WEBDRIVER_POOL_SIZE": 1}):
+            webdriver.get_screenshot(url, "chart-container", user=user)
+            driver = mock_webdriver.webdriver.WebDriver.return_value
+            driver.execute_script.side_effect = WebDriverException("crashed")
+            webdriver.get_screenshot(url, "chart-container", user=user)
+
+        assert mock_webdriver.webdriver.WebDriver.call_count == 2
+        assert driver.quit.call_count == 1
+
+    @patch("rabbitai.utils.webdriver.WebDriverWait")
+    @patch("rabbitai.utils.webdriver.firefox")
+    def test_webdriver_pool_destroys_driver_outside_lock(
+        self, mock_webdriver, mock_webdriver_wait
+    ):
+        webdriver = WebDriverProxy("firefox")
+        user = security_manager.get_user_by_username(
+            app.config["THUMBNAIL_SELENIUM_USER"]
+        )
+        url = get_url_path("Superset.slice", slice_id=1, standalone="true")
+        unlocked = []
+
+        def try_lock():
+            if webdriver_pool._condition.acquire(timeout=1):
+                webdriver_pool._condition.release()
+                unlocked.append(True)
+
+        def quit_driver():
+            # other threads can use the pool while the driver quits
+            thread = threading.Thread(target=try_lock)
+            thread.start()
+            thread.join()
+
+        driver = mock_webdriver.webdriver.WebDriver.return_value
+        driver.quit.side_effect = quit_driver
+        with patch.dict(
+            app.config, {"WEBDRIVER_POOL_SIZE": 1, "WEBDRIVER_POOL_MAX_USES": 1}
+        ):
+            webdriver.get_screenshot(url, "chart-container", user=user)
+
+        assert driver.quit.call_count == 1
+        assert unlocked == [True]
+
 
 class TestThumbnails(SupersetTestCase):
 
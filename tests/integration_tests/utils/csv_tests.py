@@ -1,10 +1,19 @@
 # pylint: disable=no-self-use
 import io
+import json
 
 import pandas as pd
 import pytest
 
+from rabbitai import db, security_manager
+from rabbitai.exceptions import RabbitaiSecurityException
+from rabbitai.models.slice import Slice
 from rabbitai.utils import csv
+from rabbitai.utils.core import override_user
+from tests.integration_tests.fixtures.birth_names_dashboard import (
+    load_birth_names_dashboard_with_slices,
+)
+from tests.integration_tests.fixtures.query_context import get_query_context
 
 
 def test_escape_value():
@@ -62,3 +71,64 @@ def test_df_to_escaped_csv():
         ["a", "'=b"],  # pandas seems to be removing the leading ""
         ["' =a", "b"],
     ]
+
+
+def test_df_chunks_to_escaped_csv():
+    chunks = [
+        pd.DataFrame({"col_a": ["=a", "b"], "col_b": [1, 2]}),
+        pd.DataFrame({"col_a": ["c"], "col_b": [3]}),
+    ]
+
+    escaped_csv_str = "".join(csv.df_chunks_to_escaped_csv(chunks, index=False))
+
+    assert escaped_csv_str.strip().split("\n") == [
+        "col_a,col_b",
+        "'=a,1",
+        "b,2",
+        "c,3",
+    ]
+
+
+def get_genders_chart() -> Slice:
+    return db.session.query(Slice).filter_by(slice_name="Genders").one()
+
+
+@pytest.mark.usefixtures("load_birth_names_dashboard_with_slices", "app_context")
+def test_get_chart_dataframe_legacy():
+    chart = get_genders_chart()
+    assert not chart.query_context
+
+    with override_user(security_manager.find_user("admin")):
+        df = csv.get_chart_dataframe(chart)
+
+    assert sorted(df["gender"].tolist()) == ["boy", "girl"]
+
+
+@pytest.mark.usefixtures("load_birth_names_dashboard_with_slices", "app_context")
+def test_get_chart_dataframe_query_context():
+    chart = get_genders_chart()
+    chart.query_context = json.dumps(get_query_context("birth_names"))
+
+    try:
+        with override_user(security_manager.find_user("admin")):
+            df = csv.get_chart_dataframe(chart)
+    finally:
+        db.session.rollback()
+
+    assert list(df.columns) == ["name", "sum__num"]
+    assert len(df) == 100
+
+
+@pytest.mark.usefixtures("load_birth_names_dashboard_with_slices", "app_context")
+@pytest.mark.parametrize("with_query_context", [False, True])
+def test_get_chart_dataframe_no_access(with_query_context):
+    chart = get_genders_chart()
+    if with_query_context:
+        chart.query_context = json.dumps(get_query_context("birth_names"))
+
+    try:
+        with override_user(security_manager.find_user("gamma")):
+            with pytest.raises(RabbitaiSecurityException):
+                csv.get_chart_dataframe(chart)
+    finally:
+        db.session.rollback()
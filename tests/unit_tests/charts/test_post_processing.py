@@ -1,40 +1,17 @@
-import copy
-from typing import Any, Dict
+from io import StringIO
 
-from rabbitai.charts.post_processing import apply_post_process
-from rabbitai.utils.core import GenericDataType, QueryStatus
+import pandas as pd
+import pytest
 
-RESULT: Dict[str, Any] = {
-    "query_context": None,
-    "queries": [
-        {
-            "cache_key": "1bd3ab8c01e98a0e349fb61bc76d9b90",
-            "cached_dttm": None,
-            "cache_timeout": 86400,
-            "annotation_data": {},
-            "error": None,
-            "is_cached": None,
-            "query": """SELECT state AS state,
-       gender AS gender,
-       sum(num) AS \"Births\"
-FROM birth_names
-WHERE ds >= TO_TIMESTAMP('1921-07-28 00:00:00.000000', 'YYYY-MM-DD HH24:MI:SS.US')
-  AND ds < TO_TIMESTAMP('2021-07-28 10:39:44.000000', 'YYYY-MM-DD HH24:MI:SS.US')
-GROUP BY state,
-         gender
-LIMIT 50000;
-
-""",
-            "status": QueryStatus.SUCCESS,
-            "stacktrace": None,
-            "rowcount": 22,
-            "colnames": ["state", "gender", "Births"],
-            "coltypes": [
-                GenericDataType.STRING,
-                GenericDataType.STRING,
-                GenericDataType.NUMERIC,
-            ],
-            "data": """state,gender,Births
+from rabbitai.charts.post_processing import (
+    _pivot_table,
+    post_process_df,
+    SQL_LIKE_SUM,
+    sql_like_sum,
+)
+from rabbitai.exceptions import QueryObjectValidationError
+
+DATA = """state,gender,Births
 OH,boy,2376385
 TX,girl,2313186
 MA,boy,1285126
@@ -57,12 +34,11 @@ MI,boy,1938321
 IL,boy,2357411
 PA,girl,1615383
 OH,girl,1622814
-            """,
-            "applied_filters": [],
-            "rejected_filters": [],
-        }
-    ],
-}
+"""
+
+
+def get_df() -> pd.DataFrame:
+    return pd.read_csv(StringIO(DATA))
 
 
 def test_pivot_table():
@@ -95,69 +71,29 @@ def test_pivot_table():
         "url_params": {},
         "viz_type": "pivot_table",
     }
-    result = copy.deepcopy(RESULT)
-    assert apply_post_process(result, form_data) == {
-        "query_context": None,
-        "queries": [
-            {
-                "cache_key": "1bd3ab8c01e98a0e349fb61bc76d9b90",
-                "cached_dttm": None,
-                "cache_timeout": 86400,
-                "annotation_data": {},
-                "error": None,
-                "is_cached": None,
-                "query": """SELECT state AS state,
-       gender AS gender,
-       sum(num) AS \"Births\"
-FROM birth_names
-WHERE ds >= TO_TIMESTAMP('1921-07-28 00:00:00.000000', 'YYYY-MM-DD HH24:MI:SS.US')
-  AND ds < TO_TIMESTAMP('2021-07-28 10:39:44.000000', 'YYYY-MM-DD HH24:MI:SS.US')
-GROUP BY state,
-         gender
-LIMIT 50000;
-
-""",
-                "status": QueryStatus.SUCCESS,
-                "stacktrace": None,
-                "rowcount": 3,
-                "colnames": [
-                    "Births CA",
-                    "Births FL",
-                    "Births IL",
-                    "Births MA",
-                    "Births MI",
-                    "Births NJ",
-                    "Births NY",
-                    "Births OH",
-                    "Births PA",
-                    "Births TX",
-                    "Births other",
-                    "Births All",
-                ],
-                "coltypes": [
-                    GenericDataType.NUMERIC,
-                    GenericDataType.NUMERIC,
-                    GenericDataType.NUMERIC,
-                    GenericDataType.NUMERIC,
-                    GenericDataType.NUMERIC,
-                    GenericDataType.NUMERIC,
-                    GenericDataType.NUMERIC,
-                    GenericDataType.NUMERIC,
-                    GenericDataType.NUMERIC,
-                    GenericDataType.NUMERIC,
-                    GenericDataType.NUMERIC,
-                    GenericDataType.NUMERIC,
-                ],
-                "data": """gender,Births CA,Births FL,Births IL,Births MA,Births MI,Births NJ,Births NY,Births OH,Births PA,Births TX,Births other,Births All
+    df = post_process_df(get_df(), form_data)
+
+    assert list(df.columns) == [
+        "Births CA",
+        "Births FL",
+        "Births IL",
+        "Births MA",
+        "Births MI",
+        "Births NJ",
+        "Births NY",
+        "Births OH",
+        "Births PA",
+        "Births TX",
+        "Births other",
+        "Births All",
+    ]
+    assert df.to_csv() == (
+        """gender,Births CA,Births FL,Births IL,Births MA,Births MI,Births NJ,Births NY,Births OH,Births PA,Births TX,Births other,Births All
 boy,5430796,1968060,2357411,1285126,1938321,1486126,3543961,2376385,2390275,3311985,22044909,48133355
 girl,3567754,1312593,1614427,842146,1326229,992702,2280733,1622814,1615383,2313186,15058341,32546308
 All,8998550,3280653,3971838,2127272,3264550,2478828,5824694,3999199,4005658,5625171,37103250,80679663
-""",
-                "applied_filters": [],
-                "rejected_filters": [],
-            }
-        ],
-    }
+"""
+    )
 
 
 def test_pivot_table_v2():
@@ -195,38 +131,11 @@ def test_pivot_table_v2():
         "valueFormat": "SMART_NUMBER",
         "viz_type": "pivot_table_v2",
     }
-    result = copy.deepcopy(RESULT)
-    assert apply_post_process(result, form_data) == {
-        "query_context": None,
-        "queries": [
-            {
-                "cache_key": "1bd3ab8c01e98a0e349fb61bc76d9b90",
-                "cached_dttm": None,
-                "cache_timeout": 86400,
-                "annotation_data": {},
-                "error": None,
-                "is_cached": None,
-                "query": """SELECT state AS state,
-       gender AS gender,
-       sum(num) AS \"Births\"
-FROM birth_names
-WHERE ds >= TO_TIMESTAMP('1921-07-28 00:00:00.000000', 'YYYY-MM-DD HH24:MI:SS.US')
-  AND ds < TO_TIMESTAMP('2021-07-28 10:39:44.000000', 'YYYY-MM-DD HH24:MI:SS.US')
-GROUP BY state,
-         gender
-LIMIT 50000;
-
-""",
-                "status": QueryStatus.SUCCESS,
-                "stacktrace": None,
-                "rowcount": 12,
-                "colnames": ["All Births", "boy Births", "girl Births"],
-                "coltypes": [
-                    GenericDataType.NUMERIC,
-                    GenericDataType.NUMERIC,
-                    GenericDataType.NUMERIC,
-                ],
-                "data": """state,All Births,boy Births,girl Births
+    df = post_process_df(get_df(), form_data)
+
+    assert list(df.columns) == ["All Births", "boy Births", "girl Births"]
+    assert df.to_csv() == (
+        """state,All Births,boy Births,girl Births
 All,1.0,0.5965983645717509,0.40340163542824914
 CA,1.0,0.6035190113962805,0.3964809886037195
 FL,1.0,0.5998988615985903,0.4001011384014097
@@ -239,9 +148,92 @@ OH,1.0,0.5942152416021308,0.40578475839786915
 PA,1.0,0.596724682935987,0.40327531706401293
 TX,1.0,0.5887794344385264,0.41122056556147357
 other,1.0,0.5941503507105172,0.40584964928948275
-""",
-                "applied_filters": [],
-                "rejected_filters": [],
-            }
-        ],
+"""
+    )
+
+
+def test_post_process_df_pivot_matches_pandas():
+    df = pd.DataFrame(
+        {
+            "state": ["CA", "CA", "NY", "NY", "TX"],
+            "gender": ["boy", "girl", "boy", "girl", "boy"],
+            "year": [2000, 2000, 2001, 2000, 2001],
+            "Births": [3.0, None, 5.0, 2.0, 7.0],
+        }
+    )
+    form_data = {
+        "viz_type": "pivot_table",
+        "groupby": ["state", "year"],
+        "columns": ["gender"],
+        "metrics": ["Births"],
+        "pivot_margins": True,
+    }
+
+    expected = df.pivot_table(
+        index=["state", "year"],
+        columns=["gender"],
+        values=["Births"],
+        aggfunc={"Births": sql_like_sum},
+        margins=True,
+    )
+    expected.columns = [" ".join(column) for column in expected.columns]
+
+    pd.testing.assert_frame_equal(post_process_df(df, form_data), expected)
+
+
+@pytest.mark.parametrize("index", [["state"], ["state", "year"]])
+@pytest.mark.parametrize("margins", [False, True])
+def test_pivot_table_rows_only_matches_pandas(index, margins):
+    df = pd.DataFrame(
+        {
+            "state": ["CA", "CA", "NY", "NY", "TX"],
+            "year": [2000, 2000, 2001, 2000, 2001],
+            "Births": [3.0, None, 5.0, 2.0, 7.0],
+            "count": [1, 2, 3, 4, 5],
+        }
+    )
+
+    expected = df.pivot_table(
+        index=index,
+        columns=[],
+        values=["Births", "count"],
+        aggfunc={"Births": sql_like_sum, "count": "mean"},
+        margins=margins,
+    )
+    result = _pivot_table(
+        df,
+        index=index,
+        columns=[],
+        aggregates={"Births": SQL_LIKE_SUM, "count": ("mean", {})},
+        margins=margins,
+    )
+
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_post_process_df_other_viz_type():
+    df = pd.DataFrame({"a": [1, 2]})
+
+    assert post_process_df(df, {"viz_type": "table"}) is df
+
+
+def test_post_process_df_pivot_size_limits():
+    df = pd.DataFrame(
+        {
+            "state": ["CA", "NY", "TX"],
+            "gender": ["boy", "girl", "boy"],
+            "Births": [1, 2, 3],
+        }
+    )
+    form_data = {
+        "viz_type": "pivot_table_v2",
+        "groupbyRows": ["state"],
+        "groupbyColumns": ["gender"],
+        "metrics": ["Births"],
     }
+
+    assert len(post_process_df(df, form_data, max_rows=3, max_columns=2)) == 3
+    with pytest.raises(QueryObjectValidationError):
+        post_process_df(df, form_data, max_rows=2)
+    with pytest.raises(QueryObjectValidationError):
+        post_process_df(df, form_data, max_columns=1)
@@ -0,0 +1,112 @@
+import json
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from rabbitai.dataframe import (
+    arrow_ipc_to_df,
+    df_to_arrow_ipc,
+    df_to_json,
+    df_to_parquet,
+    df_to_records,
+    parquet_to_df,
+)
+
+
+def test_df_to_records_big_integers():
+    df = pd.DataFrame(
+        {
+            "a": [1, 2],
+            "b": [1239162456494753670, 100],
+            "c": ["c1", "c2"],
+            "d": pd.Series([1239162456494753670, None], dtype=object),
+        }
+    )
+
+    assert df_to_records(df) == [
+        {"a": 1, "b": "1239162456494753670", "c": "c1", "d": "1239162456494753670"},
+        {"a": 2, "b": 100, "c": "c2", "d": None},
+    ]
+
+
+def test_df_to_records_small_integers():
+    df = pd.DataFrame({"a": [1, 2], "b": [1.5, np.nan]})
+    records = df_to_records(df)
+
+    assert records[0] == {"a": 1, "b": 1.5}
+    assert type(records[0]["a"]) is int
+    assert np.isnan(records[1]["b"])
+
+
+def test_df_to_json_records():
+    df = pd.DataFrame(
+        {
+            "name": ["a", None],
+            "value": [1.5, np.inf],
+            "big": [1239162456494753670, 1],
+            "__timestamp": [datetime(2021, 1, 1), pd.NaT],
+        }
+    )
+
+    assert json.loads(df_to_json(df)) == [
+        {
+            "name": "a",
+            "value": 1.5,
+            "big": "1239162456494753670",
+            "__timestamp": 1609459200000,
+        },
+        {"name": None, "value": None, "big": 1, "__timestamp": None},
+    ]
+
+
+def test_df_to_json_columns():
+    df = pd.DataFrame({"a": [1, 2], "b": ["x", "y"]}, index=[5, 6])
+
+    assert json.loads(df_to_json(df, orient="columns")) == {
+        "columns": ["a", "b"],
+        "data": [[1, "x"], [2, "y"]],
+    }
+
+
+def test_df_to_json_keeps_float_precision():
+    df = pd.DataFrame(
+        {
+            "value": [0.1 + 0.2, 1.23456789012345e-10, np.inf],
+            "big": [1239162456494753670, 1, 2],
+            "__timestamp": [datetime(2021, 1, 1), pd.NaT, datetime(2021, 1, 2)],
+        }
+    )
+    data = [
+        [0.30000000000000004, "1239162456494753670", 1609459200000],
+        [1.23456789012345e-10, 1, None],
+        [None, 2, 1609545600000],
+    ]
+
+    assert json.loads(df_to_json(df)) == [dict(zip(df.columns, row)) for row in data]
+    assert json.loads(df_to_json(df, orient="columns")) == {
+        "columns": ["value", "big", "__timestamp"],
+        "data": data,
+    }
+
+
+def test_binary_round_trip():
+    df = pd.DataFrame(
+        {"name": ["a", None], "value": [1.5, np.nan], "count": [1, 2]},
+    )
+
+    pd.testing.assert_frame_equal(arrow_ipc_to_df(df_to_arrow_ipc(df)), df)
+    pd.testing.assert_frame_equal(parquet_to_df(df_to_parquet(df)), df)
+
+
+def test_binary_keeps_index():
+    df = pd.DataFrame({"value": [1, 2]}, index=pd.Index(["x", "y"], name="key"))
+
+    pd.testing.assert_frame_equal(arrow_ipc_to_df(df_to_arrow_ipc(df)), df)
+    pd.testing.assert_frame_equal(parquet_to_df(df_to_parquet(df)), df)
+
+
+def test_binary_mixed_types():
+    df = pd.DataFrame({"mixed": [1, "a", None]})
+
+    assert arrow_ipc_to_df(df_to_arrow_ipc(df))["mixed"].tolist() == ["1", "a", None]
@@ -0,0 +1,150 @@
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import pyarrow as pa
+import pytest
+
+from rabbitai.db_engine_specs import BaseEngineSpec
+from rabbitai.exceptions import ResultSetTooLargeError
+from rabbitai.result_set import (
+    iter_row_batches_as_arrow,
+    RabbitaiResultSet,
+    row_batches_to_arrow_table,
+)
+
+
+def test_columnar_ingestion_types():
+    data = [
+        (1.2, 1, "foo", datetime(2018, 10, 19, 23, 39, 16), True),
+        (3.14, None, "bar", datetime(2019, 10, 19, 23, 39, 16), None),
+    ]
+    cursor_descr = [("a",), ("b",), ("c",), ("d",), ("e",)]
+    results = RabbitaiResultSet(data, cursor_descr, BaseEngineSpec)
+
+    assert [col["type"] for col in results.columns] == [
+        "FLOAT",
+        "INT",
+        "STRING",
+        "DATETIME",
+        "BOOL",
+    ]
+    assert results.size == 2
+    assert results.pa_table.column("b").to_pylist() == [1, None]
+
+
+def test_columnar_ingestion_mixed_and_nested_types():
+    data = [(1, [1, 2]), ("a", [3])]
+    cursor_descr = [("mixed",), ("nested",)]
+    results = RabbitaiResultSet(data, cursor_descr, BaseEngineSpec)
+
+    assert results.pa_table.column("mixed").to_pylist() == ["1", '"a"']
+    assert results.pa_table.column("nested").to_pylist() == ["[1, 2]", "[3]"]
+
+
+def test_columnar_ingestion_tz_aware_datetime():
+    tz = timezone(timedelta(hours=2))
+    data = [(datetime(2021, 1, 1, 10, tzinfo=tz),), (None,)]
+    cursor_descr = [("ds",)]
+    results = RabbitaiResultSet(data, cursor_descr, BaseEngineSpec)
+
+    assert pa.types.is_timestamp(results.pa_table.column("ds").type)
+    assert results.pa_table.column("ds").type.tz is not None
+
+
+def test_arrow_table_input():
+    table = pa.Table.from_pydict({"a": [1, 2], "b": [[1], [2, 3]]})
+    cursor_descr = [("a",), ("a",)]
+    results = RabbitaiResultSet(table, cursor_descr, BaseEngineSpec)
+
+    assert results.pa_table.column_names == ["a", "a__1"]
+    assert results.pa_table.column("a__1").to_pylist() == ["[1]", "[2, 3]"]
+    assert results.size == 2
+
+
+def test_row_batches_to_arrow_table():
+    batches = [[(1, None, "a")], [(2.5, "x", 1)], [(3, "y", None)]]
+    table = row_batches_to_arrow_table(batches)
+    results = RabbitaiResultSet(table, [("a",), ("b",), ("c",)], BaseEngineSpec)
+
+    assert results.size == 3
+    assert results.pa_table.column("a").to_pylist() == [1.0, 2.5, 3.0]
+    assert results.pa_table.column("b").to_pylist() == [None, "x", "y"]
+    assert results.pa_table.column("c").to_pylist() == ['"a"', "1", "null"]
+
+
+@pytest.mark.parametrize(
+    "batches",
+    [
+        [[(1, None, "a")], [(2.5, "x", 1)], [(3, "y", None)]],
+        [[("a",), ("b",)], [("c",), (1,)]],
+        [[(None,)], [([1],)], [("x",)]],
+        [[(True,)], [(1,)]],
+    ],
+)
+def test_row_batches_to_arrow_table_matches_single_batch(batches):
+    rows = [row for batch in batches for row in batch]
+    description = [(str(i),) for i in range(len(rows[0]))]
+    table = row_batches_to_arrow_table(batches)
+    results = RabbitaiResultSet(table, description, BaseEngineSpec)
+    expected = RabbitaiResultSet(rows, description, BaseEngineSpec)
+
+    assert results.pa_table.to_pydict() == expected.pa_table.to_pydict()
+
+
+def test_row_batches_to_arrow_table_tz_offsets():
+    winter = timezone(timedelta(hours=1))
+    summer = timezone(timedelta(hours=2))
+    batches = [
+        [(datetime(2021, 3, 27, 12, tzinfo=winter),)],
+        [(datetime(2021, 3, 28, 12, tzinfo=summer),), (None,)],
+    ]
+    table = row_batches_to_arrow_table(batches)
+    results = RabbitaiResultSet(table, [("ds",)], BaseEngineSpec)
+
+    column = results.pa_table.column("ds")
+    assert pa.types.is_timestamp(column.type)
+    assert column.type.tz is not None
+    assert column.to_pylist() == [row[0] for batch in batches for row in batch]
+
+
+def test_row_batches_to_arrow_table_max_bytes():
+    batches = ([(i, "value")] * 100 for i in range(100))
+    with pytest.raises(ResultSetTooLargeError):
+        row_batches_to_arrow_table(batches, max_bytes=1024)
+
+
+def test_row_batches_to_arrow_table_empty():
+    results = RabbitaiResultSet(
+        row_batches_to_arrow_table([]), [("a",)], BaseEngineSpec
+    )
+    assert results.columns == []
+
+
+def test_iter_row_batches_as_arrow_keeps_first_batch_types():
+    batches = [[(1, None)], [(None, None)], [(None, 2)], [(2.5, "x")]]
+    tables = list(iter_row_batches_as_arrow(batches))
+    dfs = [
+        RabbitaiResultSet(table, [("a",), ("b",)], BaseEngineSpec).to_pandas_df()
+        for table in tables
+    ]
+
+    assert [table.column(0).type for table in tables] == [
+        pa.int64(),
+        pa.int64(),
+        pa.int64(),
+        pa.float64(),
+    ]
+    assert [table.column(1).type for table in tables[2:]] == [pa.int64(), pa.string()]
+    assert [df.to_csv(index=False, header=False) for df in dfs[:3]] == [
+        "1,\n",
+        ",\n",
+        ",2\n",
+    ]
+
+
+def test_fetch_data_in_batches_respects_limit():
+    cursor = mock.MagicMock()
+    cursor.fetchmany.side_effect = lambda size: [(1,)] * size
+    batches = list(BaseEngineSpec.fetch_data_in_batches(cursor, 25, batch_size=10))
+
+    assert [len(batch) for batch in batches] == [10, 10, 5]
@@ -0,0 +1,48 @@
+import pyarrow as pa
+import pytest
+from cachelib import SimpleCache
+
+from rabbitai.exceptions import SerializationError
+from rabbitai.utils.results_chunks import read_table_chunks, write_table_chunks
+
+
+def test_results_chunks_round_trip():
+    cache = SimpleCache()
+    table = pa.table({"a": list(range(10)), "b": [str(i) for i in range(10)]})
+
+    chunks = write_table_chunks(cache, "key", table, chunk_rows=4)
+    assert [(chunk["offset"], chunk["rows"]) for chunk in chunks] == [
+        (0, 4),
+        (4, 4),
+        (8, 2),
+    ]
+
+    assert read_table_chunks(cache, chunks).equals(table)
+    assert read_table_chunks(cache, chunks, 3, 6).equals(table.slice(3, 6))
+    assert read_table_chunks(cache, chunks, 8).equals(table.slice(8))
+    assert read_table_chunks(cache, chunks, 20).num_rows == 0
+    assert read_table_chunks(cache, chunks, 0, 0).equals(table.slice(0, 0))
+
+
+def test_results_chunks_empty_table():
+    cache = SimpleCache()
+    table = pa.table({"a": pa.array([], pa.int64())})
+
+    chunks = write_table_chunks(cache, "key", table, chunk_rows=4)
+    assert len(chunks) == 1
+
+    result = read_table_chunks(cache, chunks)
+    assert result.num_rows == 0
+    assert result.schema.equals(table.schema)
+
+
+def test_results_chunks_missing_chunk():
+    cache = SimpleCache()
+    table = pa.table({"a": list(range(10))})
+
+    chunks = write_table_chunks(cache, "key", table, chunk_rows=4)
+    cache.delete("key-1")
+
+    assert read_table_chunks(cache, chunks, 0, 4).num_rows == 4
+    with pytest.raises(SerializationError):
+        read_table_chunks(cache, chunks, 2, 4)
@@ -0,0 +1,38 @@
+import pyarrow as pa
+
+from rabbitai.utils.core import zlib_compress
+from rabbitai.utils.results_format import (
+    arrow_file_to_table,
+    compress_results,
+    decompress_results,
+    is_arrow_file,
+    MAGIC,
+    table_to_arrow_file,
+)
+
+
+def test_compress_results_round_trip():
+    data = b'{"data": []}' * 100
+
+    blob = compress_results(data, "zstd", 10)
+    assert blob.startswith(MAGIC)
+    assert len(blob) < len(data)
+    assert decompress_results(blob) == data
+    assert decompress_results(compress_results(data, "lz4")) == data
+
+
+def test_compress_results_legacy():
+    data = '{"data": []}'
+
+    assert decompress_results(compress_results(data)) == data.encode("utf-8")
+    assert decompress_results(zlib_compress(data), decode=True) == data
+    assert decompress_results(compress_results(data, "zstd"), decode=True) == data
+
+
+def test_arrow_file_round_trip():
+    table = pa.table({"a": [1, 2], "b": ["x", None]})
+    data = table_to_arrow_file(table)
+
+    assert is_arrow_file(data)
+    assert not is_arrow_file(b"\x00\x00\x00\x00")
+    assert arrow_file_to_table(data).equals(table)
@@ -0,0 +1,185 @@
+# pylint: disable=import-outside-toplevel, unused-argument
+import threading
+import time
+from unittest import mock
+
+from flask import current_app
+from flask_caching import Cache
+
+
+def make_cache():
+    cache = Cache()
+    cache.init_app(current_app, {"CACHE_TYPE": "SimpleCache"})
+    return cache
+
+
+def test_single_flight_disabled(app_context):
+    from rabbitai.utils import cache as cache_utils
+
+    cache = make_cache()
+    with mock.patch.dict(cache_utils.config, {"DATA_CACHE_SINGLE_FLIGHT": False}):
+        with cache_utils.single_flight(cache, "key") as waited:
+            assert waited is False
+            assert cache.get("key__lock") is None
+
+
+def test_single_flight_releases_lock(app_context):
+    from rabbitai.utils import cache as cache_utils
+
+    cache = make_cache()
+    with mock.patch.dict(cache_utils.config, {"DATA_CACHE_SINGLE_FLIGHT": True}):
+        with cache_utils.single_flight(cache, "key") as waited:
+            assert waited is False
+            assert cache.get("key__lock") is not None
+
+    assert cache.get("key__lock") is None
+    assert "key" not in cache_utils._local_locks
+
+
+def test_single_flight_waits_for_remote_lock(app_context):
+    from rabbitai.utils import cache as cache_utils
+
+    cache = make_cache()
+    cache.set("key__lock", "other", timeout=60)
+
+    def release():
+        time.sleep(0.05)
+        cache.set("key", "value")
+        cache.delete("key__lock")
+
+    with mock.patch.dict(cache_utils.config, {"DATA_CACHE_SINGLE_FLIGHT": True}):
+        thread = threading.Thread(target=release)
+        thread.start()
+        with cache_utils.single_flight(cache, "key", poll_interval=0.01) as waited:
+            assert waited is True
+            assert cache.get("key") == "value"
+        thread.join()
+
+
+def test_single_flight_coalesces_threads(app_context):
+    from rabbitai.utils import cache as cache_utils
+
+    cache = make_cache()
+    calls = []
+
+    def compute():
+        with cache_utils.single_flight(cache, "key", poll_interval=0.01) as waited:
+            if not waited:
+                time.sleep(0.05)
+                calls.append(1)
+                cache.set("key", "value")
+
+    with mock.patch.dict(cache_utils.config, {"DATA_CACHE_SINGLE_FLIGHT": True}):
+        threads = [threading.Thread(target=compute) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert calls == [1]
+
+
+def test_single_flight_waiter_takes_over_failed_leader(app_context):
+    from rabbitai.utils import cache as cache_utils
+
+    cache = make_cache()
+    calls = []
+
+    def compute():
+        try:
+            with cache_utils.single_flight(cache, "key", poll_interval=0.01) as waited:
+                if not waited:
+                    time.sleep(0.05)
+                    calls.append(1)
+                    if len(calls) == 1:
+                        raise ValueError("leader failed")
+                    cache.set("key", "value")
+        except ValueError:
+            pass
+
+    with mock.patch.dict(cache_utils.config, {"DATA_CACHE_SINGLE_FLIGHT": True}):
+        threads = [threading.Thread(target=compute) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert calls == [1, 1]
+    assert cache.get("key") == "value"
+
+
+def test_single_flight_takes_over_failed_remote_lock(app_context):
+    from rabbitai.utils import cache as cache_utils
+
+    cache = make_cache()
+    cache.set("key__lock", "other", timeout=60)
+
+    def release():
+        time.sleep(0.05)
+        cache.delete("key__lock")
+
+    with mock.patch.dict(cache_utils.config, {"DATA_CACHE_SINGLE_FLIGHT": True}):
+        thread = threading.Thread(target=release)
+        thread.start()
+        with cache_utils.single_flight(cache, "key", poll_interval=0.01) as waited:
+            assert waited is False
+            assert cache.get("key__lock") not in (None, "other")
+        thread.join()
+
+    assert cache.get("key__lock") is None
+
+
+def test_set_and_log_cache_stale_timeout(app_context):
+    from rabbitai.utils import cache as cache_utils
+
+    cache = make_cache()
+    with mock.patch.object(cache, "set") as set_:
+        cache_utils.set_and_log_cache(cache, "key", {"df": None}, 60, stale_timeout=30)
+
+    value = set_.call_args[0][1]
+    assert set_.call_args[1]["timeout"] == 90
+    assert not cache_utils.is_stale(value)
+    with mock.patch("rabbitai.utils.cache.time.time", return_value=time.time() + 61):
+        assert cache_utils.is_stale(value)
+
+
+def test_is_stale_without_soft_timeout(app_context):
+    from rabbitai.utils import cache as cache_utils
+
+    assert not cache_utils.is_stale(None)
+    assert not cache_utils.is_stale({"df": None, "dttm": "2021-01-01T00:00:00"})
+
+
+def test_refresh_lock(app_context):
+    from rabbitai.utils import cache as cache_utils
+
+    cache = make_cache()
+    lock_key = cache_utils.acquire_refresh_lock(cache, "key")
+    assert lock_key == "key__refresh"
+    assert cache_utils.acquire_refresh_lock(cache, "key") is None
+
+    cache_utils.release_refresh_lock(cache, lock_key)
+    assert cache_utils.acquire_refresh_lock(cache, "key") == lock_key
+
+
+def test_get_cache_value_codec(app_context):
+    import pandas as pd
+
+    from rabbitai.utils import cache as cache_utils
+    from rabbitai.utils.cache_codec import ArrowCacheCodec
+
+    cache = make_cache()
+    df = pd.DataFrame({"a": [1, 2]})
+    with mock.patch.dict(
+        cache_utils.config, {"DATA_CACHE_CODEC": ArrowCacheCodec(compression="zstd")}
+    ):
+        cache_utils.set_and_log_cache(cache, "key", {"df": df, "query": "SELECT 1"})
+    assert isinstance(cache.get("key"), bytes)
+
+    value = cache_utils.get_cache_value(cache, "key")
+    assert value["query"] == "SELECT 1"
+    pd.testing.assert_frame_equal(value["df"], df)
+
+    # entries written before a codec was configured are returned as they are
+    cache.set("legacy", {"df": df, "query": "SELECT 1"})
+    assert cache_utils.get_cache_value(cache, "legacy")["query"] == "SELECT 1"
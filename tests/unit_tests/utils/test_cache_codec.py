@@ -0,0 +1,77 @@
+import pandas as pd
+import pytest
+
+from rabbitai.utils.cache_codec import (
+    ArrowCacheCodec,
+    CacheCodec,
+    decode_cache_value,
+    encode_cache_value,
+    is_encoded,
+)
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame(
+        {
+            "name": ["a", "b", None],
+            "value": [1.5, None, 3.0],
+            "count": [1, 2, 3],
+            "__timestamp": pd.to_datetime(["2021-01-01", "2021-01-02", None]),
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    "codec",
+    [
+        CacheCodec(),
+        ArrowCacheCodec(),
+        ArrowCacheCodec(compression="lz4"),
+        ArrowCacheCodec(compression="zstd"),
+    ],
+)
+def test_round_trip(codec, df):
+    value = {"df": df, "query": "SELECT 1", "annotation_data": {"layer": [1, 2]}}
+    payload = encode_cache_value(codec, value)
+
+    assert is_encoded(payload)
+    decoded_codec, decoded = decode_cache_value(payload)
+    assert decoded_codec.name == codec.name
+    assert decoded["query"] == "SELECT 1"
+    assert decoded["annotation_data"] == {"layer": [1, 2]}
+    pd.testing.assert_frame_equal(decoded["df"], df)
+
+
+@pytest.mark.parametrize(
+    "codec", [ArrowCacheCodec(), ArrowCacheCodec(compression="zstd")],
+)
+def test_arrow_keeps_nullable_bigint(codec):
+    # query results hold nullable integers as objects, without a float cast
+    df = pd.DataFrame(
+        {
+            "id": pd.Series([2 ** 62 + 1, None, 3], dtype=object),
+            "count": pd.array([1, None, 2], dtype="Int64"),
+        }
+    )
+    _, decoded = decode_cache_value(encode_cache_value(codec, {"df": df}))
+    pd.testing.assert_frame_equal(decoded["df"], df)
+    assert decoded["df"]["id"].tolist() == [2 ** 62 + 1, None, 3]
+
+
+def test_arrow_keeps_index():
+    df = pd.DataFrame({"value": [1, 2]}, index=pd.Index(["x", "y"], name="key"))
+    _, decoded = decode_cache_value(encode_cache_value(ArrowCacheCodec(), {"df": df}))
+    pd.testing.assert_frame_equal(decoded["df"], df)
+
+
+def test_arrow_rejects_duplicate_columns():
+    df = pd.DataFrame([[1, 2]], columns=["a", "a"])
+    with pytest.raises(ValueError):
+        encode_cache_value(ArrowCacheCodec(), {"df": df})
+
+
+def test_is_encoded():
+    assert not is_encoded(None)
+    assert not is_encoded({"df": pd.DataFrame()})
+    assert not is_encoded(b"not encoded")
@@ -0,0 +1,55 @@
+# pylint: disable=unused-argument
+import threading
+import time
+
+import pytest
+from flask import g
+
+from rabbitai.utils.concurrency import run_concurrently
+
+
+def test_run_concurrently_keeps_order(app_context):
+    def make_func(index):
+        def func():
+            # finish in reverse order
+            time.sleep(0.01 * (5 - index))
+            return index
+
+        return func
+
+    assert run_concurrently([make_func(i) for i in range(5)], 5) == list(range(5))
+
+
+def test_run_concurrently_propagates_user(app_context):
+    g.user = "admin"
+    results = run_concurrently(
+        [lambda: (g.user, threading.get_ident())] * 2, max_workers=2
+    )
+
+    assert [user for user, _ in results] == ["admin", "admin"]
+    assert threading.get_ident() not in {ident for _, ident in results}
+
+
+def test_run_concurrently_sequential(app_context):
+    results = run_concurrently([threading.get_ident] * 3, max_workers=1)
+    assert set(results) == {threading.get_ident()}
+
+
+def test_run_concurrently_nested_runs_serially(app_context):
+    def nested():
+        return threading.get_ident(), run_concurrently(
+            [threading.get_ident] * 2, max_workers=2
+        )
+
+    results = run_concurrently([nested] * 2, max_workers=2)
+
+    for ident, nested_idents in results:
+        assert set(nested_idents) == {ident}
+
+
+def test_run_concurrently_raises(app_context):
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        run_concurrently([lambda: 1, fail], max_workers=2)
@@ -0,0 +1,60 @@
+# pylint: disable=import-outside-toplevel, unused-argument
+from unittest import mock
+
+from flask import current_app
+from flask_caching import Cache
+
+
+def test_build_cache_value(app_context):
+    from rabbitai.utils.distinct_values import build_cache_value
+
+    cache_value = build_cache_value(["b", None, "Ab", "a", float("nan")])
+
+    assert cache_value["values"] == ["Ab", "a", "b", None]
+    assert cache_value["search_keys"] == ["a", "ab", "b"]
+    assert cache_value["search_positions"] == [1, 0, 2]
+
+
+def test_build_cache_value_mixed_types(app_context):
+    from rabbitai.utils.distinct_values import build_cache_value
+
+    assert build_cache_value([10, "a", 9])["values"] == [10, 9, "a"]
+    assert build_cache_value([10, 9, 1])["values"] == [1, 9, 10]
+
+
+def test_search_values(app_context):
+    from rabbitai.utils.distinct_values import build_cache_value, search_values
+
+    cache_value = build_cache_value(["Boston", "berlin", "Bern", "Austin", None])
+
+    assert search_values(cache_value, "ber") == ["Bern", "berlin"]
+    assert search_values(cache_value, "B") == ["Bern", "Boston", "berlin"]
+    assert search_values(cache_value, "z") == []
+
+
+def test_get_distinct_values_cached(app_context):
+    from rabbitai.utils import distinct_values
+
+    cache = Cache()
+    cache.init_app(current_app, {"CACHE_TYPE": "SimpleCache"})
+    datasource = mock.MagicMock(
+        uid="1__table",
+        changed_on=None,
+        cache_timeout=60,
+        fetch_values_predicate=None,
+        is_rls_supported=False,
+    )
+    datasource.values_for_column.return_value = ["b", "a"]
+
+    with mock.patch.object(distinct_values.cache_manager, "_data_cache", cache):
+        assert distinct_values.get_distinct_values(datasource, "col", 10) == [
+            "a",
+            "b",
+        ]
+        assert distinct_values.get_distinct_values(
+            datasource, "col", 10, search="B"
+        ) == ["b"]
+        assert datasource.values_for_column.call_count == 1
+
+        distinct_values.get_distinct_values(datasource, "col", 10, force=True)
+        assert datasource.values_for_column.call_count == 2
@@ -0,0 +1,60 @@
+from unittest import mock
+
+from rabbitai.utils.engine_registry import EngineRegistry
+
+
+def test_get_engine_reuses_engine_per_key():
+    registry = EngineRegistry()
+    factory = mock.MagicMock(side_effect=lambda: mock.MagicMock())
+
+    engine1 = registry.get_engine("key1", 1, factory)
+    engine2 = registry.get_engine("key1", 1, factory)
+    engine3 = registry.get_engine("key2", 1, factory)
+
+    assert engine1 is engine2
+    assert engine1 is not engine3
+    assert factory.call_count == 2
+
+
+def test_invalidate_disposes_database_engines():
+    registry = EngineRegistry()
+    engine1 = registry.get_engine("key1", 1, mock.MagicMock)
+    engine2 = registry.get_engine("key2", 2, mock.MagicMock)
+
+    registry.invalidate(1)
+
+    engine1.dispose.assert_called_once()
+    engine2.dispose.assert_not_called()
+    assert registry.get_engine("key1", 1, mock.MagicMock) is not engine1
+
+
+@mock.patch("rabbitai.utils.engine_registry.time")
+def test_idle_engines_are_evicted(mock_time):
+    registry = EngineRegistry()
+    stats_logger = mock.MagicMock()
+    mock_time.monotonic.return_value = 0
+    engine = registry.get_engine("key1", 1, mock.MagicMock)
+
+    mock_time.monotonic.return_value = 100
+    registry.get_engine("key2", 1, mock.MagicMock, 60, stats_logger)
+
+    engine.dispose.assert_called_once()
+    stats_logger.incr.assert_any_call("engine_registry.evicted")
+
+
+def test_stale_engines_are_evicted():
+    registry = EngineRegistry()
+    stats_logger = mock.MagicMock()
+    engine1 = registry.get_engine("key1", 1, mock.MagicMock, version="v1")
+    engine2 = registry.get_engine("key2", 1, mock.MagicMock, version="v1")
+    engine3 = registry.get_engine("key3", 2, mock.MagicMock, version="v1")
+
+    engine4 = registry.get_engine(
+        "key4", 1, mock.MagicMock, stats_logger=stats_logger, version="v2"
+    )
+
+    engine1.dispose.assert_called_once()
+    engine2.dispose.assert_called_once()
+    engine3.dispose.assert_not_called()
+    assert registry.get_engine("key4", 1, mock.MagicMock, version="v2") is engine4
+    stats_logger.incr.assert_any_call("engine_registry.stale")
@@ -0,0 +1,65 @@
+# pylint: disable=import-outside-toplevel, unused-argument
+from unittest import mock
+
+from flask import current_app
+from flask_caching import Cache
+
+
+def get_database(database_id: int = 1) -> mock.MagicMock:
+    return mock.MagicMock(id=database_id, impersonate_user=False)
+
+
+def test_get_partition_metadata_cached(app_context):
+    from rabbitai.utils import partitions
+
+    cache = Cache()
+    cache.init_app(current_app, {"CACHE_TYPE": "SimpleCache"})
+    database = get_database()
+    load = mock.MagicMock(return_value=None)
+
+    with mock.patch.object(partitions.cache_manager, "_data_cache", cache):
+        for _ in range(2):
+            assert (
+                partitions.get_partition_metadata(
+                    database, "schema", "table", "latest_partition", load
+                )
+                is None
+            )
+        assert load.call_count == 1
+
+        partitions.get_partition_metadata(
+            database, "schema", "table", "latest_partition", load, {"ds": "2021"}
+        )
+        partitions.get_partition_metadata(
+            get_database(2), "schema", "table", "latest_partition", load
+        )
+        assert load.call_count == 3
+
+
+def test_invalidate_partition_cache(app_context):
+    from rabbitai.utils import partitions
+
+    cache = Cache()
+    cache.init_app(current_app, {"CACHE_TYPE": "SimpleCache"})
+    database = get_database()
+    load = mock.MagicMock(return_value=["ds"])
+
+    with mock.patch.object(partitions.cache_manager, "_data_cache", cache):
+        partitions.get_partition_metadata(database, "schema", "table", "indexes", load)
+        partitions.get_partition_metadata(database, "schema", "other", "indexes", load)
+        partitions.invalidate_partition_cache(database, "schema", "table")
+        partitions.get_partition_metadata(database, "schema", "table", "indexes", load)
+        partitions.get_partition_metadata(database, "schema", "other", "indexes", load)
+        assert load.call_count == 3
+
+
+def test_get_partition_metadata_disabled(app_context):
+    from rabbitai.utils import partitions
+
+    database = get_database()
+    load = mock.MagicMock(return_value=["ds"])
+
+    with mock.patch.dict(current_app.config, {"PARTITION_METADATA_CACHE_TIMEOUT": 0}):
+        for _ in range(2):
+            partitions.get_partition_metadata(database, None, "table", "indexes", load)
+    assert load.call_count == 2